@@ -0,0 +1,80 @@
+"""
+Runs the benchmarks and prints their results as a single JSON document.
+
+    python -m benchmarks                          # every benchmark
+    python -m benchmarks overhead loop_lag        # some of them
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare baseline.json  # exits with 1 on regressions
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+
+from benchmarks.utils import compare, metadata, setup
+
+BENCHMARKS = [
+    "overhead",
+    "throughput",
+    "loop_lag",
+    "chaining",
+    "bulk_create",
+    "bulk_update",
+    "columns",
+    "pagination",
+    "transactions",
+    "overload",
+    "replicas",
+    "sharding",
+    "streaming",
+    "forms",
+    "signals",
+    "startup",
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "benchmarks", nargs="*", help=f"Benchmarks to run: {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument("--output", help="Write the results to this file")
+    parser.add_argument("--compare", help="Results of a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Relative change reported as a regression (default: 0.25)",
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    setup()
+    document = {"metadata": metadata(), "results": {}}
+    for name in args.benchmarks or BENCHMARKS:
+        print(f"Running {name}...", file=sys.stderr)
+        module = importlib.import_module(f"benchmarks.{name}")
+        document["results"][name] = asyncio.run(module.main())
+
+    output = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline["results"], document["results"], args.threshold)
+        for key, (before, after) in regressions.items():
+            print(f"Regression: {key} {before:.2f} -> {after:.2f}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Compares inserting rows with ``abulk_create`` on a list built upfront and
+``abulk_create_stream`` on an async generator, in rows per second.
+
+    python -m benchmarks.bulk_create
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup
+
+ROWS = 20000
+BATCH_SIZE = 1000
+
+
+async def main():
+    from tests.models import TestModel
+
+    def make(index):
+        return TestModel(name=f"bulk {index}", obj_type="bench")
+
+    async def source():
+        for index in range(ROWS):
+            if index % BATCH_SIZE == 0:
+                await asyncio.sleep(0)
+            yield make(index)
+
+    results = {"rows": ROWS, "batch_size": BATCH_SIZE}
+
+    await TestModel.objects.adelete()
+    start = time.perf_counter()
+    await TestModel.objects.abulk_create(
+        [make(index) for index in range(ROWS)], batch_size=BATCH_SIZE
+    )
+    results["abulk_create_rows_per_s"] = ROWS / (time.perf_counter() - start)
+
+    for max_in_flight in (1, 2, 4):
+        await TestModel.objects.adelete()
+        start = time.perf_counter()
+        result = await TestModel.objects.abulk_create_stream(
+            source(), batch_size=BATCH_SIZE, max_in_flight=max_in_flight
+        )
+        duration = time.perf_counter() - start
+        assert result.created == ROWS, result
+        results[f"stream_{max_in_flight}_in_flight_rows_per_s"] = ROWS / duration
+
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("bulk_create", asyncio.run(main()))
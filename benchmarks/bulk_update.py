@@ -0,0 +1,60 @@
+"""
+Compares ``bulk_update`` (``CASE WHEN`` expressions) with ``abulk_update``
+(``UPDATE ... FROM (VALUES ...)``) and ``abulk_upsert``, in rows per second.
+
+    python -m benchmarks.bulk_update
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup
+
+ROWS = 10000
+
+
+async def main():
+    import django
+
+    from django_async_orm.executor import run_sync
+    from tests.models import TestModel
+
+    await TestModel.objects.adelete()
+    await TestModel.objects.abulk_create(
+        [TestModel(name=f"update {index}", obj_type="bench") for index in range(ROWS)]
+    )
+    objs = await TestModel.objects.alist()
+    results = {"rows": ROWS}
+
+    def rename(suffix):
+        for obj in objs:
+            obj.name = f"{obj.pk} {suffix}"
+
+    rename("case")
+    start = time.perf_counter()
+    await run_sync("default", TestModel.objects.bulk_update, objs, ["name"])
+    results["case_when_rows_per_s"] = ROWS / (time.perf_counter() - start)
+
+    for max_in_flight in (1, 4):
+        rename(f"values {max_in_flight}")
+        start = time.perf_counter()
+        rows = await TestModel.objects.abulk_update(
+            objs, ["name"], max_in_flight=max_in_flight
+        )
+        duration = time.perf_counter() - start
+        assert rows == ROWS, rows
+        results[f"values_{max_in_flight}_in_flight_rows_per_s"] = ROWS / duration
+
+    if django.VERSION >= (4, 1):
+        start = time.perf_counter()
+        await TestModel.objects.abulk_upsert(
+            objs, update_fields=["name"], unique_fields=["id"]
+        )
+        results["upsert_rows_per_s"] = ROWS / (time.perf_counter() - start)
+
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("bulk_update", asyncio.run(main()))
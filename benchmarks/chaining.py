@@ -0,0 +1,47 @@
+"""
+Measures the cost of building querysets with the async builder methods.
+
+``await (await qs.afilter(...)).aorder_by(...)`` is compared with the same
+chain built synchronously, no query is executed.
+
+    python -m benchmarks.chaining
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup
+
+CALLS = 2000
+
+
+async def main():
+    from tests.models import TestModel
+
+    def sync_chain():
+        return TestModel.objects.filter(obj_type="bench").order_by("name")
+
+    async def async_chain():
+        qs = await TestModel.objects.afilter(obj_type="bench")
+        return await qs.aorder_by("name")
+
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        sync_chain()
+    sync_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await async_chain()
+    async_duration = time.perf_counter() - start
+
+    return {
+        "calls": CALLS,
+        "sync_chain_us": sync_duration / CALLS * 1e6,
+        "async_chain_us": async_duration / CALLS * 1e6,
+        "overhead_chain_us": (async_duration - sync_duration) / CALLS * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    setup()
+    report("chaining", asyncio.run(main()))
@@ -0,0 +1,53 @@
+"""
+Compares reading two columns of many rows as model instances, as
+``values_list()`` tuples and with ``avalues_columns``: duration and peak
+memory allocated.
+
+    python -m benchmarks.columns
+"""
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks.utils import report, setup
+
+ROWS = 100000
+
+
+async def measure(coroutine_function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = await coroutine_function()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"duration_ms": duration * 1000, "peak_memory_kb": peak / 1024}
+
+
+async def main():
+    from django_async_orm.executor import run_sync
+    from tests.models import TestModel
+
+    await TestModel.objects.adelete()
+    await TestModel.objects.abulk_create(
+        [TestModel(name=f"column {index}", obj_type="bench") for index in range(ROWS)],
+        batch_size=5000,
+    )
+    qs = TestModel.objects.filter(obj_type="bench")
+
+    results = {"rows": ROWS}
+    results["instances"] = await measure(lambda: qs.only("id", "name").alist())
+    results["values_list"] = await measure(
+        lambda: run_sync("default", lambda: list(qs.values_list("id", "name")))
+    )
+    results["values_columns"] = await measure(lambda: qs.avalues_columns("id", "name"))
+    results["values_columns_ids"] = await measure(lambda: qs.avalues_columns("id"))
+
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("columns", asyncio.run(main()))
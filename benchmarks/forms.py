@@ -0,0 +1,125 @@
+"""
+Validates a ``ModelForm`` with unique fields and a form with several model
+choice fields, with ``form.is_valid()`` in a thread and with ``ais_valid``,
+and reports the duration and the number of queries of a validation. Each
+query waits ``LATENCY`` seconds first, like a query sent to a remote
+database, and the database has a pool of workers.
+
+    python -m benchmarks.forms
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup, summary
+
+REPEAT = 100
+LATENCY = 0.002
+WORKERS = 4
+
+
+def _add_latency(connection, **kwargs):
+    def execute(execute, sql, params, many, context):
+        time.sleep(LATENCY)
+        return execute(sql, params, many, context)
+
+    # First, the connection is opened inside the wrapper of the call.
+    connection.execute_wrappers.insert(0, execute)
+
+
+def _forms():
+    from django import forms
+
+    from tests.models import Author, Book, Edition, Tag
+
+    class EditionForm(forms.ModelForm):
+        class Meta:
+            model = Edition
+            fields = ["book", "number", "isbn"]
+
+    class SearchForm(forms.Form):
+        author = forms.ModelChoiceField(Author.objects.all())
+        book = forms.ModelChoiceField(Book.objects.all())
+        tag = forms.ModelChoiceField(Tag.objects.all())
+        tags = forms.ModelMultipleChoiceField(Tag.objects.all())
+
+    return EditionForm, SearchForm
+
+
+async def _measure(validate, form_class, data):
+    from django.db import connections
+
+    from django_async_orm.executor import get_executor
+
+    def count_queries():
+        connections["default"].force_debug_cursor = True
+        return len(connections["default"].queries_log)
+
+    # Every worker logs its queries.
+    counts = await asyncio.gather(
+        *(worker.run(count_queries) for worker in get_executor("default").workers)
+    )
+    durations = []
+    for _ in range(REPEAT):
+        form = form_class(data)
+        start = time.perf_counter()
+        await validate(form)
+        durations.append(time.perf_counter() - start)
+    after = await asyncio.gather(
+        *(worker.run(count_queries) for worker in get_executor("default").workers)
+    )
+    return {**summary(durations), "queries": (sum(after) - sum(counts)) / REPEAT}
+
+
+async def main():
+    from django.db.backends.signals import connection_created
+    from django.test import override_settings
+
+    from django_async_orm.executor import run_sync
+    from django_async_orm.forms import ais_valid
+    from tests.models import Author, Book, Edition, Tag
+
+    await Author.objects.adelete()
+    await Tag.objects.adelete()
+    author = await Author.objects.acreate(name="author")
+    book = await Book.objects.acreate(title="book", author=author)
+    tags = [await Tag.objects.acreate(name=f"tag {i}") for i in range(3)]
+    await Edition.objects.acreate(book=book, number=1, isbn="1234567890123")
+    EditionForm, SearchForm = _forms()
+    cases = {
+        "model_form": (
+            EditionForm,
+            {"book": book.pk, "number": 2, "isbn": "1234567890124"},
+        ),
+        "choice_form": (
+            SearchForm,
+            {
+                "author": author.pk,
+                "book": book.pk,
+                "tag": tags[0].pk,
+                "tags": [tag.pk for tag in tags],
+            },
+        ),
+    }
+    results = {"latency_ms": LATENCY * 1000, "workers": WORKERS}
+    connection_created.connect(_add_latency)
+    try:
+        with override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": WORKERS}):
+            for name, (form_class, data) in cases.items():
+                results[name] = {
+                    "is_valid": await _measure(
+                        lambda form: run_sync("default", form.is_valid),
+                        form_class,
+                        data,
+                    ),
+                    "ais_valid": await _measure(ais_valid, form_class, data),
+                }
+    finally:
+        connection_created.disconnect(_add_latency)
+    await Author.objects.adelete()
+    await Tag.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("forms", asyncio.run(main()))
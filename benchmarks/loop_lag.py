@@ -0,0 +1,60 @@
+"""
+Measures how long the event loop is starved while a large queryset is
+iterated with ``async for``.
+
+A ticker coroutine sleeps for ``TICK`` seconds in a loop and records how late
+it wakes up, the lag percentiles are reported for several batch sizes.
+
+    python -m benchmarks.loop_lag
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup, summary
+
+ROWS = 20000
+TICK = 0.001
+
+
+async def _ticker(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, time.perf_counter() - start - TICK))
+
+
+async def _iterate(batch_size):
+    from django.test import override_settings
+
+    from tests.models import TestModel
+
+    lags, stop = [], asyncio.Event()
+    ticker = asyncio.ensure_future(_ticker(lags, stop))
+    start = time.perf_counter()
+    with override_settings(ASYNC_ORM_ITER_BATCH_SIZE=batch_size):
+        count = 0
+        async for _ in await TestModel.objects.aall():
+            count += 1
+    duration = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return {"rows": count, "duration_ms": duration * 1000, "lag": summary(lags)}
+
+
+async def main():
+    from tests.models import TestModel
+
+    await TestModel.objects.adelete()
+    await TestModel.objects.abulk_create(
+        [TestModel(name=f"row {i}", obj_type="bench") for i in range(ROWS)]
+    )
+    results = {}
+    for batch_size in (1, 100, 1000, ROWS):
+        results[f"batch_size={batch_size}"] = await _iterate(batch_size)
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("loop_lag", asyncio.run(main()))
@@ -0,0 +1,214 @@
+"""
+Measures the per-call cost of every ``QuerySetAsync`` entry point against the
+plain sync ORM and Django's own async methods (``QuerySet.a*``).
+
+The sync calls are timed inside a single thread hop, so their cost is the cost
+of the query alone and ``overhead_us`` is what the async layer adds to it. The
+cost of instrumentation is measured on ``acount``.
+
+    python -m benchmarks.overhead
+"""
+import asyncio
+import functools
+import itertools
+import time
+
+from benchmarks.utils import report, setup
+
+CALLS = 200
+ROWS = 100
+
+
+async def _consume(aiterator):
+    async for _ in aiterator:
+        pass
+
+
+def _renaming(obj, save):
+    names = itertools.cycle(("renamed", obj.name))
+
+    def call():
+        obj.name = next(names)
+        return save()
+
+    return call
+
+
+def _cases(TestModel, obj, objs):
+    from django.db.models import Model, QuerySet
+
+    qs = TestModel.objects.filter(obj_type="bench")
+    one = TestModel.objects.filter(pk=obj.pk)
+    missing = TestModel.objects.filter(name="missing")
+    pks = [obj.pk for obj in objs[:10]]
+
+    def new_objs():
+        return [TestModel(name="new", obj_type="new") for _ in range(10)]
+
+    # name: (QuerySetAsync call, sync call, Django's async call or None)
+    return {
+        "aget": (one.aget, one.get, lambda: QuerySet.aget(one)),
+        "afirst": (qs.afirst, qs.first, lambda: QuerySet.afirst(qs)),
+        "alast": (qs.alast, qs.last, lambda: QuerySet.alast(qs)),
+        "aearliest": (
+            lambda: qs.aearliest("pk"),
+            lambda: qs.earliest("pk"),
+            lambda: QuerySet.aearliest(qs, "pk"),
+        ),
+        "alatest": (
+            lambda: qs.alatest("pk"),
+            lambda: qs.latest("pk"),
+            lambda: QuerySet.alatest(qs, "pk"),
+        ),
+        "acount": (qs.acount, qs.count, lambda: QuerySet.acount(qs)),
+        "aexists": (qs.aexists, qs.exists, lambda: QuerySet.aexists(qs)),
+        "ain_bulk": (
+            lambda: qs.ain_bulk(pks),
+            lambda: qs.in_bulk(pks),
+            lambda: QuerySet.ain_bulk(qs, pks),
+        ),
+        "aexplain": (qs.aexplain, qs.explain, lambda: QuerySet.aexplain(qs)),
+        "alist": (lambda: qs.all().alist(), lambda: list(qs.all()), None),
+        "async for": (
+            lambda: _consume(qs.all()),
+            lambda: list(qs.all()),
+            None,
+        ),
+        "aiterator": (
+            lambda: _consume(qs.aiterator()),
+            lambda: list(qs.iterator()),
+            lambda: _consume(QuerySet.aiterator(qs)),
+        ),
+        "avalues_columns": (
+            lambda: qs.avalues_columns("id", "name"),
+            lambda: list(qs.values_list("id", "name")),
+            None,
+        ),
+        "araw": (
+            lambda: TestModel.objects.araw("SELECT * FROM tests_testmodel LIMIT 1"),
+            lambda: TestModel.objects.raw("SELECT * FROM tests_testmodel LIMIT 1"),
+            None,
+        ),
+        "aload": (
+            lambda: TestModel.objects.aload(pk=obj.pk),
+            lambda: TestModel.objects.in_bulk([obj.pk]),
+            None,
+        ),
+        "acreate": (
+            lambda: TestModel.objects.acreate(name="new", obj_type="new"),
+            lambda: TestModel.objects.create(name="new", obj_type="new"),
+            lambda: QuerySet.acreate(TestModel.objects.all(), name="new"),
+        ),
+        "aget_or_create": (
+            lambda: one.aget_or_create(),
+            lambda: one.get_or_create(),
+            lambda: QuerySet.aget_or_create(one),
+        ),
+        "aupdate_or_create": (
+            lambda: one.aupdate_or_create(defaults={"name": obj.name}),
+            lambda: one.update_or_create(defaults={"name": obj.name}),
+            lambda: QuerySet.aupdate_or_create(one, defaults={"name": obj.name}),
+        ),
+        "aupdate": (
+            lambda: one.aupdate(name=obj.name),
+            lambda: one.update(name=obj.name),
+            lambda: QuerySet.aupdate(one, name=obj.name),
+        ),
+        "adelete": (missing.adelete, missing.delete, lambda: QuerySet.adelete(missing)),
+        "asave": (
+            _renaming(obj, obj.asave),
+            _renaming(obj, obj.save),
+            _renaming(obj, lambda: Model.asave(obj)),
+        ),
+        "asave (only_changed)": (
+            _renaming(obj, functools.partial(obj.asave, only_changed=True)),
+            _renaming(obj, obj.save),
+            _renaming(obj, lambda: Model.asave(obj)),
+        ),
+        "asave (unchanged)": (
+            functools.partial(obj.asave, only_changed=True),
+            obj.save,
+            lambda: Model.asave(obj),
+        ),
+        "arefresh_from_db": (
+            obj.arefresh_from_db,
+            obj.refresh_from_db,
+            lambda: Model.arefresh_from_db(obj),
+        ),
+        "abulk_create": (
+            lambda: TestModel.objects.abulk_create(new_objs()),
+            lambda: TestModel.objects.bulk_create(new_objs()),
+            lambda: QuerySet.abulk_create(TestModel.objects.all(), new_objs()),
+        ),
+        "abulk_update": (
+            lambda: TestModel.objects.abulk_update(objs[:10], ["name"]),
+            lambda: TestModel.objects.bulk_update(objs[:10], ["name"]),
+            lambda: QuerySet.abulk_update(TestModel.objects.all(), objs[:10], ["name"]),
+        ),
+    }
+
+
+async def _time_async(call):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await call()
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+def _time_sync(call):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        call()
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+async def main():
+    from django_async_orm.executor import run_sync
+    from tests.models import TestModel
+
+    await TestModel.objects.adelete()
+    await TestModel.objects.abulk_create(
+        [TestModel(name=f"row {index}", obj_type="bench") for index in range(ROWS)]
+    )
+    objs = await TestModel.objects.filter(obj_type="bench").order_by("pk").alist()
+    results = {"calls": CALLS, "rows": ROWS}
+    for name, (async_call, sync_call, django_call) in _cases(
+        TestModel, objs[0], objs
+    ).items():
+        sync_us = await run_sync("default", _time_sync, sync_call)
+        async_us = await _time_async(async_call)
+        result = {
+            "sync_us": sync_us,
+            "async_us": async_us,
+            "overhead_us": async_us - sync_us,
+        }
+        if django_call is not None:
+            django_us = await _time_async(django_call)
+            result["django_async_us"] = django_us
+            result["django_overhead_us"] = django_us - sync_us
+        results[name] = result
+    # The same call with instrumentation enabled.
+    from django_async_orm.instrumentation import (
+        StatsCollector,
+        add_listener,
+        remove_listener,
+    )
+
+    qs = TestModel.objects.filter(obj_type="bench")
+    collector = StatsCollector()
+    add_listener(collector)
+    try:
+        async_us = await _time_async(qs.acount)
+    finally:
+        remove_listener(collector)
+    results["acount (instrumented)"] = {
+        "async_us": async_us,
+        "overhead_us": async_us - results["acount"]["async_us"],
+    }
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("overhead", asyncio.run(main()))
@@ -0,0 +1,62 @@
+"""
+Sends a burst of slow queries with a deadline to a single worker, then
+measures how long a fresh query waits behind the burst. Calls past their
+deadline are dropped or interrupted instead of running for nobody.
+
+    python -m benchmarks.overload
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup
+
+BURST = 50
+TIMEOUT = 0.2
+# About 20ms per query on sqlite.
+SLOW_WHERE = (
+    "(WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c "
+    "WHERE x < 200000) SELECT count(*) FROM c) > 0"
+)
+
+
+async def _burst(qs):
+    from django_async_orm.timeout import QueryTimeout
+
+    results = await asyncio.gather(
+        *(qs.aexists() for _ in range(BURST)), return_exceptions=True
+    )
+    return {
+        "completed": sum(result is True for result in results),
+        "timed_out": sum(isinstance(result, QueryTimeout) for result in results),
+    }
+
+
+async def main():
+    from django.test import override_settings
+
+    from tests.models import TestModel
+
+    await TestModel.objects.adelete()
+    await TestModel.objects.acreate(name="row", obj_type="bench")
+    slow = TestModel.objects.extra(where=[SLOW_WHERE])
+    results = {"burst": BURST, "timeout_s": TIMEOUT}
+    with override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 1}):
+        start = time.perf_counter()
+        await slow.aexists()
+        results["query_ms"] = (time.perf_counter() - start) * 1000
+        for name, qs in (("no_timeout", slow), ("timeout", slow.atimeout(TIMEOUT))):
+            start = time.perf_counter()
+            burst = asyncio.ensure_future(_burst(qs))
+            await asyncio.sleep(TIMEOUT)
+            await TestModel.objects.acount()
+            results[name] = {
+                "fresh_query_ms": (time.perf_counter() - start) * 1000,
+                **(await burst),
+            }
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("overload", asyncio.run(main()))
@@ -0,0 +1,60 @@
+"""
+Compares the cost of fetching a page at increasing depths with ``OFFSET``
+slicing and with keyset pagination (``apaginate``).
+
+    python -m benchmarks.pagination
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup
+
+ROWS = 50000
+LIMIT = 100
+DEPTHS = (0, 100, 490)
+CALLS = 20
+
+
+async def _time(call):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await call()
+    return (time.perf_counter() - start) / CALLS * 1000
+
+
+async def main():
+    from tests.models import TestModel
+
+    await TestModel.objects.adelete()
+    await TestModel.objects.abulk_create(
+        [TestModel(name=f"row {index}", obj_type="bench") for index in range(ROWS)],
+        batch_size=1000,
+    )
+    qs = TestModel.objects.filter(obj_type="bench")
+    # The cursor pointing before each page.
+    cursors = {}
+    after = None
+    page = 0
+    async for result in qs.aiter_pages(order_by=["pk"], limit=LIMIT):
+        if page in DEPTHS:
+            cursors[page] = after
+        after = result.next_cursor
+        page += 1
+
+    results = {"rows": ROWS, "limit": LIMIT}
+    for depth in DEPTHS:
+        offset = depth * LIMIT
+        offset_ms = await _time(
+            lambda: qs.order_by("pk")[offset : offset + LIMIT].alist()
+        )
+        keyset_ms = await _time(
+            lambda: qs.apaginate(order_by=["pk"], after=cursors[depth], limit=LIMIT)
+        )
+        results[f"page_{depth}"] = {"offset_ms": offset_ms, "keyset_ms": keyset_ms}
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("pagination", asyncio.run(main()))
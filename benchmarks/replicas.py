@@ -0,0 +1,87 @@
+"""
+Reads a row with concurrent coroutines while one of two replicas is slowed
+down by a noisy neighbour, and compares the read latency when reads go to
+the primary, to one replica picked by hand, to the replica chosen by
+``ASYNC_ORM_REPLICAS`` routing, and with hedging on top.
+
+    python -m benchmarks.replicas
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup, summary
+
+READS = 400
+CONCURRENCY = 8
+HEDGE_AFTER = 0.01
+REPLICAS = ("replica1", "replica2")
+# About 15ms per query on sqlite.
+SLOW_WHERE = (
+    "(WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c "
+    "WHERE x < 100000) SELECT count(*) FROM c) > 0"
+)
+
+
+async def _noise(slow, stop):
+    while not stop.is_set():
+        await slow.aexists()
+
+
+async def _reads(queryset):
+    durations = []
+    remaining = iter(range(READS))
+
+    async def reader():
+        for _ in remaining:
+            start = time.perf_counter()
+            await queryset.aget(pk=1)
+            durations.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(reader() for _ in range(CONCURRENCY)))
+    return {
+        "reads_per_s": READS / (time.perf_counter() - start),
+        "latency": summary(durations),
+    }
+
+
+async def main():
+    from django.test import override_settings
+
+    from tests.models import TestModel
+
+    for alias in ("default", *REPLICAS):
+        await TestModel.objects.using(alias).adelete()
+        await TestModel.objects.using(alias).acreate(pk=1, name=alias)
+    slow = TestModel.objects.using("replica1").extra(where=[SLOW_WHERE])
+    modes = {
+        "primary": ({}, None, TestModel.objects),
+        "fixed_replica": ({}, None, TestModel.objects.using("replica1")),
+        "routed": ({"default": list(REPLICAS)}, None, TestModel.objects),
+        "routed_hedged": ({"default": list(REPLICAS)}, HEDGE_AFTER, TestModel.objects),
+    }
+    results = {"reads": READS, "concurrency": CONCURRENCY}
+    for name, (replicas, hedge_after, queryset) in modes.items():
+        with override_settings(
+            ASYNC_ORM_EXECUTOR_WORKERS={alias: 2 for alias in ("default", *REPLICAS)},
+            ASYNC_ORM_REPLICAS=replicas,
+            ASYNC_ORM_HEDGE_AFTER=hedge_after,
+        ):
+            stop = asyncio.Event()
+            noise = [asyncio.ensure_future(_noise(slow, stop)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            try:
+                results[name] = await _reads(queryset)
+            finally:
+                stop.set()
+                await asyncio.gather(*noise)
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    from django.core.management import call_command
+
+    for alias in REPLICAS:
+        call_command("migrate", database=alias, run_syncdb=True, verbosity=0)
+    report("replicas", asyncio.run(main()))
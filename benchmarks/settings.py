@@ -0,0 +1,15 @@
+"""Django settings used by the benchmarks."""
+import os
+import tempfile
+
+from tests.settings import *  # noqa: F401,F403
+from tests.settings import DATABASES
+
+for _alias, _settings in DATABASES.items():
+    _settings["NAME"] = os.path.join(
+        tempfile.gettempdir(),
+        "django_async_orm_benchmarks.sqlite3"
+        if _alias == "default"
+        else f"django_async_orm_benchmarks_{_alias}.sqlite3",
+    )
+DEBUG = False
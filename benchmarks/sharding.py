@@ -0,0 +1,82 @@
+"""
+Compares reading a table sharded over three databases one shard after the
+other (``using(alias)`` in a loop, then sorting in Python) with ``ashards``,
+which queries the shards concurrently and merges their ordered results.
+Each query waits ``LATENCY`` seconds first, like a query sent to a remote
+database.
+
+    python -m benchmarks.sharding
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup, summary
+
+SHARDS = ("default", "replica1", "replica2")
+ROWS_PER_SHARD = 2000
+LATENCY = 0.005
+REPEAT = 20
+
+
+def _add_latency(connection, **kwargs):
+    if connection.vendor == "sqlite":
+        connection.connection.create_function("bench_sleep", 1, time.sleep)
+
+
+async def _serial_page(queryset):
+    objs = []
+    for alias in SHARDS:
+        objs.extend(await queryset.using(alias).alist())
+    return sorted(objs, key=lambda obj: obj.name, reverse=True)[:50]
+
+
+async def _serial_count(queryset):
+    return sum([await queryset.using(alias).acount() for alias in SHARDS])
+
+
+async def _measure(func, queryset):
+    durations = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        await func(queryset)
+        durations.append(time.perf_counter() - start)
+    return summary(durations)
+
+
+async def main():
+    from django.test import override_settings
+
+    from tests.models import TestModel
+
+    for index, alias in enumerate(SHARDS):
+        await TestModel.objects.using(alias).adelete()
+        await TestModel.objects.using(alias).abulk_create(
+            TestModel(name=f"{index}-{row:05}", obj_type="bench")
+            for row in range(ROWS_PER_SHARD)
+        )
+    slow = TestModel.objects.extra(where=[f"(SELECT bench_sleep({LATENCY})) IS NULL"])
+    page = slow.order_by("-name")[:50]
+    results = {"shards": len(SHARDS), "rows_per_shard": ROWS_PER_SHARD}
+    with override_settings(ASYNC_ORM_EXECUTOR_WORKERS={alias: 2 for alias in SHARDS}):
+        results["page"] = {
+            "serial": await _measure(_serial_page, page),
+            "ashards": await _measure(lambda qs: qs.ashards(SHARDS).alist(), page),
+        }
+        results["count"] = {
+            "serial": await _measure(_serial_count, slow),
+            "ashards": await _measure(lambda qs: qs.ashards(SHARDS).acount(), slow),
+        }
+    for alias in SHARDS:
+        await TestModel.objects.using(alias).adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    from django.core.management import call_command
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_add_latency)
+    for alias in SHARDS[1:]:
+        call_command("migrate", database=alias, run_syncdb=True, verbosity=0)
+    report("sharding", asyncio.run(main()))
@@ -0,0 +1,64 @@
+"""
+Measures the duration of ``acreate`` with three ``post_save`` receivers
+waiting ``RECEIVER_WAIT`` seconds each, like a cache invalidation or an audit
+call: sync receivers run one after the other in the database thread, coroutine
+receivers connected with ``django_async_orm.signals`` run concurrently in the
+event loop.
+
+    python -m benchmarks.signals
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup, summary
+
+RECEIVERS = 3
+RECEIVER_WAIT = 0.005
+REPEAT = 50
+
+
+def _sync_receiver(sender, **kwargs):
+    time.sleep(RECEIVER_WAIT)
+
+
+async def _async_receiver(sender, **kwargs):
+    await asyncio.sleep(RECEIVER_WAIT)
+
+
+async def _measure():
+    from tests.models import TestModel
+
+    durations = []
+    for i in range(REPEAT):
+        start = time.perf_counter()
+        await TestModel.objects.acreate(name=f"row {i}", obj_type="bench")
+        durations.append(time.perf_counter() - start)
+    return summary(durations)
+
+
+async def main():
+    from django.db.models.signals import post_save
+
+    from django_async_orm import signals
+    from tests.models import TestModel
+
+    await TestModel.objects.adelete()
+    results = {"receivers": RECEIVERS, "receiver_wait_ms": RECEIVER_WAIT * 1000}
+    results["none"] = await _measure()
+    uids = [f"bench_{i}" for i in range(RECEIVERS)]
+    for uid in uids:
+        post_save.connect(_sync_receiver, sender=TestModel, dispatch_uid=uid)
+    results["sync"] = await _measure()
+    for uid in uids:
+        post_save.disconnect(sender=TestModel, dispatch_uid=uid)
+        signals.connect(post_save, _async_receiver, sender=TestModel, dispatch_uid=uid)
+    results["async"] = await _measure()
+    for uid in uids:
+        signals.disconnect(post_save, sender=TestModel, dispatch_uid=uid)
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("signals", asyncio.run(main()))
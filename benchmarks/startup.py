@@ -0,0 +1,116 @@
+"""
+Measures the boot time and memory of a process with many models, without and
+with ``django_async_orm`` (managers are patched when the app is ready), the
+part of the boot spent patching them, and the time spent accessing every
+manager and related manager once afterwards.
+
+Each measure runs in a fresh interpreter, against a generated app.
+
+    python -m benchmarks.startup
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.utils import report, setup
+
+MODELS = 1000
+RUNS = 3
+
+SCRIPT = """
+import json, resource, sys, time
+
+start = time.perf_counter()
+import django
+from django.conf import settings
+
+mode = sys.argv[1]
+apps = ["startup_app"] if mode == "without" else ["django_async_orm", "startup_app"]
+settings.configure(
+    INSTALLED_APPS=apps,
+    DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+    DEFAULT_AUTO_FIELD="django.db.models.AutoField",
+)
+patch = 0.0
+if mode == "with":
+    from django_async_orm.apps import AsyncOrmConfig
+
+    ready = AsyncOrmConfig.ready
+
+    def timed_ready(self):
+        global patch
+        start_patch = time.perf_counter()
+        ready(self)
+        patch = time.perf_counter() - start_patch
+
+    AsyncOrmConfig.ready = timed_ready
+django.setup()
+boot = time.perf_counter() - start
+
+start = time.perf_counter()
+from django.apps import apps
+
+for model in apps.get_models():
+    model.objects
+    model.children.related_manager_cls
+access = time.perf_counter() - start
+
+print(json.dumps({
+    "boot_ms": boot * 1000,
+    "patch_ms": patch * 1000,
+    "access_ms": access * 1000,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+def _write_app(directory):
+    app = os.path.join(directory, "startup_app")
+    os.makedirs(app)
+    open(os.path.join(app, "__init__.py"), "w").close()
+    with open(os.path.join(app, "models.py"), "w") as f:
+        f.write("from django.db import models\n")
+        for index in range(MODELS):
+            f.write(
+                f"\n\nclass Model{index}(models.Model):\n"
+                f"    name = models.CharField(max_length=50)\n"
+                f"    value = models.IntegerField(default=0)\n"
+                f"    parent = models.ForeignKey(\n"
+                f"        'Model{(index + 1) % MODELS}', models.CASCADE,"
+                f" null=True, related_name='children'\n"
+                f"    )\n"
+            )
+
+
+def _measure(directory, mode):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([directory, os.getcwd()])}
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    runs = []
+    for _ in range(RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT, mode],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        runs.append(json.loads(output))
+    # The fastest run is the least disturbed one.
+    return min(runs, key=lambda run: run["boot_ms"] + run["access_ms"])
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        _write_app(directory)
+        results = {"models": MODELS}
+        for mode in ("without", "with"):
+            results[mode] = _measure(directory, mode)
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("startup", asyncio.run(main()))
@@ -0,0 +1,98 @@
+"""
+Measures the time to first byte and the total duration of a listing page
+rendered with ``arender``, which returns once the whole page is rendered,
+and with ``arender_stream``, which sends the page chunk by chunk.
+
+    python -m benchmarks.streaming
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup, summary
+
+ROWS = 5000
+REPEAT = 10
+TEMPLATES = {
+    "base.html": (
+        "<html><head><title>{% block title %}{% endblock %}</title>"
+        '<link rel="stylesheet" href="/static/site.css"></head>'
+        "<body><nav>{% for link in links %}<a href='{{ link }}'>{{ link }}</a>"
+        "{% endfor %}</nav>{% block content %}{% endblock %}</body></html>"
+    ),
+    "list.html": (
+        '{% extends "base.html" %}{% block title %}Models{% endblock %}'
+        "{% block content %}<table>{% for model in models %}"
+        "<tr><td>{{ model.pk }}</td><td>{{ model.name|title }}</td>"
+        "<td>{{ model.obj_type }}</td></tr>{% endfor %}</table>{% endblock %}"
+    ),
+}
+
+
+async def _measure(render):
+    from django.test import RequestFactory
+
+    from tests.models import TestModel
+
+    request = RequestFactory().get("/")
+    first_byte = []
+    durations = []
+    for _ in range(REPEAT):
+        context = {
+            "links": [f"/section/{i}/" for i in range(20)],
+            "models": TestModel.objects.order_by("pk"),
+        }
+        start = time.perf_counter()
+        response = await render(request, "list.html", context)
+        if getattr(response, "is_async", False):
+            chunks = aiter(response.streaming_content)
+            await anext(chunks)
+            first_byte.append(time.perf_counter() - start)
+            async for _ in chunks:
+                pass
+        elif response.streaming:
+            # Before Django 4.2, the content is a sync iterator.
+            chunks = iter(response.streaming_content)
+            next(chunks)
+            first_byte.append(time.perf_counter() - start)
+            for _ in chunks:
+                pass
+        else:
+            first_byte.append(time.perf_counter() - start)
+        durations.append(time.perf_counter() - start)
+    return {"first_byte": summary(first_byte), "total": summary(durations)}
+
+
+async def main():
+    from django.test import override_settings
+
+    from django_async_orm.wrappers import arender, arender_stream
+    from tests.models import TestModel
+
+    await TestModel.objects.adelete()
+    await TestModel.objects.abulk_create(
+        TestModel(name=f"model {row}", obj_type="bench") for row in range(ROWS)
+    )
+    results = {"rows": ROWS}
+    templates = [
+        {
+            "BACKEND": "django.template.backends.django.DjangoTemplates",
+            "OPTIONS": {
+                "loaders": [
+                    (
+                        "django.template.loaders.cached.Loader",
+                        [("django.template.loaders.locmem.Loader", TEMPLATES)],
+                    )
+                ]
+            },
+        }
+    ]
+    with override_settings(TEMPLATES=templates):
+        results["arender"] = await _measure(arender)
+        results["arender_stream"] = await _measure(arender_stream)
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("streaming", asyncio.run(main()))
@@ -0,0 +1,65 @@
+"""
+Measures how many queries per second are served when N coroutines query the
+database concurrently, with channels' shared database thread and with a pool
+of database workers.
+
+    python -m benchmarks.throughput
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup, summary
+
+OPERATIONS = 2000
+ROWS = 100
+
+
+async def _run(concurrency, workers):
+    from django.test import override_settings
+
+    from tests.models import TestModel
+
+    executor_workers = {"default": workers} if workers else {}
+    latencies = []
+
+    async def client(operations):
+        for index in range(operations):
+            start = time.perf_counter()
+            if index % 2:
+                await TestModel.objects.filter(obj_type="bench").acount()
+            else:
+                await TestModel.objects.filter(obj_type="bench").afirst()
+            latencies.append(time.perf_counter() - start)
+
+    with override_settings(ASYNC_ORM_EXECUTOR_WORKERS=executor_workers):
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(client(OPERATIONS // concurrency) for _ in range(concurrency))
+        )
+        duration = time.perf_counter() - start
+    return {
+        "ops_per_s": len(latencies) / duration,
+        "latency": summary(latencies),
+    }
+
+
+async def main():
+    from tests.models import TestModel
+
+    await TestModel.objects.adelete()
+    await TestModel.objects.abulk_create(
+        [TestModel(name=f"row {index}", obj_type="bench") for index in range(ROWS)]
+    )
+    results = {"operations": OPERATIONS}
+    for workers in (0, 4):
+        for concurrency in (1, 10, 100):
+            results[f"workers={workers},concurrency={concurrency}"] = await _run(
+                concurrency, workers
+            )
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("throughput", asyncio.run(main()))
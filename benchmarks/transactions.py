@@ -0,0 +1,55 @@
+"""
+Compares running a group of writes one by one (each in its own transaction)
+and inside a single ``aatomic`` block, in groups per second, with and without
+a pool of workers.
+
+    python -m benchmarks.transactions
+"""
+import asyncio
+import time
+
+from benchmarks.utils import report, setup
+
+GROUPS = 200
+WRITES = 10
+
+
+async def _write_group(TestModel, index):
+    for position in range(WRITES):
+        await TestModel.objects.acreate(name=f"{index}.{position}", obj_type="bench")
+
+
+async def _atomic_group(TestModel, index):
+    from django_async_orm.transaction import aatomic
+
+    async with aatomic():
+        await _write_group(TestModel, index)
+
+
+async def main():
+    from django.test import override_settings
+
+    from tests.models import TestModel
+
+    results = {"groups": GROUPS, "writes_per_group": WRITES}
+    for workers in (0, 4):
+        with override_settings(
+            ASYNC_ORM_EXECUTOR_WORKERS={"default": workers} if workers else {}
+        ):
+            for name, group in (
+                ("autocommit", _write_group),
+                ("aatomic", _atomic_group),
+            ):
+                await TestModel.objects.adelete()
+                start = time.perf_counter()
+                for index in range(GROUPS):
+                    await group(TestModel, index)
+                duration = time.perf_counter() - start
+                results[f"workers_{workers}_{name}_groups_per_s"] = GROUPS / duration
+    await TestModel.objects.adelete()
+    return results
+
+
+if __name__ == "__main__":
+    setup()
+    report("transactions", asyncio.run(main()))
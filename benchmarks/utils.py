@@ -0,0 +1,99 @@
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import statistics
+
+
+def setup():
+    """
+    Configures django with the benchmark settings and creates the tables.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+
+def percentile(values, percent):
+    """
+    Returns the ``percent`` percentile of ``values`` (nearest rank).
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summary(values):
+    """
+    Summarizes a list of durations (seconds) in milliseconds.
+    """
+    return {
+        "count": len(values),
+        "mean_ms": statistics.mean(values) * 1000,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+def report(name, results):
+    print(json.dumps({"benchmark": name, "results": results}, indent=2))
+
+
+def metadata():
+    """
+    Describes the environment the benchmarks ran in.
+    """
+    import django
+
+    return {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def flatten(results, prefix=""):
+    """
+    Flattens nested results into ``{"a.b.c": value}``.
+    """
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def compare(baseline, results, threshold):
+    """
+    Returns the metrics that got worse by more than ``threshold`` (relative)
+    between two runs. Durations (``*_ms``, ``*_us``) and memory (``*_kb``)
+    should go down, rates (``*_per_s``) up, other values are ignored.
+
+    :return: ``{metric: (before, after)}``
+    :rtype: dict
+    """
+    before, after = flatten(baseline), flatten(results)
+    regressions = {}
+    for key, old in before.items():
+        new = after.get(key)
+        if not isinstance(new, (int, float)) or not old or old <= 0:
+            continue
+        if key.endswith(("_ms", "_us", "_kb")):
+            worse = new > old * (1 + threshold)
+        elif key.endswith("_per_s"):
+            worse = new < old * (1 - threshold)
+        else:
+            continue
+        if worse:
+            regressions[key] = (old, new)
+    return regressions
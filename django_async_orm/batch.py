@@ -0,0 +1,98 @@
+import asyncio
+
+from django_async_orm.executor import current_batch, detached_context, run_sync
+
+
+class Batch:
+    """
+    Collects the sync calls submitted by the tasks of an :func:`agather` and runs
+    them together, one database hop per alias.
+
+    Calls submitted during the same event loop iteration are flushed together,
+    a task that submits another call after receiving its result gets it batched
+    with the calls of the next iteration.
+
+    The hops run in a context of their own, not in the one of the task whose
+    call came first: they only keep the workers pinned where the batch was
+    created.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._scheduled = False
+        self._context = detached_context()
+
+    def submit(self, alias, func, args, kwargs):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(alias, []).append((func, args, kwargs, future))
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush, context=self._context)
+        return future
+
+    def _flush(self):
+        self._scheduled = False
+        pending, self._pending = self._pending, {}
+        for alias, calls in pending.items():
+            asyncio.ensure_future(self._run(alias, calls))
+
+    @staticmethod
+    def _run_calls(calls):
+        results = []
+        for func, args, kwargs, future in calls:
+            try:
+                results.append((func(*args, **kwargs), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+
+    async def _run(self, alias, calls):
+        calls = [call for call in calls if not call[3].cancelled()]
+        try:
+            results = await run_sync(alias, self._run_calls, calls)
+        except asyncio.CancelledError:
+            for *_, future in calls:
+                future.cancel()
+            raise
+        except Exception as e:
+            # The hop failed as a whole, none of the calls has a result. Nobody
+            # awaits this task, the error only goes to the callers.
+            for *_, future in calls:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (*_, future), (result, error) in zip(calls, results):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+async def agather(*aws, return_exceptions=False):
+    """
+    Runs several async queryset operations together and returns their results
+    in order, like ``asyncio.gather``.
+
+    Sync ORM calls made by the operations are sent to the database thread in a
+    single hop per database alias instead of one hop each, operations running
+    on a native async engine simply run concurrently::
+
+        count, first, objs = await agather(
+            qs1.acount(), qs2.afirst(), qs3.alist()
+        )
+
+    :param aws: Awaitables, typically ``QuerySetAsync`` coroutines
+    :param return_exceptions: Return exceptions instead of raising the first one
+    :type return_exceptions: bool
+    :return: The list of results
+    :rtype: list
+    """
+    token = current_batch.set(Batch())
+    try:
+        futures = [asyncio.ensure_future(aw) for aw in aws]
+    finally:
+        current_batch.reset(token)
+    return await asyncio.gather(*futures, return_exceptions=return_exceptions)
@@ -0,0 +1,375 @@
+import asyncio
+import collections
+
+import django
+from django.db import NotSupportedError, connections, transaction
+
+from django_async_orm.cache import invalidate_models
+from django_async_orm.executor import run_sync
+
+#: A batch that failed to be inserted, ``index`` is its position in the stream.
+BatchError = collections.namedtuple("BatchError", ["index", "size", "exception"])
+
+
+class BulkCreateResult:
+    """
+    Outcome of :func:`abulk_create_stream`.
+
+    :ivar created: Number of objects of the batches that succeeded. With
+        ``ignore_conflicts``, the objects skipped by the database are counted
+        too: ``bulk_create`` doesn't tell them apart
+    :ivar batches: Number of batches sent to the database
+    :ivar errors: A :class:`BatchError` per failed batch
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.batches = 0
+        self.errors = []
+
+    @property
+    def failed(self):
+        """
+        Number of objects of the failed batches, none of them were inserted.
+        """
+        return sum(error.size for error in self.errors)
+
+    def __repr__(self):
+        return (
+            f"<BulkCreateResult created={self.created} batches={self.batches} "
+            f"failed={self.failed}>"
+        )
+
+
+async def _aiterate(objs):
+    if hasattr(objs, "__aiter__"):
+        async for obj in objs:
+            yield obj
+    else:
+        for obj in objs:
+            yield obj
+
+
+async def abulk_create_stream(
+    queryset, objs, batch_size=1000, max_in_flight=2, **kwargs
+):
+    """
+    Inserts the objects of a stream with ``bulk_create``, ``batch_size``
+    objects at a time.
+
+    At most ``max_in_flight`` batches are sent to the database concurrently,
+    the stream isn't consumed further until one of them is done, so only
+    ``batch_size * (max_in_flight + 1)`` objects are held in memory. Each batch
+    is inserted in its own transaction, a failed batch is reported in the
+    result and the next ones are still inserted.
+
+    :param queryset: The queryset used to insert the objects
+    :type queryset: QuerySetAsync
+    :param objs: An async iterable, or an iterable, of model instances
+    :param batch_size: Number of objects per batch
+    :type batch_size: int
+    :param max_in_flight: Maximum number of batches running concurrently
+    :type max_in_flight: int
+    :param kwargs: Extra ``bulk_create`` arguments, with ``ignore_conflicts``
+        the count of created objects includes the skipped ones
+    :rtype: BulkCreateResult
+    """
+    if batch_size < 1 or max_in_flight < 1:
+        raise ValueError("batch_size and max_in_flight must be positive integers.")
+    result = BulkCreateResult()
+    slots = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+
+    async def insert(index, batch):
+        try:
+            created = await queryset._run("bulk_create", batch, **kwargs)
+        except Exception as e:
+            result.errors.append(BatchError(index, len(batch), e))
+        else:
+            result.created += len(created)
+        finally:
+            slots.release()
+
+    async def send(batch):
+        await slots.acquire()
+        task = asyncio.ensure_future(insert(result.batches, batch))
+        result.batches += 1
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    try:
+        batch = []
+        async for obj in _aiterate(objs):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                await send(batch)
+                batch = []
+        if batch:
+            await send(batch)
+        if tasks:
+            await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    result.errors.sort(key=lambda error: error.index)
+    return result
+
+
+def _chunks(objs, size):
+    return [objs[start : start + size] for start in range(0, len(objs), size)]
+
+
+async def _run_chunks(alias, func, chunks, max_in_flight, *args):
+    # One hop, hence one transaction, when chunks aren't run concurrently.
+    if max_in_flight == 1:
+        return [await run_sync(alias, func, chunks, *args)]
+    slots = asyncio.Semaphore(max_in_flight)
+
+    async def run(chunk):
+        async with slots:
+            return await run_sync(alias, func, [chunk], *args)
+
+    return await asyncio.gather(*(run(chunk) for chunk in chunks))
+
+
+def supports_update_from_values(connection):
+    """
+    Tells whether the backend can run ``UPDATE ... FROM (VALUES ...)``.
+    """
+    if connection.vendor == "postgresql":
+        return True
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= (3, 33, 0)
+    return False
+
+
+def compile_update_from_values(connection, model, fields, objs):
+    """
+    Compiles an ``UPDATE ... FROM (VALUES ...)`` statement setting ``fields``
+    on the rows of ``objs``, joined on their primary key.
+
+    :return: The sql and its params
+    :rtype: tuple
+    """
+    qn = connection.ops.quote_name
+    opts = model._meta
+    columns = [opts.pk, *fields]
+    if connection.vendor == "postgresql":
+        # VALUES columns have no type, cast them to the type of the target.
+        placeholders = [f"%s::{field.cast_db_type(connection)}" for field in columns]
+        names = [qn(f"c{index}") for index in range(len(columns))]
+        alias = f"{qn('v')} ({', '.join(names)})"
+    else:
+        placeholders = ["%s"] * len(columns)
+        names = [qn(f"column{index + 1}") for index in range(len(columns))]
+        alias = qn("v")
+    row = f"({', '.join(placeholders)})"
+    params = []
+    for obj in objs:
+        for field in columns:
+            params.append(
+                field.get_db_prep_save(getattr(obj, field.attname), connection)
+            )
+    table = qn(opts.db_table)
+    assignments = ", ".join(
+        f"{qn(field.column)} = {qn('v')}.{name}"
+        for field, name in zip(fields, names[1:])
+    )
+    sql = (
+        f"UPDATE {table} SET {assignments} "
+        f"FROM (VALUES {', '.join([row] * len(objs))}) AS {alias} "
+        f"WHERE {table}.{qn(opts.pk.column)} = {qn('v')}.{names[0]}"
+    )
+    return sql, params
+
+
+def _prepare_related_fields(obj, fields):
+    # The checks ``bulk_update`` runs on the related objects of ``obj``: from
+    # Django 4.0, restricted to ``fields`` from Django 4.1.
+    if django.VERSION >= (4, 1):
+        obj._prepare_related_fields_for_save(
+            operation_name="bulk_update", fields=fields
+        )
+    elif django.VERSION >= (4, 0):
+        obj._prepare_related_fields_for_save(operation_name="bulk_update")
+
+
+def _bulk_update(queryset, objs, fields, batch_size):
+    if django.VERSION >= (4, 0):
+        return queryset.bulk_update(objs, fields, batch_size)
+    # ``bulk_update`` doesn't return the number of rows before Django 4.0, it
+    # is the number of matching rows, counted before they are updated.
+    db = queryset._write_db
+    pks = list({obj.pk: None for obj in objs})
+    with transaction.atomic(using=db, savepoint=False):
+        rows = sum(
+            queryset.filter(pk__in=chunk).count()
+            for chunk in _chunks(pks, _batch_size(connections[db], None, 1))
+        )
+        queryset.bulk_update(objs, fields, batch_size)
+    return rows
+
+
+def _update_chunks(chunks, queryset, fields):
+    db = queryset._write_db
+    connection = connections[db]
+    rows = 0
+    with transaction.atomic(using=db, savepoint=False):
+        with connection.cursor() as cursor:
+            for chunk in chunks:
+                # Like ``bulk_update``, the first object wins for duplicate pks.
+                unique = {}
+                for obj in chunk:
+                    _prepare_related_fields(obj, fields)
+                    unique.setdefault(obj.pk, obj)
+                cursor.execute(
+                    *compile_update_from_values(
+                        connection, queryset.model, fields, list(unique.values())
+                    )
+                )
+                rows += cursor.rowcount
+    return rows
+
+
+def _upsert_chunks(chunks, queryset, update_fields, unique_fields):
+    db = queryset._write_db
+    created = 0
+    with transaction.atomic(using=db, savepoint=False):
+        for chunk in chunks:
+            created += len(
+                queryset.bulk_create(
+                    chunk,
+                    update_conflicts=True,
+                    update_fields=update_fields,
+                    unique_fields=unique_fields,
+                )
+            )
+    return created
+
+
+def _batch_size(connection, batch_size, columns):
+    max_params = connection.features.max_query_params
+    size = max(1, max_params // columns) if max_params else 1000
+    return min(batch_size, size) if batch_size else size
+
+
+async def abulk_update(queryset, objs, fields, batch_size=None, max_in_flight=1):
+    """
+    Updates ``fields`` on ``objs`` joining the table with a ``VALUES`` list
+    instead of the ``CASE WHEN`` expressions of ``bulk_update``, chunks are run
+    concurrently up to ``max_in_flight``.
+
+    With ``max_in_flight=1`` every chunk is updated in a single transaction,
+    otherwise each chunk is updated in its own one. Backends without
+    ``UPDATE ... FROM``, filtered querysets, fields of parent models and
+    expression values fall back to ``bulk_update``.
+
+    :param queryset: The queryset used to update the objects
+    :type queryset: QuerySetAsync
+    :param objs: Model instances with a primary key
+    :param fields: Names of the fields to update
+    :param batch_size: Maximum number of objects per statement
+    :type batch_size: int
+    :param max_in_flight: Maximum number of chunks running concurrently
+    :type max_in_flight: int
+    :return: Number of rows updated
+    :rtype: int
+    """
+    if batch_size is not None and batch_size <= 0:
+        raise ValueError("Batch size must be a positive integer.")
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be a positive integer.")
+    if not fields:
+        raise ValueError("Field names must be given to bulk_update().")
+    objs = tuple(objs)
+    if any(obj.pk is None for obj in objs):
+        raise ValueError("All bulk_update() objects must have a primary key set.")
+    opts = queryset.model._meta
+    fields = [opts.get_field(name) for name in fields]
+    if any(not field.concrete or field.many_to_many for field in fields):
+        raise ValueError("bulk_update() can only be used with concrete fields.")
+    if any(field.primary_key for field in fields):
+        raise ValueError("bulk_update() cannot be used with primary key fields.")
+    if not objs:
+        return 0
+    db = queryset._write_db
+    connection = connections[db]
+    if (
+        not supports_update_from_values(connection)
+        or queryset.query.where
+        or any(field not in opts.local_concrete_fields for field in fields)
+        or any(
+            hasattr(getattr(obj, field.attname), "resolve_expression")
+            for obj in objs
+            for field in fields
+        )
+    ):
+        try:
+            return await run_sync(
+                db,
+                _bulk_update,
+                queryset,
+                objs,
+                [field.name for field in fields],
+                batch_size,
+            )
+        finally:
+            invalidate_models(queryset.model)
+    size = _batch_size(connection, batch_size, len(fields) + 1)
+    try:
+        results = await _run_chunks(
+            db, _update_chunks, _chunks(objs, size), max_in_flight, queryset, fields
+        )
+    finally:
+        invalidate_models(queryset.model)
+    return sum(results)
+
+
+async def abulk_upsert(
+    queryset, objs, update_fields, unique_fields=None, batch_size=None, max_in_flight=1
+):
+    """
+    Inserts ``objs``, updating ``update_fields`` of the rows that conflict on
+    ``unique_fields`` instead (``INSERT ... ON CONFLICT DO UPDATE``), chunks
+    are run concurrently up to ``max_in_flight``.
+
+    :param queryset: The queryset used to insert the objects
+    :type queryset: QuerySetAsync
+    :param objs: Model instances
+    :param update_fields: Names of the fields updated on conflict
+    :param unique_fields: Names of the fields the conflicts are detected on
+    :param batch_size: Number of objects per statement
+    :type batch_size: int
+    :param max_in_flight: Maximum number of chunks running concurrently
+    :type max_in_flight: int
+    :return: Number of rows inserted or updated
+    :rtype: int
+    :raises NotSupportedError: Before Django 4.1
+    """
+    if django.VERSION < (4, 1):
+        raise NotSupportedError("abulk_upsert() requires Django 4.1 or later.")
+    if batch_size is not None and batch_size <= 0:
+        raise ValueError("Batch size must be a positive integer.")
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be a positive integer.")
+    objs = list(objs)
+    if not objs:
+        return 0
+    db = queryset._write_db
+    opts = queryset.model._meta
+    columns = len(opts.concrete_fields)
+    size = _batch_size(connections[db], batch_size, columns)
+    try:
+        results = await _run_chunks(
+            db,
+            _upsert_chunks,
+            _chunks(objs, size),
+            max_in_flight,
+            queryset,
+            update_fields,
+            unique_fields,
+        )
+    finally:
+        invalidate_models(queryset.model)
+    return sum(results)
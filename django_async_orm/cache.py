@@ -0,0 +1,315 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.signals import setting_changed
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.db.models.sql import Query
+from django.db.models.sql.where import WhereNode
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from django_async_orm.conf import get_setting
+from django_async_orm.engine import compile_query
+
+MISSING = object()
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+
+class BaseCacheBackend:
+    """
+    Interface of the query cache backends.
+
+    Values are stored along with the database tables they were read from so
+    writes to a table can drop every entry depending on it. Backends are used
+    from the event loop and from database threads, they must be thread safe.
+    """
+
+    def __init__(self, **options):
+        pass
+
+    def get(self, key):
+        """
+        :return: The cached value or ``MISSING``
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, timeout, tables):
+        raise NotImplementedError
+
+    def invalidate(self, tables):
+        """
+        Drops the entries read from any of ``tables``.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class LRUCacheBackend(BaseCacheBackend):
+    """
+    In process backend keeping at most ``MAX_ENTRIES`` entries, the least
+    recently used ones are evicted first.
+    """
+
+    def __init__(self, MAX_ENTRIES=1000, **options):
+        super().__init__(**options)
+        self.max_entries = MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._keys_by_table = {}
+        self._lock = threading.Lock()
+
+    def _delete(self, key):
+        _, _, tables = self._entries.pop(key)
+        for table in tables:
+            keys = self._keys_by_table[table]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_table[table]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] <= time.monotonic():
+                self._delete(key)
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, timeout, tables):
+        with self._lock:
+            if key in self._entries:
+                self._delete(key)
+            self._entries[key] = (time.monotonic() + timeout, value, tables)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._delete(next(iter(self._entries)))
+
+    def invalidate(self, tables):
+        with self._lock:
+            for table in tables:
+                for key in list(self._keys_by_table.get(table, ())):
+                    self._delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _copy(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return copy.deepcopy(value)
+
+
+def _query_tables(query):
+    # The tables of ``query`` and of its subqueries, in filters, annotations,
+    # ordering or combined queries.
+    tables = set()
+    queries = [query]
+    while queries:
+        query = queries.pop()
+        tables.update(
+            alias.table_name
+            for alias in query.alias_map.values()
+            if getattr(alias, "table_name", None)
+        )
+        queries.extend(query.combined_queries)
+        nodes = [query.where, *query.annotations.values(), *query.order_by]
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, Query):
+                queries.append(node)
+            elif isinstance(getattr(node, "query", None), Query):
+                queries.append(node.query)
+            elif isinstance(node, WhereNode):
+                nodes.extend(node.children)
+            elif hasattr(node, "get_source_expressions"):
+                nodes.extend(node.get_source_expressions())
+    return frozenset(tables)
+
+
+class QueryCache:
+    """
+    Caches the results of read queries, keyed on the compiled sql, its params,
+    the database alias and the kind of results (instances, ``values()``, ...).
+
+    Entries are dropped when one of the tables they were read from is written
+    through the ORM (``post_save``, ``post_delete``, ``m2m_changed`` and the
+    async queryset write methods) or once their timeout is over. Writes made
+    with raw sql or sync ``QuerySet.update()`` are not seen.
+
+    :param backend: The storage backend
+    :type backend: BaseCacheBackend
+    :param timeout: Default timeout in seconds, ``None`` to only cache the
+        models listed in ``model_timeouts``
+    :param model_timeouts: Timeouts per model label (``"app.Model"``), ``0``
+        disables caching for a model
+    :type model_timeouts: dict
+    """
+
+    def __init__(self, backend, timeout=None, model_timeouts=None):
+        self.backend = backend
+        self.timeout = timeout
+        self.model_timeouts = model_timeouts or {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._generation = 0
+
+    def timeout_for(self, model):
+        return self.model_timeouts.get(model._meta.label, self.timeout)
+
+    def make_key(self, method, queryset):
+        """
+        :return: The cache key and the tables read by the query, or ``None``
+            when the query can't be cached
+        """
+        if queryset.query.select_for_update:
+            return None
+        compiler, compiled = compile_query(queryset.query.chain(), queryset.db)
+        if compiled is None:
+            return None
+        sql, params = compiled
+        key = (
+            method,
+            queryset.db,
+            queryset._iterable_class,
+            queryset._fields,
+            sql,
+            tuple(params),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key, _query_tables(compiler.query)
+
+    async def get_or_compute(self, method, queryset, compute):
+        """
+        Returns the cached result of ``method`` on ``queryset`` or awaits
+        ``compute()`` and caches its result.
+        """
+        timeout = self.timeout_for(queryset.model)
+        made = self.make_key(method, queryset) if timeout else None
+        if made is None:
+            return await compute()
+        key, tables = made
+        value = self.backend.get(key)
+        if value is not MISSING:
+            self.hits += 1
+            return _copy(value)
+        self.misses += 1
+        generation = self._generation
+        value = await compute()
+        # Don't store a result that may predate a concurrent write.
+        if generation == self._generation:
+            self.backend.set(key, _copy(value), timeout, tables)
+        return value
+
+    def invalidate_tables(self, tables):
+        self._generation += 1
+        self.invalidations += 1
+        self.backend.invalidate(tables)
+
+    def invalidate_models(self, *models):
+        tables = set()
+        for model in models:
+            opts = model._meta
+            tables.add(opts.db_table)
+            tables.update(parent._meta.db_table for parent in opts.get_parent_list())
+        self.invalidate_tables(tables)
+
+    def stats(self):
+        """
+        :return: Hit and miss counters and the number of cached entries
+        :rtype: dict
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self.backend),
+        }
+
+
+def _invalidate_on_save_or_delete(sender, **kwargs):
+    if _query_cache is not None:
+        _query_cache.invalidate_models(sender)
+
+
+def _invalidate_on_m2m_changed(sender, instance, action, model, **kwargs):
+    if _query_cache is not None and action.startswith("post_"):
+        _query_cache.invalidate_models(sender, type(instance), model)
+
+
+def get_query_cache():
+    """
+    Returns the query cache configured by the ``ASYNC_ORM_CACHE`` setting::
+
+        ASYNC_ORM_CACHE = {
+            "BACKEND": "django_async_orm.cache.LRUCacheBackend",
+            "OPTIONS": {"MAX_ENTRIES": 1000},
+            "TIMEOUT": 60,
+            "MODELS": {"app.Model": 300},
+        }
+
+    Signal receivers invalidating the cache are only connected once it is
+    enabled, so deletes keep their fast path otherwise.
+
+    :return: The cache or ``None`` when caching is disabled
+    :rtype: QueryCache
+    """
+    global _query_cache
+    if _query_cache is not None:
+        return _query_cache
+    config = get_setting("CACHE")
+    if config is None:
+        return None
+    with _query_cache_lock:
+        if _query_cache is None:
+            backend_cls = import_string(
+                config.get("BACKEND", "django_async_orm.cache.LRUCacheBackend")
+            )
+            _query_cache = QueryCache(
+                backend_cls(**config.get("OPTIONS", {})),
+                timeout=config.get("TIMEOUT"),
+                model_timeouts=config.get("MODELS"),
+            )
+            post_save.connect(_invalidate_on_save_or_delete)
+            post_delete.connect(_invalidate_on_save_or_delete)
+            m2m_changed.connect(_invalidate_on_m2m_changed)
+    return _query_cache
+
+
+def invalidate_models(*models):
+    """
+    Drops the cached queries reading from the tables of ``models``.
+    """
+    if _query_cache is not None:
+        _query_cache.invalidate_models(*models)
+
+
+@receiver(setting_changed)
+def _reset_query_cache(setting, **kwargs):
+    global _query_cache
+    if setting == "ASYNC_ORM_CACHE":
+        with _query_cache_lock:
+            _query_cache = None
+            post_save.disconnect(_invalidate_on_save_or_delete)
+            post_delete.disconnect(_invalidate_on_save_or_delete)
+            m2m_changed.disconnect(_invalidate_on_m2m_changed)
@@ -0,0 +1,201 @@
+import array
+import datetime
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models.sql.constants import MULTI
+
+from django_async_orm.engine import compile_query, current_engine
+from django_async_orm.executor import run_sync
+
+#: ``array.array`` typecodes and NumPy dtypes of the columns stored in arrays,
+#: per internal field type.
+TYPECODES = {
+    "AutoField": ("q", "int64"),
+    "BigAutoField": ("q", "int64"),
+    "SmallAutoField": ("q", "int64"),
+    "IntegerField": ("q", "int64"),
+    "BigIntegerField": ("q", "int64"),
+    "SmallIntegerField": ("q", "int64"),
+    "PositiveIntegerField": ("q", "int64"),
+    "PositiveBigIntegerField": ("q", "int64"),
+    "PositiveSmallIntegerField": ("q", "int64"),
+    "FloatField": ("d", "float64"),
+    "BooleanField": ("b", "bool"),
+    # Microseconds since the epoch.
+    "DateTimeField": ("q", "datetime64[us]"),
+    # Days since the epoch.
+    "DateField": ("q", "datetime64[D]"),
+}
+
+EPOCH = datetime.datetime(1970, 1, 1)
+EPOCH_UTC = EPOCH.replace(tzinfo=datetime.timezone.utc)
+EPOCH_DATE = EPOCH.date()
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _datetime_to_int(value):
+    epoch = EPOCH if value.tzinfo is None else EPOCH_UTC
+    return (value - epoch) // ONE_MICROSECOND
+
+
+def _date_to_int(value):
+    return (value - EPOCH_DATE).days
+
+
+def import_numpy():
+    """
+    Imports NumPy on first use, it is heavy to import and only needed by
+    ``avalues_columns(numpy=True)``.
+    """
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        raise ImproperlyConfigured("avalues_columns(numpy=True) requires numpy.")
+    return numpy
+
+
+def _internal_type(field):
+    while field.is_relation:
+        field = field.target_field
+    return field.get_internal_type()
+
+
+class Column:
+    """
+    Accumulates the values of a result column, in an ``array.array`` when the
+    field type allows it or in a list otherwise. A column holding ``NULL``
+    values is turned into a list.
+
+    :param expression: The selected expression
+    :param converters: The backend converters of the expression
+    :type converters: list
+    """
+
+    def __init__(self, expression, converters=()):
+        self.expression = expression
+        self.converters = converters
+        output_field = expression._output_field_or_none
+        internal_type = output_field and _internal_type(output_field)
+        self.typecode, self.dtype = TYPECODES.get(internal_type, (None, None))
+        self.to_int = {
+            "DateTimeField": _datetime_to_int,
+            "DateField": _date_to_int,
+        }.get(internal_type)
+        self.values = array.array(self.typecode) if self.typecode else []
+
+    def extend(self, values, connection):
+        if self.converters:
+            values = list(values)
+            for converter in self.converters:
+                values = [
+                    converter(value, self.expression, connection) for value in values
+                ]
+        if isinstance(self.values, array.array):
+            if None in values:
+                self.values = self.values.tolist()
+            elif self.to_int is not None:
+                values = [self.to_int(value) for value in values]
+        self.values.extend(values)
+
+    def to_numpy(self):
+        numpy = import_numpy()
+        if isinstance(self.values, array.array):
+            return numpy.frombuffer(self.values, dtype=self.typecode).astype(self.dtype)
+        column = numpy.empty(len(self.values), dtype=object)
+        column[:] = self.values
+        return column
+
+
+class ColumnsBuilder:
+    """
+    Builds the columns of a ``values_list()`` queryset from raw rows.
+    """
+
+    def __init__(self, queryset, compiler):
+        self.fields = queryset._fields
+        self.connection = connections[queryset.db]
+        query = compiler.query
+        self.names = [
+            *query.extra_select,
+            *query.values_select,
+            *query.annotation_select,
+        ]
+        expressions = [select[0] for select in compiler.select]
+        converters = compiler.get_converters(expressions)
+        self.columns = [
+            Column(expression, converters.get(index, ((), None))[0])
+            for index, expression in enumerate(expressions)
+        ]
+        if len(self.names) != len(self.columns):
+            self.names = [column.expression.target.attname for column in self.columns]
+
+    def add(self, rows):
+        for column, values in zip(self.columns, zip(*rows)):
+            column.extend(values, self.connection)
+
+    def result(self, as_numpy=False):
+        columns = {
+            name: column.to_numpy() if as_numpy else column.values
+            for name, column in zip(self.names, self.columns)
+        }
+        if self.fields and set(self.fields) <= columns.keys():
+            columns = {
+                **{name: columns[name] for name in self.fields},
+                **columns,
+            }
+        return columns
+
+
+def _columns_queryset(queryset, fields, as_numpy):
+    if as_numpy:
+        import_numpy()
+    return queryset.values_list(*fields)
+
+
+def _fetch_columns(queryset, chunk_size, as_numpy):
+    compiler = queryset.query.get_compiler(using=queryset.db)
+    compiler.setup_query()
+    builder = ColumnsBuilder(queryset, compiler)
+    chunks = compiler.execute_sql(MULTI, chunked_fetch=True, chunk_size=chunk_size)
+    for rows in chunks:
+        builder.add(rows)
+    return builder.result(as_numpy)
+
+
+async def avalues_columns(queryset, *fields, chunk_size=2000, numpy=False):
+    """
+    Evaluates ``queryset.values_list(*fields)`` column by column.
+
+    Rows are read from the cursor ``chunk_size`` at a time and their values
+    appended to one column per field, no model instance, dict or tuple is kept
+    per row. Integer, float and boolean columns are ``array.array``, dates and
+    datetimes are stored as int64 days and microseconds since the epoch,
+    other columns, and columns holding ``NULL``, are lists.
+
+    :param queryset: The queryset to evaluate
+    :type queryset: QuerySetAsync
+    :param fields: Field or annotation names, every concrete field when empty
+    :param chunk_size: Number of rows fetched from the cursor at once
+    :type chunk_size: int
+    :param numpy: Return NumPy arrays instead, dates and datetimes as
+        ``datetime64`` and other columns as object arrays
+    :type numpy: bool
+    :return: The columns by name, in the order of ``fields``
+    :rtype: dict
+    """
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be strictly positive.")
+    as_numpy = numpy
+    queryset = _columns_queryset(queryset, fields, as_numpy)
+    engine = current_engine(queryset.db)
+    if engine is None or queryset.query.select_for_update:
+        return await run_sync(
+            queryset.db, _fetch_columns, queryset, chunk_size, as_numpy
+        )
+    compiler, compiled = compile_query(queryset.query, queryset.db)
+    builder = ColumnsBuilder(queryset, compiler)
+    if compiled is not None:
+        async for rows in engine.iter_chunks(*compiled, chunk_size=chunk_size):
+            builder.add(rows)
+    return builder.result(as_numpy)
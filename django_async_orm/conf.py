@@ -0,0 +1,37 @@
+from django.conf import settings
+
+DEFAULTS = {
+    # Database aliases whose reads run on a native async driver instead of
+    # going through a thread hop.
+    "NATIVE_DATABASES": (),
+    # Maximum number of native connections opened per database alias.
+    "NATIVE_POOL_SIZE": 10,
+    # Number of results yielded by ``async for`` before giving control back to
+    # the event loop.
+    "ITER_BATCH_SIZE": 100,
+    # Number of worker threads per database alias, aliases without an entry
+    # share channels' single database thread.
+    "EXECUTOR_WORKERS": {},
+    # Seconds each database call has to finish before its statement is
+    # interrupted, ``None`` for no limit. See ``django_async_orm.timeout``.
+    "QUERY_TIMEOUT": None,
+    # Replica aliases per primary alias, the reads of async calls on the
+    # primary are spread over them. See ``django_async_orm.routing``.
+    "REPLICAS": {},
+    # Seconds after which a read still running on a replica is also sent to
+    # another one, the first answer wins. ``None`` disables hedging.
+    "HEDGE_AFTER": None,
+    # Query cache configuration, see ``django_async_orm.cache.get_query_cache``.
+    "CACHE": None,
+}
+
+
+def get_setting(name):
+    """
+    Returns the value of the ``ASYNC_ORM_<name>`` setting or its default.
+
+    :param name: Setting name without the ``ASYNC_ORM_`` prefix
+    :type name: str
+    :return: The setting value
+    """
+    return getattr(settings, f"ASYNC_ORM_{name}", DEFAULTS[name])
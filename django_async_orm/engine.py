@@ -0,0 +1,375 @@
+import asyncio
+import contextlib
+import re
+import time
+
+from django.core.exceptions import EmptyResultSet
+from django.core.signals import setting_changed
+from django.db import connections
+from django.db.models.query import ModelIterable, get_related_populators
+from django.dispatch import receiver
+
+from django_async_orm.conf import get_setting
+from django_async_orm.executor import is_pinned
+from django_async_orm.instrumentation import current_event
+from django_async_orm.routing import track
+from django_async_orm.timeout import remaining, run_with_timeout
+
+try:
+    import aiosqlite
+except ImportError:  # pragma: no cover
+    aiosqlite = None
+
+try:
+    import psycopg
+except ImportError:  # pragma: no cover
+    psycopg = None
+
+
+FORMAT_QMARK_REGEX = re.compile(r"(?<!%)%s")
+
+_engines = {}
+
+
+def compile_query(query, using):
+    """
+    Compiles a query with the compiler of the given database.
+
+    :param query: A django sql query
+    :type query: django.db.models.sql.Query
+    :param using: A database alias
+    :type using: str
+    :return: The compiler and its ``(sql, params)`` or ``None`` when the query
+        can't return any row
+    :rtype: tuple
+    """
+    compiler = query.get_compiler(using=using)
+    try:
+        return compiler, compiler.as_sql()
+    except EmptyResultSet:
+        return compiler, None
+
+
+def build_instances(queryset, compiler, rows):
+    """
+    Turns raw rows into model instances the same way ``ModelIterable`` does.
+
+    :param queryset: The queryset that was compiled
+    :param compiler: The compiler used to produce the executed sql
+    :param rows: Raw rows as returned by the database driver
+    :return: A generator of model instances
+    """
+    db = queryset.db
+    select, klass_info, annotation_col_map = (
+        compiler.select,
+        compiler.klass_info,
+        compiler.annotation_col_map,
+    )
+    model_cls = klass_info["model"]
+    select_fields = klass_info["select_fields"]
+    model_fields_start, model_fields_end = select_fields[0], select_fields[-1] + 1
+    init_list = [
+        f[0].target.attname for f in select[model_fields_start:model_fields_end]
+    ]
+    related_populators = get_related_populators(klass_info, select, db)
+    for row in compiler.results_iter([rows]):
+        obj = model_cls.from_db(db, init_list, row[model_fields_start:model_fields_end])
+        for rel_populator in related_populators:
+            rel_populator.populate(row, obj)
+        if annotation_col_map:
+            for attr_name, col_pos in annotation_col_map.items():
+                setattr(obj, attr_name, row[col_pos])
+        yield obj
+
+
+class NativeEngine:
+    """
+    Runs compiled sql on a native async driver.
+
+    Connections are bound to the event loop that opened them, a new set of
+    connections is used whenever the running loop changes.
+    """
+
+    #: The driver module, ``None`` when it is not installed.
+    driver = None
+
+    def __init__(self, alias, pool_size):
+        self.alias = alias
+        self.pool_size = pool_size
+        self._loop = None
+        self._idle = []
+        self._semaphore = None
+
+    @property
+    def connection_params(self):
+        return connections[self.alias].get_connection_params()
+
+    def convert_query(self, sql):
+        return sql
+
+    async def connect(self):
+        raise NotImplementedError
+
+    async def close(self, conn):
+        await conn.close()
+
+    def discard(self, conn):
+        """
+        Drops an idle connection of a loop that no longer runs the queries, it
+        can't be awaited anymore.
+        """
+
+    async def interrupt(self, conn):
+        """
+        Interrupts the statement ``conn`` is running.
+        """
+
+    async def fetch_chunks(self, conn, sql, params, chunk_size, server_side=False):
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self.reset()
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.pool_size)
+
+    def reset(self):
+        """
+        Discards the idle connections, the next queries open new ones.
+        """
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            self.discard(conn)
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        self._bind_loop()
+        async with self._semaphore:
+            conn = self._idle.pop() if self._idle else await self.connect()
+            try:
+                yield conn
+            except BaseException:
+                # Cancelled or failed, don't wait for the statement to finish.
+                await self.interrupt(conn)
+                await self.close(conn)
+                raise
+            self._idle.append(conn)
+
+    async def iter_chunks(
+        self, sql, params, chunk_size=100, server_side=False, event=None
+    ):
+        """
+        Executes ``sql`` and yields lists of at most ``chunk_size`` raw rows.
+
+        With ``server_side`` the rows are kept on the database side until they
+        are fetched, on backends that support it.
+
+        Fetching each chunk is subject to the timeout of the current task, see
+        :func:`django_async_orm.timeout.query_timeout`.
+
+        :param event: The instrumentation event the query is recorded in,
+            defaults to the current one
+        """
+        event = event or current_event.get()
+        execution = 0.0
+        start = time.perf_counter()
+        with track(self.alias):
+            async with self.connection() as conn:
+                chunks = self.fetch_chunks(
+                    conn, self.convert_query(sql), params, chunk_size, server_side
+                )
+                try:
+                    while True:
+                        try:
+                            rows = await run_with_timeout(
+                                chunks.__anext__(), remaining()
+                            )
+                        except StopAsyncIteration:
+                            break
+                        execution += time.perf_counter() - start
+                        yield rows
+                        start = time.perf_counter()
+                finally:
+                    await chunks.aclose()
+                    if event is not None:
+                        event.native(sql, execution + time.perf_counter() - start)
+
+    async def fetch_rows(self, sql, params):
+        result = []
+        async for rows in self.iter_chunks(sql, params):
+            result.extend(rows)
+        return result
+
+    async def fetch_instances(self, queryset):
+        """
+        Evaluates a queryset and returns the list of model instances.
+        """
+        compiler, compiled = compile_query(queryset.query, queryset.db)
+        if compiled is None:
+            return []
+        rows = await self.fetch_rows(*compiled)
+        return list(build_instances(queryset, compiler, rows))
+
+    async def fetch_value(self, sql, params):
+        rows = await self.fetch_rows(sql, params)
+        return rows[0][0] if rows else None
+
+
+class SQLiteEngine(NativeEngine):
+    """
+    Native engine backed by ``aiosqlite``.
+
+    aiosqlite runs one thread per connection: the connections are kept by
+    their loop for the next queries, their threads are stopped once another
+    loop takes over and don't keep the process from exiting. Both rely on
+    internals of aiosqlite 0.22, the version ``tests/requirements.txt`` pins.
+    """
+
+    driver = aiosqlite
+
+    def convert_query(self, sql):
+        return FORMAT_QMARK_REGEX.sub("?", sql).replace("%%", "%")
+
+    async def connect(self):
+        wrapper = connections[self.alias]
+        params = self.connection_params
+        conn = aiosqlite.Connection(
+            lambda: wrapper.get_new_connection(params), iter_chunk_size=64
+        )
+        conn._thread.daemon = True
+        return await conn
+
+    def discard(self, conn):
+        # Connection.stop reports back to the running loop, which may be closed
+        # by the time the thread gets to it: nothing waits for the thread.
+        def close():
+            if conn._connection is not None:
+                conn._connection.close()
+                conn._connection = None
+            return aiosqlite.core._STOP_RUNNING_SENTINEL
+
+        conn._running = False
+        conn._tx.put_nowait((None, close))
+
+    async def interrupt(self, conn):
+        await conn.interrupt()
+
+    async def fetch_chunks(self, conn, sql, params, chunk_size, server_side=False):
+        # SQLite steps through the statement on each fetch, it never
+        # materializes the whole result set.
+        async with conn.execute(sql, params) as cursor:
+            while True:
+                rows = await cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+
+
+class PostgreSQLEngine(NativeEngine):
+    """
+    Native engine backed by psycopg 3 ``AsyncConnection``.
+    """
+
+    driver = psycopg
+
+    async def connect(self):
+        params = self.connection_params
+        for key in ("cursor_factory", "server_side_binding"):
+            params.pop(key, None)
+        return await psycopg.AsyncConnection.connect(autocommit=True, **params)
+
+    async def interrupt(self, conn):
+        if hasattr(conn, "cancel_safe"):
+            await conn.cancel_safe()
+        else:
+            # Before psycopg 3.2, cancelling blocks until the server answers.
+            await asyncio.get_running_loop().run_in_executor(None, conn.cancel)
+
+    async def fetch_chunks(self, conn, sql, params, chunk_size, server_side=False):
+        if not server_side:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            return
+        # Named cursors only live inside a transaction.
+        async with conn.transaction():
+            async with conn.cursor(name=f"_django_async_orm_{id(conn)}") as cursor:
+                await cursor.execute(sql, params)
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+
+
+ENGINES = {
+    "sqlite": SQLiteEngine,
+    "postgresql": PostgreSQLEngine,
+}
+
+
+def get_engine(alias):
+    """
+    Returns the native engine configured for a database alias.
+
+    :param alias: A database alias
+    :type alias: str
+    :return: The engine or ``None`` when the alias is not listed in
+        ``ASYNC_ORM_NATIVE_DATABASES`` or its driver is not installed
+    :rtype: NativeEngine
+    """
+    try:
+        return _engines[alias]
+    except KeyError:
+        pass
+    engine = None
+    if alias in get_setting("NATIVE_DATABASES"):
+        engine_cls = ENGINES.get(connections[alias].vendor)
+        if engine_cls is not None and engine_cls.driver is not None:
+            engine = engine_cls(alias, get_setting("NATIVE_POOL_SIZE"))
+    _engines[alias] = engine
+    return engine
+
+
+def current_engine(alias):
+    """
+    Returns the native engine the current task should use for ``alias``.
+
+    :return: The engine of :func:`get_engine`, or ``None`` while the task pins a
+        worker for ``alias``: its queries must see the pinned connection, and
+        its transaction
+    :rtype: NativeEngine
+    """
+    if is_pinned(alias):
+        return None
+    return get_engine(alias)
+
+
+def is_native_compatible(queryset):
+    """
+    Tells whether a queryset can be evaluated by a native engine.
+
+    Querysets that need the sync ORM during evaluation (row locks, non model
+    results, ...) keep going through a thread. Prefetching happens once the
+    rows are fetched, it doesn't prevent native evaluation.
+    """
+    return (
+        queryset._iterable_class is ModelIterable
+        and not queryset._known_related_objects
+        and not queryset.query.select_for_update
+    )
+
+
+@receiver(setting_changed)
+def _reset_engines(setting, **kwargs):
+    if setting.startswith("ASYNC_ORM_NATIVE") or setting == "DATABASES":
+        for engine in _engines.values():
+            if engine is not None:
+                engine.reset()
+        _engines.clear()
@@ -0,0 +1,416 @@
+import asyncio
+import contextlib
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from channels.db import database_sync_to_async
+from django.core.signals import setting_changed
+from django.db import OperationalError, connections
+from django.dispatch import receiver
+
+from django_async_orm.conf import get_setting
+from django_async_orm.instrumentation import current_event
+from django_async_orm.routing import track
+from django_async_orm.signals import dispatch, start_collecting, stop_collecting
+from django_async_orm.timeout import remaining, run_with_timeout
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+#: Workers pinned by the current task, per database alias.
+_pinned_workers = contextvars.ContextVar("django_async_orm_pinned_workers", default={})
+
+#: The batch collecting the calls of the current task, see ``agather``.
+current_batch = contextvars.ContextVar("django_async_orm_batch", default=None)
+
+# Sends the cancel requests of PostgreSQL, they wait for the server to answer:
+# the event loop thread, which cancels the calls, must not.
+_cancel_executor = ThreadPoolExecutor(thread_name_prefix="django_async_orm_cancel")
+
+
+def interrupt_connection(connection):
+    """
+    Interrupts the statement a connection is running, from another thread.
+
+    :param connection: A database connection wrapper
+    :return: Whether the backend supports interruption
+    :rtype: bool
+    """
+    raw = connection.connection
+    if raw is None:
+        return False
+    if connection.vendor == "sqlite":
+        raw.interrupt()
+        return True
+    if connection.vendor == "postgresql":
+        # psycopg >= 3.2 cancels through the newer libpq API, other drivers
+        # only have cancel().
+        getattr(raw, "cancel_safe", raw.cancel)()
+        return True
+    return False
+
+
+class Call:
+    """
+    A sync call sent to a database thread that can be interrupted: once
+    cancelled, it doesn't start, its running statement is interrupted on the
+    database and it can't execute any other.
+    """
+
+    __slots__ = ("alias", "func", "connection", "cancelled", "done", "_lock")
+
+    def __init__(self, alias, func):
+        self.alias = alias
+        self.func = func
+        self.connection = None
+        self.cancelled = False
+        self.done = False
+        self._lock = threading.Lock()
+
+    def _execute(self, execute, sql, params, many, context):
+        if self.cancelled:
+            raise OperationalError("Query cancelled.")
+        return execute(sql, params, many, context)
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            if self.cancelled:
+                raise OperationalError("Query cancelled.")
+            self.connection = connections[self.alias]
+        try:
+            with self.connection.execute_wrapper(self._execute):
+                return self.func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.done = True
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self.connection is None or self.done:
+                return
+            if self.connection.vendor != "postgresql":
+                interrupt_connection(self.connection)
+                return
+        _cancel_executor.submit(self._interrupt)
+
+    def _interrupt(self):
+        with self._lock:
+            # Past this point the connection may run the statements of another
+            # call.
+            if not self.done:
+                interrupt_connection(self.connection)
+
+
+def _ensure_usable_connections():
+    # What the request signals do for a request, before each call as channels'
+    # database_sync_to_async does: connections past CONN_MAX_AGE or left
+    # unusable by an error are closed, CONN_HEALTH_CHECKS run again. Never
+    # touch a connection in a transaction.
+    for conn in connections.all():
+        if conn.connection is not None and not conn.in_atomic_block:
+            conn.close_if_unusable_or_obsolete()
+
+
+class Worker:
+    """
+    A single thread running sync ORM code, it keeps its own database
+    connections between calls.
+
+    :param name: Name of the thread
+    :type name: str
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.pending = 0
+        self.reserved = False
+        self._holds = 0
+        self._check_next = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def _call(self, context, func, args, kwargs):
+        if self._check_next or not self._holds:
+            self._check_next = False
+            _ensure_usable_connections()
+        return context.run(func, *args, **kwargs)
+
+    @contextlib.contextmanager
+    def hold(self):
+        """
+        Keeps the connections of the worker as they are from one call to the
+        next inside the block, for transactions and cursors spanning several
+        calls: they are only checked before the first one.
+        """
+        self._check_next = not self._holds
+        self._holds += 1
+        try:
+            yield
+        finally:
+            self._holds -= 1
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs ``func`` in the worker thread and returns its result.
+        """
+        self.pending += 1
+        try:
+            return await asyncio.wrap_future(
+                self._executor.submit(
+                    self._call, contextvars.copy_context(), func, args, kwargs
+                )
+            )
+        finally:
+            self.pending -= 1
+
+    def _close_connections(self):
+        for conn in connections.all():
+            conn.close()
+
+    async def close(self):
+        """
+        Closes the connections opened by this worker and stops its thread.
+        """
+        await self.run(self._close_connections)
+        self._executor.shutdown(wait=False)
+
+
+class DatabaseExecutor:
+    """
+    Pool of workers dedicated to a database alias.
+
+    Calls go to the least busy worker that is not pinned by a task, each
+    worker holding its own connection so calls run in parallel.
+
+    :param alias: A database alias
+    :type alias: str
+    :param size: Number of workers
+    :type size: int
+    """
+
+    def __init__(self, alias, size):
+        self.alias = alias
+        self.workers = [
+            Worker(f"django_async_orm_{alias}_{index}") for index in range(size)
+        ]
+        self.submitted = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self):
+        """
+        Number of calls submitted to the pool that are not finished yet.
+        """
+        return sum(worker.pending for worker in self.workers)
+
+    def get_worker(self):
+        free = [worker for worker in self.workers if not worker.reserved]
+        return min(free, key=lambda worker: worker.pending)
+
+    async def run(self, func, *args, **kwargs):
+        self.submitted += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth + 1)
+        return await self.get_worker().run(func, *args, **kwargs)
+
+    def reserve(self):
+        """
+        Takes a worker out of the pool until it is released, at least one
+        worker always stays available to unpinned calls.
+
+        :return: The reserved worker or ``None`` when none can be spared
+        """
+        free = [worker for worker in self.workers if not worker.reserved]
+        if len(free) < 2:
+            return None
+        worker = min(free, key=lambda worker: worker.pending)
+        worker.reserved = True
+        return worker
+
+    def stats(self):
+        return {
+            "workers": len(self.workers),
+            "reserved": sum(worker.reserved for worker in self.workers),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "submitted": self.submitted,
+        }
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker._executor.shutdown(wait=False)
+
+
+def get_executor(alias):
+    """
+    Returns the pool of workers configured for a database alias.
+
+    :param alias: A database alias
+    :type alias: str
+    :return: The pool or ``None`` when the alias has no entry in
+        ``ASYNC_ORM_EXECUTOR_WORKERS``
+    :rtype: DatabaseExecutor
+    """
+    try:
+        return _executors[alias]
+    except KeyError:
+        pass
+    with _executors_lock:
+        if alias not in _executors:
+            size = get_setting("EXECUTOR_WORKERS").get(alias)
+            _executors[alias] = DatabaseExecutor(alias, size) if size else None
+        return _executors[alias]
+
+
+def get_worker(alias):
+    """
+    Returns the worker that should run the next call on ``alias``: the one
+    pinned by the current task, else the least busy worker of the pool.
+
+    :return: A worker or ``None`` when the alias uses the shared database thread
+    :rtype: Worker
+    """
+    worker = _pinned_workers.get().get(alias)
+    if worker is None:
+        executor = get_executor(alias)
+        if executor is not None:
+            worker = executor.get_worker()
+    return worker
+
+
+def is_pinned(alias):
+    """
+    Tells whether the current task has pinned a worker for ``alias``.
+    """
+    return alias in _pinned_workers.get()
+
+
+async def run_sync(alias, func, *args, **kwargs):
+    """
+    Runs sync ORM code for the database ``alias`` outside of the event loop.
+
+    Calls made inside an ``agather`` are collected and run together. Calls
+    made while a worker is pinned go to that worker, otherwise to the pool of
+    the alias, or to channels' shared database thread when no pool is
+    configured.
+
+    When the caller is cancelled, or the call exceeds its timeout (see
+    :func:`django_async_orm.timeout.query_timeout`), the statement running
+    on the database is interrupted and the call stops there.
+
+    Coroutine receivers of the signals sent by the call run once it returns,
+    see :func:`django_async_orm.signals.connect`.
+
+    :param alias: The database alias the code runs queries on
+    :type alias: str
+    :param func: A sync callable
+    :return: The result of ``func``
+    """
+    event = current_event.get()
+    if event is not None:
+        executor = get_executor(alias)
+        func = event.hop(
+            alias, func, executor.queue_depth if executor is not None else None
+        )
+    batch = current_batch.get()
+    if batch is not None:
+        return await batch.submit(alias, func, args, kwargs)
+    timeout = remaining()
+    call = Call(alias, func)
+    token = start_collecting()
+    try:
+        with track(alias):
+            result = await run_with_timeout(
+                _dispatch(alias, call, args, kwargs), timeout
+            )
+    except BaseException:
+        # Cancelled, or timed out: the thread must not keep working for nobody.
+        if not call.done:
+            call.cancel()
+        raise
+    finally:
+        pending = stop_collecting(token) if token is not None else None
+    if pending:
+        await dispatch(pending)
+    return result
+
+
+def _dispatch(alias, call, args, kwargs):
+    worker = _pinned_workers.get().get(alias)
+    if worker is not None:
+        return worker.run(call, *args, **kwargs)
+    executor = get_executor(alias)
+    if executor is not None:
+        return executor.run(call, *args, **kwargs)
+    return database_sync_to_async(call, thread_sensitive=True)(*args, **kwargs)
+
+
+@contextlib.asynccontextmanager
+async def pin(alias):
+    """
+    Pins a worker to the current task: every call made on ``alias`` inside the
+    block runs in the same thread, on the same connection, and no other task
+    uses that thread meanwhile.
+
+    When the pool can't spare a worker, or none is configured, a temporary
+    worker is started for the block.
+
+    :param alias: A database alias
+    :type alias: str
+    """
+    pinned = _pinned_workers.get()
+    if alias in pinned:
+        yield pinned[alias]
+        return
+    executor = get_executor(alias)
+    worker = executor.reserve() if executor is not None else None
+    temporary = worker is None
+    if temporary:
+        worker = Worker(f"django_async_orm_{alias}_pinned")
+    token = _pinned_workers.set({**pinned, alias: worker})
+    try:
+        with worker.hold():
+            yield worker
+    finally:
+        _pinned_workers.reset(token)
+        if temporary:
+            await worker.close()
+        else:
+            worker.reserved = False
+
+
+def detached_context():
+    """
+    Returns a new context for work done on behalf of several tasks: it keeps
+    the workers pinned by the current task, but none of its other state such
+    as its instrumentation event, replica routes or timeout.
+
+    :rtype: contextvars.Context
+    """
+    pinned = _pinned_workers.get()
+    context = contextvars.Context()
+    context.run(_pinned_workers.set, pinned)
+    return context
+
+
+def executor_stats():
+    """
+    Returns the metrics of every configured pool, per database alias.
+
+    :rtype: dict
+    """
+    return {
+        alias: executor.stats()
+        for alias, executor in list(_executors.items())
+        if executor is not None
+    }
+
+
+@receiver(setting_changed)
+def _reset_executors(setting, **kwargs):
+    if setting == "ASYNC_ORM_EXECUTOR_WORKERS" or setting == "DATABASES":
+        with _executors_lock:
+            for executor in _executors.values():
+                if executor is not None:
+                    executor.shutdown()
+            _executors.clear()
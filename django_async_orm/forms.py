@@ -0,0 +1,245 @@
+import asyncio
+import functools
+import operator
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import DEFAULT_DB_ALIAS, connection, router
+from django.db.models import Count, Q
+from django.forms.models import (
+    BaseModelForm,
+    ModelChoiceField,
+    ModelMultipleChoiceField,
+)
+
+from django_async_orm.engine import current_engine
+from django_async_orm.executor import get_executor, is_pinned, run_sync
+
+
+def _choice_lookup(field, value):
+    """
+    Returns ``(value, queryset)``, the queryset being the one cleaning
+    ``value`` with ``field`` evaluates, ``None`` when cleaning it doesn't run a
+    query or fails before.
+    """
+    key = field.to_field_name or "pk"
+    try:
+        if isinstance(field, ModelMultipleChoiceField):
+            value = field.prepare_value(value)
+            if not value or not isinstance(value, (list, tuple)):
+                return None
+            value = frozenset(value)
+            return value, field.queryset.filter(**{f"{key}__in": value})
+        if value in field.empty_values:
+            return None
+        if isinstance(value, field.queryset.model):
+            return value, field.queryset.filter(**{key: getattr(value, key)})
+        return value, field.queryset.filter(**{key: value})
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _runs_concurrently(alias):
+    # Queries on ``alias`` can overlap: it has a native engine or workers.
+    return current_engine(alias) is not None or (
+        get_executor(alias) is not None and not is_pinned(alias)
+    )
+
+
+async def _afetch(queryset):
+    if hasattr(queryset, "_afetch_all"):
+        await queryset._afetch_all()
+    else:
+        await run_sync(queryset.db, queryset._fetch_all)
+
+
+def _to_python(field, prefetched_value, queryset, value):
+    # ``ModelChoiceField.to_python`` reading the prefetched rows.
+    if value != prefetched_value or len(queryset) > 1:
+        return type(field).to_python(field, value)
+    if not queryset:
+        key = field.to_field_name or "pk"
+        if isinstance(value, field.queryset.model):
+            value = getattr(value, key)
+        raise ValidationError(
+            field.error_messages["invalid_choice"],
+            code="invalid_choice",
+            params={"value": value},
+        )
+    return queryset[0]
+
+
+def _check_values(field, prefetched_value, queryset, value):
+    # ``ModelMultipleChoiceField._check_values`` reading the prefetched rows.
+    key = field.to_field_name or "pk"
+    try:
+        value = frozenset(value)
+    except TypeError:
+        raise ValidationError(field.error_messages["invalid_list"], code="invalid_list")
+    if value != prefetched_value:
+        return type(field)._check_values(field, value)
+    for pk in value:
+        try:
+            field.queryset.filter(**{key: pk})
+        except (ValueError, TypeError):
+            raise ValidationError(
+                field.error_messages["invalid_pk_value"],
+                code="invalid_pk_value",
+                params={"pk": pk},
+            )
+    pks = {str(getattr(obj, key)) for obj in queryset}
+    for val in value:
+        if str(val) not in pks:
+            raise ValidationError(
+                field.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": val},
+            )
+    return queryset
+
+
+def _perform_unique_checks(instance, unique_checks):
+    """
+    ``Model._perform_unique_checks`` running the checks of each model class
+    in one query instead of one query per check.
+    """
+    checks = {}
+    for model_class, unique_check in unique_checks:
+        lookup_kwargs = {}
+        for field_name in unique_check:
+            f = instance._meta.get_field(field_name)
+            lookup_value = getattr(instance, f.attname)
+            if lookup_value is None or (
+                lookup_value == ""
+                and connection.features.interprets_empty_strings_as_nulls
+            ):
+                continue
+            if f.primary_key and not instance._state.adding:
+                continue
+            lookup_kwargs[str(field_name)] = lookup_value
+        if len(unique_check) != len(lookup_kwargs):
+            continue
+        checks.setdefault(model_class, []).append((unique_check, Q(**lookup_kwargs)))
+
+    errors = {}
+    for model_class, model_checks in checks.items():
+        qs = model_class._default_manager.filter(
+            functools.reduce(operator.or_, (lookup for _, lookup in model_checks))
+        )
+        model_class_pk = instance._get_pk_val(model_class._meta)
+        if not instance._state.adding and model_class_pk is not None:
+            qs = qs.exclude(pk=model_class_pk)
+        counts = qs.aggregate(
+            **{
+                f"check_{i}": Count("pk", filter=lookup)
+                for i, (_, lookup) in enumerate(model_checks)
+            }
+        )
+        for i, (unique_check, _) in enumerate(model_checks):
+            if counts[f"check_{i}"]:
+                key = unique_check[0] if len(unique_check) == 1 else NON_FIELD_ERRORS
+                errors.setdefault(key, []).append(
+                    instance.unique_error_message(model_class, unique_check)
+                )
+    return errors
+
+
+def validate_unique(instance, exclude=None):
+    """
+    ``Model.validate_unique`` with the unique fields and ``unique_together``
+    of each model class checked in a single query.
+
+    :param instance: The model instance
+    :param exclude: Names of the fields not to check
+    :raises ValidationError: When a value is already taken
+    """
+    unique_checks, date_checks = instance._get_unique_checks(exclude=exclude)
+    errors = _perform_unique_checks(instance, unique_checks)
+    for k, v in instance._perform_date_checks(date_checks).items():
+        errors.setdefault(k, []).extend(v)
+    if errors:
+        raise ValidationError(errors)
+
+
+def _validate_form_unique(form):
+    # ``ModelForm.validate_unique`` with :func:`validate_unique`.
+    try:
+        validate_unique(form.instance, exclude=form._get_validation_exclusions())
+    except ValidationError as e:
+        form._update_errors(e)
+
+
+async def afull_clean(form):
+    """
+    Async version of ``form.full_clean()``, running the queries of the
+    validation in a fixed number of round-trips:
+
+    - the rows selected in the ``ModelChoiceField`` and
+      ``ModelMultipleChoiceField`` fields are fetched concurrently before the
+      fields are cleaned, when their database has a native engine or a pool
+      of workers,
+    - the form is then cleaned in a single database hop, where the unique
+      checks of a ``ModelForm`` run in one query per model, see
+      :func:`validate_unique`.
+
+    ``clean()`` methods, validators and ``Meta.constraints`` run as usual,
+    in that hop.
+
+    :param form: A bound form
+    :type form: django.forms.BaseForm
+    """
+    lookups = {}
+    if form.is_bound:
+        # Form._bound_items only exists from Django 4.0.
+        for name, field in form.fields.items():
+            if isinstance(field, ModelChoiceField) and not field.disabled:
+                lookup = _choice_lookup(field, form[name].data)
+                if lookup is not None:
+                    lookups[name] = lookup
+    if len(lookups) > 1 and all(
+        _runs_concurrently(queryset.db) for _, queryset in lookups.values()
+    ):
+        await asyncio.gather(*(_afetch(queryset) for _, queryset in lookups.values()))
+    else:
+        # The lookups would run one after the other, they run in the hop.
+        lookups = {}
+
+    patched = []
+    for name, (value, queryset) in lookups.items():
+        field = form.fields[name]
+        if isinstance(field, ModelMultipleChoiceField):
+            field._check_values = functools.partial(
+                _check_values, field, value, queryset
+            )
+            patched.append((field, "_check_values"))
+        else:
+            field.to_python = functools.partial(_to_python, field, value, queryset)
+            patched.append((field, "to_python"))
+    if isinstance(form, BaseModelForm):
+        form.validate_unique = functools.partial(_validate_form_unique, form)
+        patched.append((form, "validate_unique"))
+        using = router.db_for_write(form._meta.model, instance=form.instance)
+    else:
+        using = DEFAULT_DB_ALIAS
+    try:
+        await run_sync(using, form.full_clean)
+    finally:
+        for obj, name in patched:
+            delattr(obj, name)
+
+
+async def ais_valid(form):
+    """
+    Async version of ``form.is_valid()``, the form is cleaned with
+    :func:`afull_clean`::
+
+        form = BookForm(request.POST)
+        if await ais_valid(form):
+            ...
+
+    :param form: A form
+    :type form: django.forms.BaseForm
+    :rtype: bool
+    """
+    if form.is_bound and form._errors is None:
+        await afull_clean(form)
+    return form.is_valid()
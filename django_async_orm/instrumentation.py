@@ -0,0 +1,363 @@
+import asyncio
+import bisect
+import contextvars
+import functools
+import logging
+import threading
+import time
+
+from django.db import connections
+
+from django_async_orm.routing import has_replicas, mark_written, route_read
+from django_async_orm.timeout import query_timeout
+
+logger = logging.getLogger("django_async_orm")
+
+_listeners = []
+
+#: The event of the ``QuerySetAsync`` call running in the current task.
+current_event = contextvars.ContextVar("django_async_orm_event", default=None)
+
+
+class QueryEvent:
+    """
+    Describes a ``QuerySetAsync`` call, listeners receive it once the call is
+    over. Durations are in seconds.
+
+    :ivar method: Name of the called method (``"aget"``, ``"acount"``, ...)
+    :ivar model: The model of the queryset
+    :ivar db: The database alias
+    :ivar task: The ``asyncio.Task`` that made the call
+    :ivar sql: The sql statements executed
+    :ivar hops: Number of calls sent to a database thread
+    :ivar queue_wait: Time spent waiting for a database thread to be free
+    :ivar queue_depth: Calls pending on the worker pool when the first hop was
+        submitted, ``None`` without pool
+    :ivar execution: Time spent running in a database thread, or waiting for
+        the native driver
+    :ivar sql_time: Part of ``execution`` spent executing sql, the rest is
+        spent fetching rows and building the results
+    :ivar signal_time: Time spent running the coroutine receivers of the
+        signals sent by the call, see :mod:`django_async_orm.signals`
+    :ivar duration: Total duration of the call
+    :ivar rows: Number of rows returned, or written by writes
+    :ivar exception: The exception raised by the call, if any
+    """
+
+    __slots__ = (
+        "method",
+        "model",
+        "db",
+        "task",
+        "write",
+        "sql",
+        "hops",
+        "queue_wait",
+        "queue_depth",
+        "execution",
+        "sql_time",
+        "signal_time",
+        "duration",
+        "rows",
+        "rows_written",
+        "exception",
+        "_lock",
+    )
+
+    def __init__(self, method, model, db, write=False):
+        self.method = method
+        self.model = model
+        self.db = db
+        self.write = write
+        try:
+            self.task = asyncio.current_task()
+        except RuntimeError:
+            self.task = None
+        self.sql = []
+        self.hops = 0
+        self.queue_wait = 0.0
+        self.queue_depth = None
+        self.execution = 0.0
+        self.sql_time = 0.0
+        self.signal_time = 0.0
+        self.duration = 0.0
+        self.rows = 0
+        self.rows_written = 0
+        self.exception = None
+        # Hops of concurrent sub tasks report from several threads.
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            f"<QueryEvent {self.model._meta.label}.{self.method} "
+            f"duration={self.duration * 1000:.3f}ms rows={self.rows}>"
+        )
+
+    def hop(self, alias, func, queue_depth=None):
+        """
+        Wraps ``func`` so its run in a database thread is measured.
+        """
+        if self.queue_depth is None:
+            self.queue_depth = queue_depth
+        submitted = time.perf_counter()
+
+        def execute(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                rowcount = context["cursor"].rowcount
+                with self._lock:
+                    self.sql_time += time.perf_counter() - start
+                    self.sql.append(sql)
+                    if rowcount > 0 and sql.lstrip()[:6].upper() != "SELECT":
+                        self.rows_written += rowcount
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with connections[alias].execute_wrapper(execute):
+                    return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.hops += 1
+                    self.queue_wait += start - submitted
+                    self.execution += time.perf_counter() - start
+
+        return wrapper
+
+    def native(self, sql, execution):
+        """
+        Records a query run on a native engine.
+        """
+        with self._lock:
+            self.sql.append(sql)
+            self.execution += execution
+            self.sql_time += execution
+
+
+def add_listener(listener):
+    """
+    Registers a callable receiving a :class:`QueryEvent` after each
+    ``QuerySetAsync`` call. Listeners run in the event loop, they must be quick.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def _count_rows(result):
+    if result is None:
+        return 0
+    if isinstance(result, (list, tuple, dict)):
+        return len(result)
+    return 1
+
+
+def start_event(method, queryset, write=False):
+    """
+    :return: A new event or ``None`` when nobody listens or the call is made
+        by another instrumented call
+    :rtype: QueryEvent
+    """
+    if not _listeners or current_event.get() is not None:
+        return None
+    return QueryEvent(method, queryset.model, queryset.db, write)
+
+
+def finish_event(event, start, rows=None):
+    event.duration = time.perf_counter() - start
+    if event.write:
+        event.rows = event.rows_written
+    elif rows is not None:
+        event.rows = rows
+    for listener in list(_listeners):
+        try:
+            listener(event)
+        except Exception:
+            logger.exception("Query listener %r failed.", listener)
+
+
+def instrumented(func=None, *, name=None, write=False, count_rows=_count_rows):
+    """
+    Decorates an async ``QuerySetAsync`` method so listeners are notified of
+    its calls, calls made while nobody listens only pay for a list check. The
+    timeout set with ``QuerySetAsync.atimeout`` applies to the whole call.
+
+    Reads are routed to a replica of the database when it has some, writes
+    send the next reads of the task to the primary, see
+    :mod:`django_async_orm.routing`.
+
+    :param name: Method name reported in events, defaults to the method's
+    :param write: Whether ``rows`` counts written rows instead of results
+    :param count_rows: Returns the number of rows of a result
+    """
+    if func is None:
+        return functools.partial(
+            instrumented, name=name, write=write, count_rows=count_rows
+        )
+    method = name or func.__name__
+
+    async def call(self, *args, **kwargs):
+        event = start_event(method, self, write)
+        if event is None:
+            if write:
+                return await func(self, *args, **kwargs)
+            return await route_read(func, self, args, kwargs)
+        token = current_event.set(event)
+        start = time.perf_counter()
+        result = None
+        try:
+            if write:
+                result = await func(self, *args, **kwargs)
+            else:
+                result = await route_read(func, self, args, kwargs, event)
+            return result
+        except BaseException as e:
+            event.exception = e
+            raise
+        finally:
+            current_event.reset(token)
+            finish_event(event, start, count_rows(result))
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        if write and has_replicas():
+            mark_written(self._write_db)
+        timeout = getattr(self, "_timeout", None)
+        if timeout is None:
+            return await call(self, *args, **kwargs)
+        with query_timeout(timeout):
+            return await call(self, *args, **kwargs)
+
+    return wrapper
+
+
+class Histogram:
+    """
+    Counts durations in buckets of increasing width.
+
+    :param bounds: Upper bounds of the buckets in seconds, a last bucket
+        counts the values above the last bound
+    :type bounds: list
+    """
+
+    BOUNDS = (
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+
+    def __init__(self, bounds=BOUNDS):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """
+        :return: Upper bound of the bucket holding the ``percent`` percentile
+        """
+        if not self.count:
+            return 0.0
+        rank = percent / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+            "buckets": {
+                f"{bound * 1000:g}ms": count
+                for bound, count in zip(self.bounds, self.buckets)
+                if count
+            },
+        }
+
+
+class StatsCollector:
+    """
+    Listener aggregating events per model and method: number of calls,
+    errors, rows and histograms of the durations::
+
+        collector = StatsCollector()
+        add_listener(collector)
+        ...
+        collector.snapshot()["app.Model.aget"]["duration"]["p99_ms"]
+    """
+
+    TIMINGS = ("duration", "queue_wait", "execution", "sql_time", "signal_time")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def __call__(self, event):
+        key = f"{event.model._meta.label}.{event.method}"
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    "calls": 0,
+                    "errors": 0,
+                    "rows": 0,
+                    "hops": 0,
+                    **{timing: Histogram() for timing in self.TIMINGS},
+                }
+            stats["calls"] += 1
+            stats["errors"] += event.exception is not None
+            stats["rows"] += event.rows
+            stats["hops"] += event.hops
+            for timing in self.TIMINGS:
+                stats[timing].observe(getattr(event, timing))
+
+    def snapshot(self):
+        """
+        :return: The aggregated statistics, by ``"app_label.Model.method"``
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                key: {
+                    name: value.as_dict() if isinstance(value, Histogram) else value
+                    for name, value in stats.items()
+                }
+                for key, stats in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
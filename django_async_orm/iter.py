@@ -1,9 +1,23 @@
 import asyncio
 
+from django_async_orm.conf import get_setting
+
 
 class AsyncIter:
-    def __init__(self, iterable):
+    """
+    Iterates over a sync iterable, giving control back to the event loop every
+    ``batch_size`` elements.
+
+    :param iterable: Any iterable already held in memory
+    :param batch_size: Number of elements yielded between two context switches,
+        defaults to the ``ASYNC_ORM_ITER_BATCH_SIZE`` setting
+    :type batch_size: int
+    """
+
+    def __init__(self, iterable, batch_size=None):
         self._iter = iter(iterable)
+        self._batch_size = batch_size or get_setting("ITER_BATCH_SIZE")
+        self._count = 0
 
     def __aiter__(self):
         return self
@@ -13,5 +27,7 @@ class AsyncIter:
             element = next(self._iter)
         except StopIteration as e:
             raise StopAsyncIteration from e
-        await asyncio.sleep(0)
+        self._count += 1
+        if self._count % self._batch_size == 0:
+            await asyncio.sleep(0)
         return element
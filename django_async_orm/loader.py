@@ -0,0 +1,83 @@
+import asyncio
+import weakref
+
+from django.core.exceptions import FieldDoesNotExist
+
+
+class ModelLoader:
+    """
+    Coalesces the lookups on a unique field made during the same event loop
+    iteration into a single ``in_bulk`` query, like a DataLoader.
+
+    Concurrent callers asking for the same value share the same instance.
+
+    :param manager: The async manager the lookups are made on
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._pending = weakref.WeakKeyDictionary()
+
+    def _get_field(self, field_name):
+        opts = self.manager.model._meta
+        if field_name == "pk":
+            return opts.pk
+        try:
+            field = opts.get_field(field_name)
+        except FieldDoesNotExist:
+            field = None
+        if field is None or field.is_relation or not field.unique:
+            raise ValueError(
+                f"aload() only supports 'pk' or a unique, non relational field of "
+                f"{opts.object_name}, got {field_name!r}."
+            )
+        return field
+
+    def load(self, field_name, value):
+        """
+        Schedules the lookup of ``field_name=value``.
+
+        :return: A future resolved with the instance or with a ``DoesNotExist``
+        :rtype: asyncio.Future
+        """
+        field = self._get_field(field_name)
+        value = field.to_python(value)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.get(loop)
+        if pending is None:
+            pending = self._pending[loop] = {}
+            loop.call_soon(self._flush, loop)
+        pending.setdefault(field_name, {}).setdefault(value, []).append(future)
+        return future
+
+    def _flush(self, loop):
+        pending = self._pending.pop(loop, {})
+        for field_name, futures in pending.items():
+            asyncio.ensure_future(self._resolve(field_name, futures))
+
+    async def _resolve(self, field_name, futures):
+        queryset = self.manager.get_queryset()
+        try:
+            objs = await queryset.ain_bulk(list(futures), field_name=field_name)
+        except Exception as e:
+            for value_futures in futures.values():
+                for future in value_futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        model = self.manager.model
+        for value, value_futures in futures.items():
+            obj = objs.get(value)
+            for future in value_futures:
+                if future.done():
+                    continue
+                if obj is None:
+                    future.set_exception(
+                        model.DoesNotExist(
+                            "%s matching query does not exist."
+                            % model._meta.object_name
+                        )
+                    )
+                else:
+                    future.set_result(obj)
@@ -1,7 +1,41 @@
 from django.db.models.manager import BaseManager
 
+from django_async_orm.loader import ModelLoader
 from django_async_orm.query import QuerySetAsync
 
 
 class AsyncManager(BaseManager.from_queryset(QuerySetAsync)):
-    pass
+    #: Whether the querysets of the manager are evaluated in a thread when sync
+    #: code evaluates them on the event loop thread, see
+    #: ``QuerySetAsync._fetch_all``. Only ``Model.objects`` opts in.
+    _sync_in_thread = False
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self._sync_in_thread:
+            queryset._sync_in_thread = True
+        return queryset
+
+    @property
+    def loader(self):
+        try:
+            return self.__dict__["_loader"]
+        except KeyError:
+            return self.__dict__.setdefault("_loader", ModelLoader(self))
+
+    async def aload(self, **kwargs):
+        """
+        Fetches one object by primary key or by a unique field, concurrent calls
+        made during the same event loop iteration are resolved with a single
+        query::
+
+            authors = await asyncio.gather(
+                *(Author.objects.aload(pk=pk) for pk in pks)
+            )
+
+        :raises Model.DoesNotExist: when no object matches
+        """
+        if len(kwargs) != 1:
+            raise TypeError("aload() takes exactly one lookup, e.g. aload(pk=1).")
+        ((field_name, value),) = kwargs.items()
+        return await self.loader.load(field_name, value)
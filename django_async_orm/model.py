@@ -0,0 +1,198 @@
+import inspect
+
+from django.db import router
+from django.db.models import Model
+
+from django_async_orm.cache import invalidate_models
+from django_async_orm.executor import run_sync
+from django_async_orm.routing import mark_written
+
+# In place mutations of these values can't be detected, fields holding them
+# are always saved.
+_MUTABLE_TYPES = (dict, list, set, bytearray)
+
+
+def _tracking_from_db(from_db):
+    def wrapper(cls, db, field_names, values):
+        instance = from_db.__func__(cls, db, field_names, values)
+        # Kept as loaded, the dict is only built when the instance is saved.
+        instance._state.db_values = (field_names, values)
+        return instance
+
+    wrapper.tracks_db_values = True
+    return classmethod(wrapper)
+
+
+def _db_values(instance):
+    db_values = getattr(instance._state, "db_values", None)
+    if isinstance(db_values, tuple):
+        db_values = instance._state.db_values = dict(zip(*db_values))
+    return db_values
+
+
+def _snapshot(instance, attnames=None):
+    db_values = _db_values(instance)
+    if db_values is None:
+        db_values = instance._state.db_values = {}
+    if attnames is None:
+        deferred = instance.get_deferred_fields()
+        attnames = [
+            field.attname
+            for field in instance._meta.concrete_fields
+            if field.attname not in deferred
+        ]
+    for attname in attnames:
+        db_values[attname] = getattr(instance, attname)
+
+
+def changed_fields(instance):
+    """
+    Returns the names of the fields changed since the instance was loaded or
+    saved with :func:`asave`, the ones ``asave(only_changed=True)`` writes.
+
+    :param instance: A model instance
+    :type instance: models.Model
+    :return: The field names or ``None`` when the instance isn't tracked: it
+        was never saved nor loaded from the database
+    :rtype: list
+    """
+    db_values = _db_values(instance)
+    if db_values is None or instance._state.adding:
+        return None
+    loaded = instance.__dict__
+    changed = []
+    for field in instance._meta.concrete_fields:
+        attname = field.attname
+        if attname not in loaded:
+            continue
+        value = loaded[attname]
+        if attname not in db_values or isinstance(value, _MUTABLE_TYPES):
+            changed.append(field.name)
+            continue
+        old = db_values[attname]
+        if value is not old and value != old:
+            changed.append(field.name)
+    return changed
+
+
+async def asave(
+    self,
+    force_insert=False,
+    force_update=False,
+    using=None,
+    update_fields=None,
+    *,
+    only_changed=False,
+):
+    """
+    Saves the instance in a database thread, like ``save()``.
+
+    With ``only_changed``, only the fields changed since the instance was
+    loaded are written, and nothing is sent when no field changed. Values set
+    by an overridden ``save()`` or a ``pre_save`` receiver are not among them,
+    they are not written. Instances that were never loaded, or whose primary
+    key changed, are still fully saved.
+
+    :param only_changed: Only write the fields changed since the instance was
+        loaded, with its ``auto_now`` fields
+    :type only_changed: bool
+    """
+    if only_changed and update_fields is None and not force_insert:
+        changed = changed_fields(self)
+        if changed is not None and self._meta.pk.name not in changed:
+            if not changed:
+                return
+            update_fields = changed + [
+                field.name
+                for field in self._meta.concrete_fields
+                if getattr(field, "auto_now", False) and field.name not in changed
+            ]
+    using = using or router.db_for_write(self.__class__, instance=self)
+    mark_written(using)
+    try:
+        await run_sync(
+            using,
+            self.save,
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+    finally:
+        invalidate_models(self.__class__)
+    if update_fields is None:
+        _snapshot(self)
+    else:
+        _snapshot(self, [self._meta.get_field(name).attname for name in update_fields])
+
+
+asave.alters_data = True
+
+
+async def adelete(self, using=None, keep_parents=False):
+    """
+    Deletes the instance in a database thread.
+    """
+    using = using or router.db_for_write(self.__class__, instance=self)
+    mark_written(using)
+    try:
+        return await run_sync(
+            using, self.delete, using=using, keep_parents=keep_parents
+        )
+    finally:
+        invalidate_models(self.__class__)
+
+
+adelete.alters_data = True
+
+
+async def arefresh_from_db(self, using=None, fields=None):
+    """
+    Reloads the values of ``fields``, or of every non deferred field, from the
+    database. Other fields keep their value and their changes.
+    """
+    if fields is not None:
+        fields = list(fields)
+        attnames = [self._meta.get_field(name).attname for name in fields]
+    else:
+        attnames = None
+        deferred = self.get_deferred_fields()
+    await run_sync(
+        using or router.db_for_read(self.__class__, instance=self),
+        self.refresh_from_db,
+        using=using,
+        fields=fields,
+    )
+    if attnames is None:
+        attnames = [
+            field.attname
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        ]
+    _snapshot(self, attnames)
+
+
+#: The async methods patched on models, by name.
+MODEL_METHODS = {
+    "asave": asave,
+    "adelete": adelete,
+    "arefresh_from_db": arefresh_from_db,
+}
+
+
+def patch_model(model):
+    """
+    Adds the async instance methods to a model and tracks the values its
+    instances are loaded with.
+
+    Methods defined by the model or one of its abstract parents are kept.
+
+    :param model: A django model class
+    :type model: models.Model
+    """
+    for name, method in MODEL_METHODS.items():
+        if getattr(model, name, None) is getattr(Model, name, None):
+            setattr(model, name, method)
+    from_db = inspect.getattr_static(model, "from_db")
+    if not getattr(from_db.__func__, "tracks_db_values", False):
+        model.from_db = _tracking_from_db(from_db)
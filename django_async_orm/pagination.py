@@ -0,0 +1,178 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+DEFAULT_LIMIT = 100
+
+
+class Page:
+    """
+    A page of results returned by :func:`apaginate`.
+
+    :ivar items: The objects of the page
+    :ivar next_cursor: Cursor to pass as ``after`` to get the next page,
+        ``None`` on the last page
+    :ivar has_next: Whether more objects follow this page
+    """
+
+    def __init__(self, items, next_cursor, has_next):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.has_next = has_next
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __repr__(self):
+        return f"<Page items={len(self.items)} has_next={self.has_next}>"
+
+
+def _ordering(queryset, order_by):
+    """
+    Returns the ordering as ``(name, field, descending)`` tuples, ended by the
+    primary key so it is total.
+    """
+    if order_by is None:
+        order_by = queryset.query.order_by or queryset.model._meta.ordering
+    opts = queryset.model._meta
+    ordering = []
+    for name in order_by:
+        if not isinstance(name, str) or name.lstrip("-") == "?":
+            raise ValueError(
+                f"Keyset pagination needs field names to order by, got {name!r}."
+            )
+        descending = name.startswith("-")
+        field_name = name.lstrip("-")
+        try:
+            field = opts.pk if field_name == "pk" else opts.get_field(field_name)
+        except FieldDoesNotExist:
+            field = None
+        if field is None or not field.concrete or field.many_to_many:
+            raise ValueError(
+                f"Keyset pagination can only order by fields of "
+                f"{opts.label}, got {name!r}."
+            )
+        if field.null:
+            raise ValueError(
+                f"Keyset pagination can't order by the nullable field {name!r}."
+            )
+        ordering.append((name, field, descending))
+        if field.primary_key:
+            break
+    else:
+        # Descending when the last field is, the index can be scanned backward.
+        descending = bool(ordering) and ordering[-1][2]
+        ordering.append(("-pk" if descending else "pk", opts.pk, descending))
+    return ordering
+
+
+def _encode_cursor(ordering, obj):
+    payload = [
+        [name for name, _, _ in ordering],
+        [field.value_to_string(obj) for _, field, _ in ordering],
+    ]
+    data = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _decode_cursor(ordering, cursor):
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        names, values = json.loads(data)
+        if names != [name for name, _, _ in ordering] or len(values) != len(names):
+            raise ValueError
+        return [
+            field.to_python(value) for (_, field, _), value in zip(ordering, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, ValidationError):
+        raise ValueError("Invalid cursor for this ordering.") from None
+
+
+def _after(ordering, values):
+    """
+    Builds the keyset predicate selecting the rows that follow ``values``:
+    ``a > x OR (a = x AND (b > y OR (b = y AND ...)))`` for ascending fields.
+    The leading ``a >= x`` lets the database seek the index of ``a``.
+    """
+    predicate = None
+    for (_, field, descending), value in reversed(list(zip(ordering, values))):
+        lookup = "lt" if descending else "gt"
+        following = Q(**{f"{field.attname}__{lookup}": value})
+        if predicate is not None:
+            following |= Q(**{field.attname: value}) & predicate
+        predicate = following
+    (_, field, descending), value = ordering[0], values[0]
+    lookup = "lte" if descending else "gte"
+    return Q(**{f"{field.attname}__{lookup}": value}) & predicate
+
+
+async def apaginate(queryset, order_by=None, after=None, limit=DEFAULT_LIMIT):
+    """
+    Returns a page of ``queryset`` with keyset pagination: the page starts
+    after the row the cursor points to instead of skipping rows with
+    ``OFFSET``, so every page costs the same whatever its depth::
+
+        page = await Book.objects.apaginate(order_by=["-created_at"], limit=50)
+        while page.has_next:
+            page = await Book.objects.apaginate(
+                order_by=["-created_at"], after=page.next_cursor, limit=50
+            )
+
+    The ordering should follow an index. It is completed with the primary key
+    so rows with equal values are neither repeated nor skipped. Relations are
+    ordered by their column, not by the ordering of the related model.
+
+    :param queryset: The queryset to paginate, it can be filtered
+    :param order_by: Names of non nullable fields of the model, prefixed with
+        ``-`` for a descending order, defaults to the ordering of the queryset
+    :type order_by: list
+    :param after: ``next_cursor`` of the previous page, ``None`` for the first
+        page
+    :type after: str
+    :param limit: Maximum number of objects of the page
+    :type limit: int
+    :rtype: Page
+    :raises ValueError: When the ordering or the cursor can't be used
+    """
+    if limit <= 0:
+        raise ValueError("Limit must be strictly positive.")
+    if queryset.query.is_sliced:
+        raise TypeError("Cannot paginate a query once a slice has been taken.")
+    ordering = _ordering(queryset, order_by)
+    # Ordered by the columns the cursor compares: a relation would otherwise
+    # follow the ordering of the related model.
+    queryset = queryset.order_by(
+        *(f"-{field.attname}" if desc else field.attname for _, field, desc in ordering)
+    )
+    if after is not None:
+        queryset = queryset.filter(_after(ordering, _decode_cursor(ordering, after)))
+    items = await queryset[: limit + 1].alist()
+    has_next = len(items) > limit
+    del items[limit:]
+    next_cursor = _encode_cursor(ordering, items[-1]) if has_next else None
+    return Page(items, next_cursor, has_next)
+
+
+async def aiter_pages(queryset, order_by=None, limit=DEFAULT_LIMIT, after=None):
+    """
+    Walks a ``QuerySetAsync`` page by page with :func:`apaginate`::
+
+        async for page in Book.objects.aiter_pages(limit=1000):
+            for book in page:
+                ...
+
+    :return: An async generator of :class:`Page`
+    """
+    while True:
+        page = await queryset.apaginate(order_by=order_by, after=after, limit=limit)
+        if page.items:
+            yield page
+        if not page.has_next:
+            return
+        after = page.next_cursor
@@ -0,0 +1,59 @@
+import asyncio
+
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.constants import LOOKUP_SEP
+
+from django_async_orm.executor import run_sync
+
+
+def _roots(lookup):
+    # The attributes of the instances the lookup starts from: the relation it
+    # follows and, with a ``to_attr``, the one it fills.
+    if isinstance(lookup, Prefetch):
+        paths = (lookup.prefetch_through, lookup.prefetch_to)
+    else:
+        paths = (lookup,)
+    return {path.split(LOOKUP_SEP)[0] for path in paths}
+
+
+def _group(lookups):
+    groups = []
+    for lookup in lookups:
+        roots, group = _roots(lookup), []
+        for other in [other for other in groups if other[0] & roots]:
+            groups.remove(other)
+            roots |= other[0]
+            group += other[1]
+        groups.append((roots, group + [lookup]))
+    return [group for _, group in groups]
+
+
+async def aprefetch_related_objects(model_instances, *related_lookups):
+    """
+    Async version of ``prefetch_related_objects``.
+
+    Lookups are grouped by the relation they start from, groups are
+    independent and are prefetched concurrently while nested lookups
+    (``books__reviews``) are prefetched after their parent, in the same group.
+    A lookup starting from the ``to_attr`` of a ``Prefetch`` is in the group of
+    that ``Prefetch``.
+
+    :param model_instances: Instances of the same model
+    :type model_instances: list
+    :param related_lookups: Lookups as accepted by ``prefetch_related``
+    """
+    if not model_instances:
+        return
+    # Groups fill the caches of the same instances from several threads, create
+    # them upfront so no thread replaces a cache another one is filling.
+    for obj in model_instances:
+        obj._state.fields_cache
+        if not hasattr(obj, "_prefetched_objects_cache"):
+            obj._prefetched_objects_cache = {}
+    using = model_instances[0]._state.db
+    await asyncio.gather(
+        *(
+            run_sync(using, prefetch_related_objects, model_instances, *lookups)
+            for lookups in _group(related_lookups)
+        )
+    )
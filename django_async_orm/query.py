@@ -1,21 +1,61 @@
-import concurrent
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import inspect
+import itertools
+import time
 import warnings
 
+from asgiref.sync import sync_to_async as asgiref_sync_to_async
 from channels.db import database_sync_to_async as sync_to_async
+from django.db import NotSupportedError, connections, router
 from django.db.models import QuerySet
-
+from django.db.models.query import MAX_GET_RESULTS
+
+from django_async_orm.bulk import abulk_create_stream, abulk_update, abulk_upsert
+from django_async_orm.cache import get_query_cache, invalidate_models
+from django_async_orm.columns import avalues_columns
+from django_async_orm.engine import (
+    build_instances,
+    compile_query,
+    current_engine,
+    is_native_compatible,
+)
+from django_async_orm.executor import Call, get_worker, is_pinned, run_sync
+from django_async_orm.instrumentation import finish_event, instrumented, start_event
 from django_async_orm.iter import AsyncIter
+from django_async_orm.pagination import DEFAULT_LIMIT, aiter_pages, apaginate
+from django_async_orm.prefetch import aprefetch_related_objects
+from django_async_orm.routing import choose_replica, read_alias
+from django_async_orm.sharding import ShardedQuerySet
+from django_async_orm.timeout import query_timeout, remaining, run_with_timeout
+
+# Used when a queryset of ``Model.objects`` is evaluated synchronously from the
+# event loop thread (``len(qs)``, ``qs[0]``, ...), so the loop thread never
+# touches the database.
+_fetch_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="django_async_orm"
+)
 
 
-def __deprecation_warning():
+def _deprecation_warning():
     warnings.warn(
         "Methods starting with `async_*` are deprecated and will be "
         "removed in a future release. Use `a*` methods instead.",
         category=DeprecationWarning,
-        stacklevel=2,
+        stacklevel=3,
     )
 
 
+def _column_length(columns):
+    return len(next(iter(columns.values()), ()))
+
+
+async def _resolved(value):
+    return value
+
+
 def _prefer_django(method):
     """Decorator used to prioritize Django's QuerySet methods over our custom ones.
 
@@ -30,403 +70,576 @@ def _prefer_django(method):
 
 
 class QuerySetAsync(QuerySet):
+    #: Sync methods that write to the database, they run on the write database.
+    _write_methods = frozenset(
+        {
+            "create",
+            "bulk_create",
+            "bulk_update",
+            "get_or_create",
+            "update_or_create",
+            "delete",
+            "update",
+        }
+    )
+
+    #: Seconds the calls of the queryset have to finish, see ``atimeout``.
+    _timeout = None
+
+    #: Whether sync evaluation on the event loop thread runs in a thread, see
+    #: ``_fetch_all``.
+    _sync_in_thread = False
+
     def __init__(self, model=None, query=None, using=None, hints=None):
         super().__init__(model, query, using, hints)
 
-    @_prefer_django
-    async def aget(self, *args, **kwargs):
-        return await sync_to_async(self.get, thread_sensitive=True)(*args, **kwargs)
+    def _clone(self):
+        clone = super()._clone()
+        if self._timeout is not None:
+            clone._timeout = self._timeout
+        if self._sync_in_thread:
+            clone._sync_in_thread = True
+        return clone
+
+    def atimeout(self, seconds):
+        """
+        Returns a copy of the queryset whose async calls have ``seconds`` to
+        finish, their statement is interrupted on the database past that
+        delay and :class:`django_async_orm.timeout.QueryTimeout` is raised.
+        ``aiterator`` gives that time to each chunk.
+
+        :param seconds: The timeout, ``None`` for none
+        :type seconds: float
+        """
+        clone = self._chain()
+        clone._timeout = seconds
+        return clone
 
-    @_prefer_django
-    async def acreate(self, **kwargs):
-        return await sync_to_async(self.create, thread_sensitive=True)(**kwargs)
+    @property
+    def db(self):
+        """
+        The database the queryset reads from: the replica chosen for the
+        current call when its database has replicas, see
+        :mod:`django_async_orm.routing`.
+        """
+        db = super().db
+        if self._for_write or self._db is not None:
+            return db
+        return read_alias(db)
 
-    @_prefer_django
-    async def abulk_create(self, obs, batch_size=None, ignore_conflicts=False):
-        return await sync_to_async(self.bulk_create, thread_sensitive=True)(
-            obs, batch_size=batch_size, ignore_conflicts=ignore_conflicts
+    @property
+    def _write_db(self):
+        return self._db or router.db_for_write(self.model, **self._hints)
+
+    async def _run(self, method, *args, **kwargs):
+        """
+        Runs the sync queryset method ``method`` in a database thread.
+        """
+        if method not in self._write_methods:
+            return await run_sync(self.db, getattr(self, method), *args, **kwargs)
+        try:
+            return await run_sync(
+                self._write_db, getattr(self, method), *args, **kwargs
+            )
+        finally:
+            invalidate_models(self.model)
+
+    async def _cached(self, method, queryset, compute):
+        """
+        Returns the result of ``compute()`` through the query cache when it is
+        enabled, ``queryset`` being the one the cache key is computed from.
+        """
+        cache = get_query_cache()
+        if cache is None or is_pinned(queryset.db):
+            return await compute()
+        return await cache.get_or_compute(method, queryset, compute)
+
+    @_prefer_django
+    @instrumented
+    async def aget(self, *args, **kwargs):
+        if self.query.combinator or get_query_cache() is None:
+            return await self._aget(*args, **kwargs)
+        return await self._cached(
+            "get",
+            self.filter(*args, **kwargs),
+            functools.partial(self._aget, *args, **kwargs),
         )
 
-    @_prefer_django
-    async def abulk_update(self, objs, fields, batch_size=None):
-        return await sync_to_async(self.bulk_update, thread_sensitive=True)(
-            objs=objs, fields=fields, batch_size=batch_size
+    async def _aget(self, *args, **kwargs):
+        if current_engine(self.db) is None:
+            return await self._run("get", *args, **kwargs)
+        if self.query.combinator and (args or kwargs):
+            raise NotSupportedError(
+                "Calling QuerySet.get(...) with filters after %s() is not "
+                "supported." % self.query.combinator
+            )
+        clone = self._chain() if self.query.combinator else self.filter(*args, **kwargs)
+        if self.query.can_filter() and not self.query.distinct_fields:
+            clone = clone.order_by()
+        clone.query.set_limits(high=MAX_GET_RESULTS)
+        results = await clone._afetch_results()
+        num = len(results)
+        if num == 1:
+            return results[0]
+        if not num:
+            raise self.model.DoesNotExist(
+                "%s matching query does not exist." % self.model._meta.object_name
+            )
+        raise self.model.MultipleObjectsReturned(
+            "get() returned more than one %s -- it returned %s!"
+            % (
+                self.model._meta.object_name,
+                num if num < MAX_GET_RESULTS else f"more than {MAX_GET_RESULTS - 1}",
+            )
         )
 
-    @_prefer_django
-    async def aget_or_create(self, defaults=None, **kwargs):
-        return await sync_to_async(self.get_or_create, thread_sensitive=True)(
-            defaults=defaults, **kwargs
+    @instrumented(write=True)
+    async def abulk_create_stream(
+        self, objs, batch_size=1000, max_in_flight=2, ignore_conflicts=False
+    ):
+        """
+        Inserts the objects of an async iterable in batches, with at most
+        ``max_in_flight`` batches sent to the database at once.
+
+        :rtype: django_async_orm.bulk.BulkCreateResult
+        """
+        return await abulk_create_stream(
+            self,
+            objs,
+            batch_size=batch_size,
+            max_in_flight=max_in_flight,
+            ignore_conflicts=ignore_conflicts,
         )
 
     @_prefer_django
-    async def aupdate_or_create(self, defaults=None, **kwargs):
-        return await sync_to_async(self.update_or_create, thread_sensitive=True)(
-            defaults=defaults, **kwargs
+    @instrumented(write=True)
+    async def abulk_update(self, objs, fields, batch_size=None, max_in_flight=1):
+        return await abulk_update(
+            self, objs, fields, batch_size=batch_size, max_in_flight=max_in_flight
         )
 
-    @_prefer_django
-    async def aearliest(self, *fields):
-        return await sync_to_async(self.earliest, thread_sensitive=True)(*fields)
+    @instrumented(write=True)
+    async def abulk_upsert(
+        self,
+        objs,
+        update_fields,
+        unique_fields=None,
+        batch_size=None,
+        max_in_flight=1,
+    ):
+        return await abulk_upsert(
+            self,
+            objs,
+            update_fields,
+            unique_fields=unique_fields,
+            batch_size=batch_size,
+            max_in_flight=max_in_flight,
+        )
 
-    @_prefer_django
-    async def alatest(self, *fields):
-        return await sync_to_async(self.latest, thread_sensitive=True)(*fields)
+    @instrumented(count_rows=len)
+    async def apaginate(self, order_by=None, after=None, limit=DEFAULT_LIMIT):
+        """
+        Returns a page of results with keyset pagination, see
+        :func:`django_async_orm.pagination.apaginate`.
 
-    @_prefer_django
-    async def afirst(self):
-        return await sync_to_async(self.first, thread_sensitive=True)()
+        :rtype: django_async_orm.pagination.Page
+        """
+        return await apaginate(self, order_by=order_by, after=after, limit=limit)
 
-    @_prefer_django
-    async def anone(self):
-        return await sync_to_async(self.none, thread_sensitive=True)()
+    def aiter_pages(self, order_by=None, limit=DEFAULT_LIMIT, after=None):
+        """
+        Returns an async generator walking the results page by page.
+        """
+        return aiter_pages(self, order_by=order_by, limit=limit, after=after)
 
-    @_prefer_django
-    async def alast(self):
-        return await sync_to_async(self.last, thread_sensitive=True)()
+    def ashards(self, aliases):
+        """
+        Returns the queryset run on every database of ``aliases`` at once,
+        see :class:`django_async_orm.sharding.ShardedQuerySet`.
 
-    @_prefer_django
-    async def ain_bulk(self, id_list=None, *_, field_name="pk"):
-        return await sync_to_async(self.in_bulk, thread_sensitive=True)(
-            id_list=id_list, *_, field_name=field_name
-        )
+        :param aliases: The database aliases of the shards
+        :type aliases: list
+        :rtype: django_async_orm.sharding.ShardedQuerySet
+        """
+        return ShardedQuerySet(self, aliases)
 
     @_prefer_django
-    async def adelete(self):
-        return await sync_to_async(self.delete, thread_sensitive=True)()
+    @instrumented
+    async def afirst(self):
+        return await self._cached("first", self, self._afirst)
+
+    async def _afirst(self):
+        if current_engine(self.db) is None:
+            return await self._run("first")
+        queryset = (self if self.ordered else self.order_by("pk"))[:1]
+        results = await queryset._afetch_results()
+        return results[0] if results else None
 
     @_prefer_django
-    async def aupdate(self, **kwargs):
-        return await sync_to_async(self.update, thread_sensitive=True)(**kwargs)
+    @instrumented
+    async def alast(self):
+        return await self._cached("last", self, self._alast)
+
+    async def _alast(self):
+        if current_engine(self.db) is None:
+            return await self._run("last")
+        queryset = (self.reverse() if self.ordered else self.order_by("-pk"))[:1]
+        results = await queryset._afetch_results()
+        return results[0] if results else None
 
     @_prefer_django
+    @instrumented
     async def aexists(self):
-        return await sync_to_async(self.exists, thread_sensitive=True)()
+        if self._result_cache is not None:
+            return bool(self._result_cache)
+        return await self._cached("exists", self, self._aexists)
+
+    async def _aexists(self):
+        engine = current_engine(self.db)
+        if engine is None:
+            return await self._run("exists")
+        compiled = self._compile_subquery()
+        if compiled is None:
+            return False
+        sql, params = compiled
+        return bool(
+            await engine.fetch_rows(f"SELECT 1 FROM ({sql}) subquery LIMIT 1", params)
+        )
 
     @_prefer_django
+    @instrumented
     async def acount(self):
-        return await sync_to_async(self.count, thread_sensitive=True)()
-
-    @_prefer_django
-    async def aexplain(self, *_, format=None, **options):
-        return await sync_to_async(self.explain, thread_sensitive=True)(
-            *_, format=format, **options
+        if self._result_cache is not None:
+            return len(self._result_cache)
+        return await self._cached("count", self, self._acount)
+
+    async def _acount(self):
+        engine = current_engine(self.db)
+        if engine is None:
+            return await self._run("count")
+        compiled = self._compile_subquery()
+        if compiled is None:
+            return 0
+        sql, params = compiled
+        return await engine.fetch_value(
+            f"SELECT COUNT(*) FROM ({sql}) subquery", params
         )
 
     @_prefer_django
-    async def araw(self, raw_query, params=None, translations=None, using=None):
-        return await sync_to_async(self.raw, thread_sensitive=True)(
-            raw_query, params=params, translations=translations, using=using
+    @instrumented
+    async def alist(self):
+        """
+        Evaluates the queryset and returns its results as a list.
+        """
+        await self._afetch_all()
+        return list(self._result_cache)
+
+    def _compile_subquery(self):
+        """
+        Compiles this queryset without ordering nor select_related so it can be
+        wrapped in an outer ``SELECT``.
+        """
+        query = self.query.chain()
+        query.clear_ordering(True)
+        query.select_related = False
+        return compile_query(query, self.db)[1]
+
+    async def _afetch_all(self):
+        """
+        Fills the result cache, using the native engine of the database when one
+        is configured and the queryset allows it.
+        """
+        if self._result_cache is None:
+            self._result_cache = await self._cached("fetch", self, self._afetch_results)
+        if self._prefetch_related_lookups and not self._prefetch_done:
+            await aprefetch_related_objects(
+                self._result_cache, *self._prefetch_related_lookups
+            )
+            self._prefetch_done = True
+
+    async def _afetch_results(self):
+        engine = current_engine(self.db)
+        if engine is not None and is_native_compatible(self):
+            return await engine.fetch_instances(self)
+        return await run_sync(self.db, lambda: list(self._iterable_class(self)))
+
+    @_prefer_django
+    @instrumented(count_rows=_column_length)
+    async def avalues_columns(self, *fields, chunk_size=2000, numpy=False):
+        """
+        Returns the values of ``fields`` column by column, in arrays where the
+        field types allow it, see :func:`django_async_orm.columns.avalues_columns`.
+
+        :rtype: dict
+        """
+        return await avalues_columns(self, *fields, chunk_size=chunk_size, numpy=numpy)
+
+    async def aiterator(self, chunk_size=2000):
+        """
+        Yields the results chunk by chunk instead of loading them all in the
+        result cache, server side cursors are used where the database supports
+        them.
+
+        :param chunk_size: Number of rows fetched from the database at once
+        :type chunk_size: int
+        """
+        if self._prefetch_related_lookups:
+            raise NotSupportedError(
+                "Using QuerySet.aiterator() after prefetch_related() is not supported."
+            )
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be strictly positive.")
+        # The whole iteration reads from the same replica.
+        replica = choose_replica(self)
+        if replica is not None:
+            self = self.using(replica.alias)
+        use_chunked_fetch = not connections[self.db].settings_dict.get(
+            "DISABLE_SERVER_SIDE_CURSORS"
         )
+        # Events are finished by hand, the generator shares the context of the
+        # code iterating it so it can't be the current event.
+        event = start_event("aiterator", self)
+        start = time.perf_counter()
+        count = 0
+        try:
+            async for obj in self._aiterator(chunk_size, use_chunked_fetch, event):
+                count += 1
+                yield obj
+        except Exception as e:
+            if event is not None:
+                event.exception = e
+            raise
+        finally:
+            if event is not None:
+                finish_event(event, start, count)
+
+    async def _aiterator(self, chunk_size, use_chunked_fetch, event):
+        engine = current_engine(self.db)
+        if engine is not None and is_native_compatible(self):
+            compiler, compiled = compile_query(self.query, self.db)
+            if compiled is None:
+                return
+            chunks = engine.iter_chunks(
+                *compiled,
+                chunk_size=chunk_size,
+                server_side=use_chunked_fetch,
+                event=event,
+            )
+            while True:
+                # The timeout of the queryset applies to each chunk.
+                with query_timeout(self._timeout):
+                    try:
+                        rows = await chunks.__anext__()
+                    except StopAsyncIteration:
+                        break
+                for obj in build_instances(self, compiler, rows):
+                    yield obj
+            return
+
+        iterator = None
+
+        def next_chunk():
+            nonlocal iterator
+            # Some iterables run their query as soon as they are iterated,
+            # it must happen in the database thread.
+            if iterator is None:
+                iterator = iter(
+                    self._iterable_class(
+                        self, chunked_fetch=use_chunked_fetch, chunk_size=chunk_size
+                    )
+                )
+            return list(itertools.islice(iterator, chunk_size))
+
+        def close_iterator():
+            # Only generators hold a cursor to close.
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+        # The cursor stays open between chunks, every chunk must be fetched by
+        # the same thread and connections are only cleaned up once the
+        # iteration is over.
+        worker = get_worker(self.db)
+        if worker is None:
+
+            def run_chunk(func):
+                return asgiref_sync_to_async(func, thread_sensitive=True)()
+
+            close = sync_to_async(close_iterator, thread_sensitive=True)
+            hold = contextlib.nullcontext()
+        else:
+            run_chunk = worker.run
+            close = functools.partial(worker.run, close_iterator)
+            hold = worker.hold()
+        with hold:
+            try:
+                while True:
+                    call = Call(
+                        self.db,
+                        next_chunk if event is None else event.hop(self.db, next_chunk),
+                    )
+                    try:
+                        with query_timeout(self._timeout):
+                            chunk = await run_with_timeout(run_chunk(call), remaining())
+                    except BaseException:
+                        if not call.done:
+                            call.cancel()
+                        raise
+                    for obj in chunk:
+                        yield obj
+                    if len(chunk) < chunk_size:
+                        break
+            finally:
+                await close()
 
     @_prefer_django
     def __aiter__(self):
-        self._fetch_all()
-        return AsyncIter(self._result_cache)
+        async def generator():
+            await self._aiter_fetch()
+            async for obj in AsyncIter(self._result_cache):
+                yield obj
+
+        return generator()
+
+    @instrumented(name="aiter")
+    async def _aiter_fetch(self):
+        await self._afetch_all()
+        return self._result_cache
 
     def _fetch_all(self):
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future_fetch_all = executor.submit(super(QuerySetAsync, self)._fetch_all)
+        # Sync evaluation on the event loop thread blocks the loop until the
+        # query is done, on another connection than the caller's. Querysets of
+        # ``Model.objects`` keep doing so, others raise
+        # ``SynchronousOnlyOperation`` like Django, as do all of them while the
+        # task pins a worker: the query would run outside of its transaction.
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return super()._fetch_all()
+        if not self._sync_in_thread or is_pinned(self.db):
+            return super()._fetch_all()
+        _fetch_executor.submit(super()._fetch_all).result()
 
     ##################################################################
     # PUBLIC METHODS THAT ALTER ATTRIBUTES AND RETURN A NEW QUERYSET #
     ##################################################################
 
-    @_prefer_django
-    async def aall(self):
-        return await sync_to_async(self.all, thread_sensitive=True)()
-
-    @_prefer_django
-    async def afilter(self, *args, **kwargs):
-        return await sync_to_async(self.filter, thread_sensitive=True)(*args, **kwargs)
-
-    @_prefer_django
-    async def aexclude(self, *args, **kwargs):
-        return await sync_to_async(self.exclude, thread_sensitive=True)(*args, **kwargs)
-
-    @_prefer_django
-    async def acomplex_filter(self, filter_obj):
-        return await sync_to_async(self.complex_filter, thread_sensitive=True)(
-            filter_obj
-        )
+    # Building a queryset never touches the database, these methods (generated
+    # from ``ASYNC_METHODS``) return the new queryset right away. It can still
+    # be awaited (awaiting a queryset returns it as is) so
+    # ``await qs.afilter(...)`` keeps working, and calls can be chained:
+    # ``qs.afilter(...).aorder_by(...)``. The database is only hit once, when
+    # the result is evaluated.
 
-    @_prefer_django
-    async def aunion(self, *other_qs, all=False):
-        return await sync_to_async(self.union, thread_sensitive=True)(
-            *other_qs, all=all
-        )
-
-    @_prefer_django
-    async def aintersection(self, *other_qs):
-        return await sync_to_async(self.intersection, thread_sensitive=True)(*other_qs)
+    def __await__(self):
+        return _resolved(self).__await__()
 
     @_prefer_django
-    async def adifference(self, *other_qs):
-        return await sync_to_async(self.difference, thread_sensitive=True)(*other_qs)
-
-    @_prefer_django
-    async def aselect_for_update(self, nowait=False, skip_locked=False, of=()):
-        return await sync_to_async(self.select_for_update, thread_sensitive=True)(
-            nowait=nowait, skip_locked=skip_locked, of=of
-        )
-
-    @_prefer_django
-    async def aprefetch_related(self, *lookups):
-        return await sync_to_async(self.prefetch_related, thread_sensitive=True)(
-            *lookups
-        )
-
-    @_prefer_django
-    async def aannotate(self, *args, **kwargs):
-        return await sync_to_async(self.annotate, thread_sensitive=True)(
-            *args, **kwargs
-        )
-
-    @_prefer_django
-    async def aorder_by(self, *field_names):
-        return await sync_to_async(self.order_by, thread_sensitive=True)(*field_names)
-
-    @_prefer_django
-    async def adistinct(self, *field_names):
-        return await sync_to_async(self.distinct, thread_sensitive=True)(*field_names)
-
-    @_prefer_django
-    async def aextra(
-        self,
-        select=None,
-        where=None,
-        params=None,
-        tables=None,
-        order_by=None,
-        select_params=None,
-    ):
-        return await sync_to_async(self.extra, thread_sensitive=True)(
-            select, where, params, tables, order_by, select_params
-        )
-
-    @_prefer_django
-    async def areverse(self):
-        return await sync_to_async(self.reverse, thread_sensitive=True)()
-
-    @_prefer_django
-    async def adefer(self, *fields):
-        return await sync_to_async(self.defer, thread_sensitive=True)(*fields)
-
-    @_prefer_django
-    async def aonly(self, *fields):
-        return await sync_to_async(self.only, thread_sensitive=True)(*fields)
-
-    @_prefer_django
-    async def ausing(self, alias):
-        return await sync_to_async(self.using, thread_sensitive=True)(alias)
-
-    @_prefer_django
-    async def aresolve_expression(self, *args, **kwargs):
-        return await sync_to_async(self.resolve_expression, thread_sensitive=True)(
-            *args, **kwargs
-        )
+    def aresolve_expression(self, *args, **kwargs):
+        return _resolved(self.resolve_expression(*args, **kwargs))
 
     @property
     @_prefer_django
-    async def aordered(self):
-        def _ordered():
-            return super(QuerySetAsync, self).ordered
-
-        return await sync_to_async(_ordered, thread_sensitive=True)()
-
-    #################################
-    ### START OF DEPRECATION ZONE ###
-    #################################
-
-    async def async_get(self, *args, **kwargs):
-        __deprecation_warning()
-        return await sync_to_async(self.get, thread_sensitive=True)(*args, **kwargs)
-
-    async def async_create(self, **kwargs):
-        __deprecation_warning()
-        return await sync_to_async(self.create, thread_sensitive=True)(**kwargs)
-
-    async def async_bulk_create(self, obs, batch_size=None, ignore_conflicts=False):
-        __deprecation_warning()
-        return await sync_to_async(self.bulk_create, thread_sensitive=True)(
-            obs, batch_size=batch_size, ignore_conflicts=ignore_conflicts
-        )
-
-    async def async_bulk_update(self, objs, fields, batch_size=None):
-        __deprecation_warning()
-        return await sync_to_async(self.bulk_update, thread_sensitive=True)(
-            objs=objs, fields=fields, batch_size=batch_size
-        )
-
-    async def async_get_or_create(self, defaults=None, **kwargs):
-        __deprecation_warning()
-        return await sync_to_async(self.get_or_create, thread_sensitive=True)(
-            defaults=defaults, **kwargs
-        )
-
-    async def async_update_or_create(self, defaults=None, **kwargs):
-        __deprecation_warning()
-        return await sync_to_async(self.update_or_create, thread_sensitive=True)(
-            defaults=defaults, **kwargs
-        )
-
-    async def async_earliest(self, *fields):
-        __deprecation_warning()
-        return await sync_to_async(self.earliest, thread_sensitive=True)(*fields)
-
-    async def async_latest(self, *fields):
-        __deprecation_warning()
-        return await sync_to_async(self.latest, thread_sensitive=True)(*fields)
-
-    async def async_first(self):
-        __deprecation_warning()
-        return await sync_to_async(self.first, thread_sensitive=True)()
-
-    async def async_none(self):
-        __deprecation_warning()
-        return await sync_to_async(self.none, thread_sensitive=True)()
-
-    async def async_last(self):
-        __deprecation_warning()
-        return await sync_to_async(self.last, thread_sensitive=True)()
-
-    async def async_in_bulk(self, id_list=None, *_, field_name="pk"):
-        __deprecation_warning()
-        return await sync_to_async(self.in_bulk, thread_sensitive=True)(
-            id_list=id_list, *_, field_name=field_name
-        )
-
-    async def async_delete(self):
-        __deprecation_warning()
-        return await sync_to_async(self.delete, thread_sensitive=True)()
-
-    async def async_update(self, **kwargs):
-        __deprecation_warning()
-        return await sync_to_async(self.update, thread_sensitive=True)(**kwargs)
-
-    async def async_exists(self):
-        __deprecation_warning()
-        return await sync_to_async(self.exists, thread_sensitive=True)()
-
-    async def async_count(self):
-        __deprecation_warning()
-        return await sync_to_async(self.count, thread_sensitive=True)()
-
-    async def async_explain(self, *_, format=None, **options):
-        __deprecation_warning()
-        return await sync_to_async(self.explain, thread_sensitive=True)(
-            *_, format=format, **options
-        )
-
-    async def async_raw(self, raw_query, params=None, translations=None, using=None):
-        __deprecation_warning()
-        return await sync_to_async(self.raw, thread_sensitive=True)(
-            raw_query, params=params, translations=translations, using=using
-        )
-
-    async def async_all(self):
-        __deprecation_warning()
-        return await sync_to_async(self.all, thread_sensitive=True)()
-
-    async def async_filter(self, *args, **kwargs):
-        __deprecation_warning()
-        return await sync_to_async(self.filter, thread_sensitive=True)(*args, **kwargs)
-
-    async def async_exclude(self, *args, **kwargs):
-        __deprecation_warning()
-        return await sync_to_async(self.exclude, thread_sensitive=True)(*args, **kwargs)
-
-    async def async_complex_filter(self, filter_obj):
-        __deprecation_warning()
-        return await sync_to_async(self.complex_filter, thread_sensitive=True)(
-            filter_obj
-        )
-
-    async def async_union(self, *other_qs, all=False):
-        __deprecation_warning()
-        return await sync_to_async(self.union, thread_sensitive=True)(
-            *other_qs, all=all
-        )
-
-    async def async_intersection(self, *other_qs):
-        __deprecation_warning()
-        return await sync_to_async(self.intersection, thread_sensitive=True)(*other_qs)
-
-    async def async_difference(self, *other_qs):
-        __deprecation_warning()
-        return await sync_to_async(self.difference, thread_sensitive=True)(*other_qs)
-
-    async def async_select_for_update(self, nowait=False, skip_locked=False, of=()):
-        __deprecation_warning()
-        return await sync_to_async(self.select_for_update, thread_sensitive=True)(
-            nowait=nowait, skip_locked=skip_locked, of=of
-        )
-
-    async def async_prefetch_related(self, *lookups):
-        __deprecation_warning()
-        return await sync_to_async(self.prefetch_related, thread_sensitive=True)(
-            *lookups
-        )
-
-    async def async_annotate(self, *args, **kwargs):
-        __deprecation_warning()
-        return await sync_to_async(self.annotate, thread_sensitive=True)(
-            *args, **kwargs
-        )
-
-    async def async_order_by(self, *field_names):
-        __deprecation_warning()
-        return await sync_to_async(self.order_by, thread_sensitive=True)(*field_names)
-
-    async def async_distinct(self, *field_names):
-        __deprecation_warning()
-        return await sync_to_async(self.distinct, thread_sensitive=True)(*field_names)
-
-    async def async_extra(
-        self,
-        select=None,
-        where=None,
-        params=None,
-        tables=None,
-        order_by=None,
-        select_params=None,
-    ):
-        __deprecation_warning()
-        return await sync_to_async(self.extra, thread_sensitive=True)(
-            select, where, params, tables, order_by, select_params
-        )
-
-    async def async_reverse(self):
-        __deprecation_warning()
-        return await sync_to_async(self.reverse, thread_sensitive=True)()
-
-    async def async_defer(self, *fields):
-        __deprecation_warning()
-        return await sync_to_async(self.defer, thread_sensitive=True)(*fields)
-
-    async def async_only(self, *fields):
-        __deprecation_warning()
-        return await sync_to_async(self.only, thread_sensitive=True)(*fields)
-
-    async def async_using(self, alias):
-        __deprecation_warning()
-        return await sync_to_async(self.using, thread_sensitive=True)(alias)
-
-    async def async_resolve_expression(self, *args, **kwargs):
-        __deprecation_warning()
-        return await sync_to_async(self.resolve_expression, thread_sensitive=True)(
-            *args, **kwargs
-        )
+    def aordered(self):
+        return _resolved(super(QuerySetAsync, self).ordered)
 
     @property
     async def async_ordered(self):
-        __deprecation_warning()
-
-        def _ordered():
-            return super(QuerySetAsync, self).ordered
-
-        return await sync_to_async(_ordered, thread_sensitive=True)()
-
-    ###############################
-    ### END OF DEPRECATION ZONE ###
-    ###############################
+        _deprecation_warning()
+        return self.ordered
+
+
+#: The async methods generated on ``QuerySetAsync``, by ``QuerySet`` method:
+#:
+#: - ``"run"``: ``a<name>`` runs the method in a database thread,
+#: - ``"write"``: same, on the write database, invalidating the query cache,
+#: - ``"build"``: ``a<name>`` returns the new queryset right away,
+#: - ``None``: ``a<name>`` is written by hand on ``QuerySetAsync``.
+#:
+#: Each of them also gets a deprecated ``async_<name>`` alias.
+ASYNC_METHODS = {
+    # Evaluation
+    "get": None,
+    "first": None,
+    "last": None,
+    "exists": None,
+    "count": None,
+    "earliest": "run",
+    "latest": "run",
+    "in_bulk": "run",
+    "explain": "run",
+    "raw": "run",
+    # Writes
+    "create": "write",
+    "bulk_create": "write",
+    "bulk_update": None,
+    "get_or_create": "write",
+    "update_or_create": "write",
+    "delete": "write",
+    "update": "write",
+    # Builders
+    "all": "build",
+    "none": "build",
+    "filter": "build",
+    "exclude": "build",
+    "complex_filter": "build",
+    "union": "build",
+    "intersection": "build",
+    "difference": "build",
+    "select_for_update": "build",
+    "prefetch_related": "build",
+    "annotate": "build",
+    "order_by": "build",
+    "distinct": "build",
+    "extra": "build",
+    "reverse": "build",
+    "defer": "build",
+    "only": "build",
+    "using": "build",
+    "resolve_expression": None,
+}
+
+
+def _run_method(name, write):
+    async def method(self, *args, **kwargs):
+        return await self._run(name, *args, **kwargs)
+
+    return instrumented(method, name=f"a{name}", write=write)
+
+
+def _build_method(name):
+    def method(self, *args, **kwargs):
+        return getattr(self, name)(*args, **kwargs)
+
+    return method
+
+
+def _deprecated_method(name):
+    async def method(self, *args, **kwargs):
+        _deprecation_warning()
+        result = getattr(self, f"a{name}")(*args, **kwargs)
+        if inspect.isawaitable(result) and not isinstance(result, QuerySet):
+            result = await result
+        return result
+
+    return method
+
+
+def _generate_methods(cls, methods):
+    """
+    Adds the ``a<name>`` methods and their ``async_<name>`` aliases described
+    by ``methods`` to ``cls``.
+    """
+    for name, kind in methods.items():
+        generated = {f"async_{name}": _deprecated_method(name)}
+        if kind == "build":
+            generated[f"a{name}"] = _build_method(name)
+        elif kind is not None:
+            generated[f"a{name}"] = _run_method(name, kind == "write")
+        for attname, method in generated.items():
+            method.__name__ = attname
+            method.__qualname__ = f"{cls.__name__}.{attname}"
+            method.__doc__ = f"Async version of ``QuerySet.{name}()``."
+            setattr(cls, attname, method)
+
+
+_generate_methods(QuerySetAsync, ASYNC_METHODS)
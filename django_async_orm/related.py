@@ -0,0 +1,137 @@
+import inspect
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import router
+from django.db.models import Prefetch
+from django.db.models.fields.related_descriptors import ReverseManyToOneDescriptor
+from django.utils.functional import cached_property
+
+from django_async_orm.cache import invalidate_models
+from django_async_orm.executor import run_sync
+from django_async_orm.instrumentation import instrumented
+from django_async_orm.prefetch import aprefetch_related_objects
+
+#: The sync methods of related managers given an ``a<name>`` version.
+RELATED_METHODS = (
+    "add",
+    "create",
+    "get_or_create",
+    "update_or_create",
+    "remove",
+    "clear",
+    "set",
+)
+
+# Async types, by related manager or descriptor class.
+_related_types = {}
+
+
+def _related_method(name):
+    async def method(self, *args, **kwargs):
+        try:
+            return await run_sync(
+                self._write_db,
+                getattr(self, name),
+                *args,
+                **kwargs,
+            )
+        finally:
+            invalidate_models(self.model)
+
+    method.__name__ = f"a{name}"
+    method.__qualname__ = f"AsyncRelatedManagerMixin.a{name}"
+    method.__doc__ = f"Async version of ``RelatedManager.{name}()``."
+    return instrumented(method, write=True)
+
+
+class AsyncRelatedManagerMixin:
+    """
+    Runs the writes of reverse foreign key and many-to-many managers in a
+    database thread of the library, so they use the worker pinned by the task
+    like any other call.
+    """
+
+    @property
+    def _write_db(self):
+        return router.db_for_write(self.model, instance=self.instance)
+
+
+for _name in RELATED_METHODS:
+    setattr(AsyncRelatedManagerMixin, f"a{_name}", _related_method(_name))
+
+
+def _async_type(prefix, mixin, cls):
+    try:
+        return _related_types[cls]
+    except KeyError:
+        return _related_types.setdefault(
+            cls, type(f"{prefix}{cls.__name__}", (mixin, cls), {})
+        )
+
+
+class AsyncRelatedDescriptorMixin:
+    @cached_property
+    def related_manager_cls(self):
+        return _async_type(
+            "Async", AsyncRelatedManagerMixin, super().related_manager_cls
+        )
+
+
+def patch_related_descriptors(model):
+    """
+    Makes the reverse foreign key and many-to-many managers of ``model`` async.
+
+    Descriptors only get a new class, their manager classes are still built on
+    first access.
+
+    :param model: A django model class
+    :type model: models.Model
+    """
+    for name, descriptor in vars(model).items():
+        if isinstance(descriptor, ReverseManyToOneDescriptor) and not isinstance(
+            descriptor, AsyncRelatedDescriptorMixin
+        ):
+            descriptor.__class__ = _async_type(
+                "Async", AsyncRelatedDescriptorMixin, type(descriptor)
+            )
+
+
+async def arelated(instances, name, queryset=None):
+    """
+    Loads the ``name`` relation of every instance with one query, instead of
+    one per instance::
+
+        books_by_author = await arelated(authors, "books")
+
+    The results are also kept in the prefetch cache of the instances, so
+    ``author.books.all()`` doesn't query the database afterwards, and
+    relations already prefetched on the instances are not loaded again.
+
+    :param instances: Instances of the same model
+    :type instances: list
+    :param name: Name of the relation attribute
+    :type name: str
+    :param queryset: Queryset the related objects are loaded from
+    :type queryset: QuerySet
+    :return: For each instance, the list of related objects for reverse
+        foreign keys and many-to-many fields, else the related object or
+        ``None``
+    :rtype: list
+    """
+    instances = list(instances)
+    if not instances:
+        return []
+    lookup = name if queryset is None else Prefetch(name, queryset=queryset)
+    await aprefetch_related_objects(instances, lookup)
+    descriptor = inspect.getattr_static(type(instances[0]), name)
+    if isinstance(descriptor, ReverseManyToOneDescriptor):
+        return [
+            list(getattr(obj, name).get_queryset()._result_cache) for obj in instances
+        ]
+    related = []
+    for obj in instances:
+        try:
+            related.append(getattr(obj, name))
+        except ObjectDoesNotExist:
+            related.append(None)
+    return related
@@ -0,0 +1,317 @@
+import threading
+
+import django
+from channels.db import database_sync_to_async
+from django.core.signals import setting_changed
+from django.db.models import QuerySet
+from django.dispatch import receiver
+from django.http import StreamingHttpResponse
+from django.template import loader
+from django.template.base import TextNode
+from django.template.context import make_context
+from django.template.defaulttags import ForNode
+from django.template.loader_tags import (
+    BLOCK_CONTEXT_KEY,
+    BlockContext,
+    BlockNode,
+    ExtendsNode,
+)
+from django.utils.autoreload import file_changed
+
+from django_async_orm.batch import agather
+from django_async_orm.executor import run_sync
+
+#: Size in characters the rendered output is sent in, at least: the rendering
+#: gives control back to the event loop between chunks.
+DEFAULT_CHUNK_SIZE = 8192
+
+# Compiled templates by ``(template_name, using)``.
+_templates = {}
+_templates_lock = threading.Lock()
+
+# Renders outside of the event loop without holding a database thread.
+_run_in_thread = database_sync_to_async(
+    lambda func, *args: func(*args), thread_sensitive=False
+)
+
+
+async def aget_template(template_name, using=None):
+    """
+    Returns the compiled template ``template_name``, loaded in a thread the
+    first time, then kept by the process for the next renderings. A list of
+    names is resolved like ``select_template``.
+
+    :param template_name: A template name or a list of them
+    :param using: The name of the template engine, defaults to any
+    :type using: str
+    """
+    key = (
+        template_name if isinstance(template_name, str) else tuple(template_name),
+        using,
+    )
+    template = _templates.get(key)
+    if template is None:
+        if isinstance(template_name, str):
+            template = await _run_in_thread(loader.get_template, template_name, using)
+        else:
+            template = await _run_in_thread(
+                loader.select_template, template_name, using
+            )
+        with _templates_lock:
+            template = _templates.setdefault(key, template)
+    return template
+
+
+async def aresolve_context(context):
+    """
+    Evaluates the querysets of ``context`` together through the async ORM, so
+    the template iterates over their results instead of running queries while
+    it renders.
+
+    :param context: The template context
+    :type context: dict
+    :return: The same context
+    :rtype: dict
+    """
+    querysets = [
+        value
+        for value in (context or {}).values()
+        if isinstance(value, QuerySet) and value._result_cache is None
+    ]
+    await agather(*(_afetch(queryset) for queryset in querysets))
+    return context
+
+
+async def _afetch(queryset):
+    if hasattr(queryset, "_afetch_all"):
+        await queryset._afetch_all()
+    else:
+        await run_sync(queryset.db, queryset._fetch_all)
+
+
+def _iter_nodelist(nodelist, context):
+    for node in nodelist:
+        if isinstance(node, ExtendsNode):
+            yield from _iter_extends(node, context)
+        elif isinstance(node, BlockNode):
+            yield from _iter_block(node, context)
+        elif isinstance(node, ForNode):
+            yield from _iter_for(node, context)
+        else:
+            yield node.render_annotated(context)
+
+
+def _iter_block(node, context):
+    # ``BlockNode.render`` yielding the nodes of the block one by one.
+    block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+    with context.push():
+        if block_context is None:
+            context["block"] = node
+            yield from _iter_nodelist(node.nodelist, context)
+        else:
+            push = block = block_context.pop(node.name)
+            if block is None:
+                block = node
+            block = type(node)(block.name, block.nodelist)
+            block.context = context
+            context["block"] = block
+            yield from _iter_nodelist(block.nodelist, context)
+            if push is not None:
+                block_context.push(node.name, push)
+
+
+def _iter_for(node, context):
+    # ``ForNode.render`` yielding the iterations one by one.
+    parentloop = context["forloop"] if "forloop" in context else {}
+    with context.push():
+        values = node.sequence.resolve(context, ignore_failures=True)
+        if values is None:
+            values = []
+        if not hasattr(values, "__len__"):
+            values = list(values)
+        len_values = len(values)
+        if len_values < 1:
+            yield from _iter_nodelist(node.nodelist_empty, context)
+            return
+        if node.is_reversed:
+            values = reversed(values)
+        num_loopvars = len(node.loopvars)
+        unpack = num_loopvars > 1
+        loop_dict = context["forloop"] = {"parentloop": parentloop}
+        for i, item in enumerate(values):
+            loop_dict["counter0"] = i
+            loop_dict["counter"] = i + 1
+            loop_dict["revcounter"] = len_values - i
+            loop_dict["revcounter0"] = len_values - i - 1
+            loop_dict["first"] = i == 0
+            loop_dict["last"] = i == len_values - 1
+            if unpack:
+                try:
+                    len_item = len(item)
+                except TypeError:
+                    len_item = 1
+                if num_loopvars != len_item:
+                    raise ValueError(
+                        f"Need {num_loopvars} values to unpack in for loop; "
+                        f"got {len_item}. "
+                    )
+                context.update(dict(zip(node.loopvars, item)))
+            else:
+                context[node.loopvars[0]] = item
+            yield from _iter_nodelist(node.nodelist_loop, context)
+            if unpack:
+                context.pop()
+
+
+def _iter_extends(node, context):
+    # ``ExtendsNode.render`` yielding the nodes of the parent one by one.
+    compiled_parent = node.get_parent(context)
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(node.blocks)
+    for parent_node in compiled_parent.nodelist:
+        if not isinstance(parent_node, TextNode):
+            if not isinstance(parent_node, ExtendsNode):
+                blocks = {
+                    n.name: n
+                    for n in compiled_parent.nodelist.get_nodes_by_type(BlockNode)
+                }
+                block_context.add_blocks(blocks)
+            break
+    with context.render_context.push_state(compiled_parent, isolated_context=False):
+        yield from _iter_nodelist(compiled_parent.nodelist, context)
+
+
+def iter_render(template, context=None, request=None):
+    """
+    Renders ``template`` piece by piece: the nodes of the template, of the
+    templates it extends, of their blocks and of each iteration of their
+    ``{% for %}`` loops are rendered one after the other. Other tags, such as
+    ``{% if %}`` or ``{% include %}``, are rendered whole.
+
+    Templates of other engines than Django's are rendered at once.
+
+    The nodes are rendered the way ``BlockNode``, ``ForNode`` and
+    ``ExtendsNode`` render them in Django: the tests compare both renderings
+    on every supported version.
+
+    :param template: A template returned by :func:`aget_template`
+    :param context: The template context
+    :type context: dict
+    :param request: The request, for the context processors
+    :return: A generator of strings
+    """
+    django_template = getattr(template, "template", None)
+    if django_template is None or not hasattr(django_template, "nodelist"):
+        yield template.render(context, request)
+        return
+    context = make_context(
+        context, request, autoescape=template.backend.engine.autoescape
+    )
+    with context.render_context.push_state(django_template):
+        with context.bind_template(django_template):
+            context.template_name = django_template.name
+            yield from _iter_nodelist(django_template.nodelist, context)
+
+
+def _next_chunk(pieces, chunk_size):
+    chunk = []
+    size = 0
+    for piece in pieces:
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            break
+    return "".join(chunk)
+
+
+async def astream_template(template, context=None, request=None, chunk_size=None):
+    """
+    Renders ``template`` as an async generator of chunks of at least
+    ``chunk_size`` characters, each one rendered in a thread, see
+    :func:`iter_render`.
+
+    :param chunk_size: Defaults to ``DEFAULT_CHUNK_SIZE``
+    :type chunk_size: int
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    pieces = iter_render(template, context, request)
+    try:
+        while True:
+            chunk = await _run_in_thread(_next_chunk, pieces, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        # Leaves the blocks the rendering was in, unless a cancelled chunk is
+        # still being rendered by its thread.
+        if not pieces.gi_running:
+            pieces.close()
+
+
+async def arender_stream(
+    request,
+    template_name,
+    context=None,
+    content_type=None,
+    status=None,
+    using=None,
+    chunk_size=None,
+):
+    """
+    Streaming version of ``render``: returns a ``StreamingHttpResponse`` whose
+    content is rendered chunk by chunk while it is sent, the beginning of the
+    page reaches the client before the end is rendered::
+
+        async def book_list(request):
+            books = Book.objects.select_related("author").order_by("title")
+            return await arender_stream(request, "books.html", {"books": books})
+
+    Querysets of ``context`` are evaluated before the response is returned,
+    see :func:`aresolve_context`. Errors raised while rendering happen once the
+    status and headers are sent: the response is cut short.
+
+    Before Django 4.2, streaming responses can't iterate over async
+    generators: the template is rendered at once, in a thread, and sent as a
+    single chunk.
+
+    :param template_name: A template name or a list of them
+    :param context: The template context
+    :type context: dict
+    :param content_type: The content type of the response
+    :param status: The status code of the response
+    :param using: The name of the template engine
+    :param chunk_size: Minimum size of the chunks sent, in characters
+    :type chunk_size: int
+    :rtype: StreamingHttpResponse
+    """
+    template, context = await agather(
+        aget_template(template_name, using), aresolve_context(context)
+    )
+    if django.VERSION >= (4, 2):
+        content = astream_template(template, context, request, chunk_size)
+    else:
+        content = [await _run_in_thread(template.render, context, request)]
+    return StreamingHttpResponse(
+        content,
+        content_type=content_type,
+        status=status,
+    )
+
+
+def _clear_templates():
+    with _templates_lock:
+        _templates.clear()
+
+
+@receiver(setting_changed)
+def _reset_templates(setting, **kwargs):
+    if setting == "TEMPLATES":
+        _clear_templates()
+
+
+@receiver(file_changed)
+def _template_file_changed(file_path, **kwargs):
+    # The development server reloads templates without restarting.
+    _clear_templates()
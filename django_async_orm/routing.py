@@ -0,0 +1,394 @@
+import asyncio
+import contextlib
+import contextvars
+import threading
+import time
+
+from django.core.signals import setting_changed
+from django.db import DatabaseError
+from django.dispatch import receiver
+
+from django_async_orm.conf import get_setting
+
+#: Weight of the last call in the moving average of the latency of a replica.
+LATENCY_SMOOTHING = 0.2
+#: Seconds after which a replica that wasn't chosen is tried again, so the
+#: latency of a replica that was slow for a while gets measured again.
+PROBE_INTERVAL = 1.0
+#: Latency recorded for a call that failed on a replica.
+ERROR_LATENCY = 1.0
+# Floor of the latency, calls in flight on a fast idle replica still count.
+_MIN_LATENCY = 0.0005
+
+# ``(replica sets by primary alias, replicas by alias)``, built from
+# ``ASYNC_ORM_REPLICAS`` on first use.
+_config = None
+_config_lock = threading.Lock()
+# Context of the calls made on aliases that aren't replicas.
+_untracked = contextlib.nullcontext()
+
+#: The replica the current call reads from, per primary alias.
+_routes = contextvars.ContextVar("django_async_orm_routes", default={})
+#: Primary aliases the current task reads from instead of their replicas.
+_primaries = contextvars.ContextVar("django_async_orm_primaries", default=frozenset())
+
+
+class Replica:
+    """
+    Latency and load of a replica, as seen by this process.
+
+    :ivar alias: The database alias of the replica
+    :ivar primary: The alias of its primary
+    :ivar latency: Moving average of the duration of its calls, in seconds,
+        ``None`` until a call is measured
+    :ivar in_flight: Number of calls running on it
+    :ivar last_chosen: ``time.monotonic()`` of the last time a read was routed
+        to it
+    """
+
+    def __init__(self, alias, primary):
+        self.alias = alias
+        self.primary = primary
+        self.latency = None
+        self.in_flight = 0
+        self.last_chosen = None
+
+    def __repr__(self):
+        return (
+            f"<Replica {self.alias} latency={self.latency} "
+            f"in_flight={self.in_flight}>"
+        )
+
+    @property
+    def score(self):
+        """
+        Expected wait of a new call: the latency times the calls it queues
+        behind, the lowest is chosen.
+        """
+        return max(self.latency or 0.0, _MIN_LATENCY) * (self.in_flight + 1)
+
+    def record(self, duration):
+        if self.latency is None:
+            self.latency = duration
+        else:
+            self.latency += LATENCY_SMOOTHING * (duration - self.latency)
+
+    @contextlib.contextmanager
+    def track(self):
+        """
+        Measures a call made on the replica.
+        """
+        self.in_flight += 1
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except DatabaseError:
+            failed = True
+            raise
+        finally:
+            self.in_flight -= 1
+            duration = time.perf_counter() - start
+            self.record(max(duration, ERROR_LATENCY) if failed else duration)
+
+    def stats(self):
+        return {
+            "latency_ms": None if self.latency is None else self.latency * 1000,
+            "in_flight": self.in_flight,
+        }
+
+
+class ReplicaSet:
+    """
+    A primary database alias and the replicas its reads are spread over.
+
+    :param primary: The alias of the primary
+    :type primary: str
+    :param replicas: The :class:`Replica` of each replica alias
+    :type replicas: list
+    """
+
+    def __init__(self, primary, replicas):
+        self.primary = primary
+        self.replicas = replicas
+
+    def choose(self, exclude=()):
+        """
+        Returns the replica the next read should go to: one that wasn't
+        chosen for ``PROBE_INTERVAL``, else the one with the lowest
+        :attr:`Replica.score`.
+
+        :param exclude: Aliases not to choose
+        :return: A replica or ``None`` when all of them are excluded
+        :rtype: Replica
+        """
+        candidates = [
+            replica for replica in self.replicas if replica.alias not in exclude
+        ]
+        if not candidates:
+            return None
+        now = time.monotonic()
+        stale = [
+            replica
+            for replica in candidates
+            if replica.last_chosen is None or now - replica.last_chosen > PROBE_INTERVAL
+        ]
+        if stale:
+            replica = min(stale, key=lambda replica: replica.last_chosen or 0.0)
+        else:
+            replica = min(candidates, key=lambda replica: replica.score)
+        replica.last_chosen = now
+        return replica
+
+
+def _get_config():
+    global _config
+    config = _config
+    if config is None:
+        with _config_lock:
+            if _config is None:
+                replica_sets = {}
+                replicas = {}
+                for primary, aliases in get_setting("REPLICAS").items():
+                    members = [
+                        replicas.setdefault(alias, Replica(alias, primary))
+                        for alias in aliases
+                    ]
+                    if members:
+                        replica_sets[primary] = ReplicaSet(primary, members)
+                _config = (replica_sets, replicas)
+            config = _config
+    return config
+
+
+def has_replicas():
+    """
+    Tells whether ``ASYNC_ORM_REPLICAS`` configures any replica.
+    """
+    return bool(_get_config()[0])
+
+
+def get_replica_set(alias):
+    """
+    Returns the replicas configured for a primary alias.
+
+    :rtype: ReplicaSet
+    :return: The replica set or ``None`` when ``alias`` has no entry in
+        ``ASYNC_ORM_REPLICAS``
+    """
+    return _get_config()[0].get(alias)
+
+
+def get_replica(alias):
+    """
+    Returns the :class:`Replica` of a replica alias, ``None`` for other aliases.
+    """
+    return _get_config()[1].get(alias)
+
+
+def track(alias):
+    """
+    Returns a context manager measuring a call made on ``alias`` when it is
+    a replica, see :meth:`Replica.track`.
+    """
+    replica = _get_config()[1].get(alias)
+    return _untracked if replica is None else replica.track()
+
+
+def primary_of(alias):
+    """
+    Returns the primary alias of a replica, other aliases are returned as is.
+    """
+    replica = _get_config()[1].get(alias)
+    return alias if replica is None else replica.primary
+
+
+def read_alias(alias):
+    """
+    Returns the alias the reads meant for ``alias`` go to in the current
+    context: its primary after a write or inside :func:`use_primary`, the
+    replica chosen for the current call, else ``alias`` itself.
+    """
+    routes = _routes.get()
+    primaries = _primaries.get()
+    if not routes and not primaries:
+        return alias
+    primary = primary_of(alias)
+    if primary in primaries:
+        return primary
+    return routes.get(primary, alias)
+
+
+def mark_written(alias):
+    """
+    Sends the next reads of the current task to the primary of ``alias``, so
+    the task reads its own writes whatever the replication lag. Tasks started
+    afterwards by the task inherit this.
+
+    :param alias: The alias written to
+    :type alias: str
+    """
+    primary = primary_of(alias)
+    primaries = _primaries.get()
+    if primary not in primaries and get_replica_set(primary) is not None:
+        _primaries.set(primaries | {primary})
+
+
+@contextlib.contextmanager
+def use_primary(alias):
+    """
+    Sends the reads made in the block to the primary ``alias`` instead of
+    its replicas::
+
+        with use_primary("default"):
+            book = await Book.objects.aget(pk=pk)
+
+    :param alias: A primary alias
+    :type alias: str
+    """
+    primaries = _primaries.get()
+    if alias in primaries:
+        yield
+        return
+    token = _primaries.set(primaries | {alias})
+    try:
+        yield
+    finally:
+        _primaries.reset(token)
+
+
+def choose_replica(queryset):
+    """
+    Returns the replica a read of ``queryset`` should go to.
+
+    :return: A replica or ``None`` when the queryset reads its own alias: it
+        was given one with ``using()``, its alias has no replica, or the
+        current task reads from the primary
+    :rtype: Replica
+    """
+    if queryset._db is not None or not has_replicas():
+        return None
+    replica_set = get_replica_set(queryset.db)
+    if replica_set is None or replica_set.primary in _primaries.get():
+        return None
+    return replica_set.choose()
+
+
+async def _read(replica, func, queryset, args, kwargs):
+    token = _routes.set({**_routes.get(), replica.primary: replica.alias})
+    try:
+        return await func(queryset, *args, **kwargs)
+    finally:
+        _routes.reset(token)
+
+
+def _consume(task):
+    # Failures of the attempts that lost are not reported.
+    if not task.cancelled():
+        task.exception()
+
+
+def _attempt(attempts, replica, func, queryset, args, kwargs):
+    # Each attempt evaluates its own clone: the threads running them would
+    # otherwise fill the same result cache.
+    clone = queryset._chain()
+    attempt = asyncio.ensure_future(_read(replica, func, clone, args, kwargs))
+    attempts[attempt] = (replica, clone)
+    return attempt
+
+
+async def _hedged(replica, hedge_after, func, queryset, args, kwargs, event):
+    attempts = {}
+    first = _attempt(attempts, replica, func, queryset, args, kwargs)
+    try:
+        done, _ = await asyncio.wait([first], timeout=hedge_after)
+        if not done:
+            second = get_replica_set(replica.primary).choose(exclude={replica.alias})
+            if second is not None:
+                _attempt(attempts, second, func, queryset, args, kwargs)
+        pending = set(attempts)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for attempt in done:
+                if not attempt.cancelled() and attempt.exception() is None:
+                    answered, clone = attempts[attempt]
+                    if event is not None:
+                        event.db = answered.alias
+                    # Only the results of the winner are kept.
+                    if clone._result_cache is not None:
+                        queryset._result_cache = clone._result_cache
+                        queryset._prefetch_done = clone._prefetch_done
+                    return attempt.result()
+        # Every attempt failed, report the first failure.
+        return first.result()
+    finally:
+        for attempt in attempts:
+            attempt.add_done_callback(_consume)
+            attempt.cancel()
+
+
+async def route_read(func, queryset, args, kwargs, event=None):
+    """
+    Runs the read ``func(queryset, *args, **kwargs)`` on a replica of the
+    queryset's database, chosen by :meth:`ReplicaSet.choose`. Every query of
+    the call goes to that replica.
+
+    When ``ASYNC_ORM_HEDGE_AFTER`` is set and the read is still running past
+    that delay, it is also sent to another replica: the first answer wins and
+    the other read is cancelled.
+
+    :param event: The instrumentation event of the call, its ``db`` is set to
+        the replica that answered
+    """
+    replica = choose_replica(queryset)
+    if replica is None:
+        return await func(queryset, *args, **kwargs)
+    if event is not None:
+        event.db = replica.alias
+    hedge_after = get_setting("HEDGE_AFTER")
+    if hedge_after is None or len(get_replica_set(replica.primary).replicas) < 2:
+        return await _read(replica, func, queryset, args, kwargs)
+    return await _hedged(replica, hedge_after, func, queryset, args, kwargs, event)
+
+
+def replica_stats():
+    """
+    Returns the latency and load of every replica, per alias.
+
+    :rtype: dict
+    """
+    return {alias: replica.stats() for alias, replica in _get_config()[1].items()}
+
+
+class ReplicaRouter:
+    """
+    Database router sending the writes of instances read from a replica to
+    its primary, and allowing relations between instances of a primary and
+    of its replicas. Add it first to ``DATABASE_ROUTERS``::
+
+        DATABASE_ROUTERS = ["django_async_orm.routing.ReplicaRouter"]
+    """
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is None or instance._state.db is None:
+            return None
+        primary = primary_of(instance._state.db)
+        return primary if primary != instance._state.db else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db is None or obj2._state.db is None:
+            return None
+        if primary_of(obj1._state.db) == primary_of(obj2._state.db):
+            return True
+        return None
+
+
+@receiver(setting_changed)
+def _reset_replicas(setting, **kwargs):
+    global _config
+    if setting == "ASYNC_ORM_REPLICAS" or setting == "DATABASES":
+        with _config_lock:
+            _config = None
@@ -0,0 +1,369 @@
+import asyncio
+import heapq
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import NotSupportedError, connections
+from django.db.models import Avg, Count, Max, Min, Sum
+from django.db.models.query import FlatValuesListIterable, ModelIterable, ValuesIterable
+
+from django_async_orm.executor import run_sync
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# End of the chunk of a shard, results can be ``None``.
+_END = object()
+
+#: How the partial results of the shards are combined, by aggregate class.
+#: ``Avg`` is computed from a ``Sum`` and a ``Count``.
+COMBINE = {
+    Count: sum,
+    Sum: sum,
+    Min: min,
+    Max: max,
+}
+
+
+class _Key:
+    """
+    Sort key of a row, comparing each value in the direction of its field.
+    """
+
+    __slots__ = ("values", "descending")
+
+    def __init__(self, values, descending):
+        self.values = values
+        self.descending = descending
+
+    def __eq__(self, other):
+        return self.values == other.values
+
+    def __lt__(self, other):
+        for value, other_value, descending in zip(
+            self.values, other.values, self.descending
+        ):
+            if value != other_value:
+                return other_value < value if descending else value < other_value
+        return False
+
+
+def _getter(queryset, name):
+    """
+    Returns a function getting the value ``name`` orders by from a result of
+    ``queryset``.
+    """
+    query = queryset.query
+    opts = queryset.model._meta
+    if name in query.annotations:
+        names = [name]
+    else:
+        try:
+            field = opts.pk if name == "pk" else opts.get_field(name)
+        except FieldDoesNotExist:
+            field = None
+        if field is None or not field.concrete or field.many_to_many:
+            raise ValueError(
+                f"Sharded queries can only be ordered by fields of {opts.label} "
+                f"and annotations, got {name!r}."
+            )
+        if field.is_relation and field.related_model._meta.ordering:
+            raise ValueError(
+                f"Sharded queries can't be ordered by {name!r}, it follows the "
+                f"ordering of {field.related_model._meta.label}."
+            )
+        names = [field.attname, field.name, name]
+    iterable_class = queryset._iterable_class
+    if issubclass(iterable_class, ModelIterable):
+        attname = names[0]
+        return lambda obj: getattr(obj, attname)
+    columns = [*query.extra_select, *query.values_select, *query.annotation_select]
+    column = next((name for name in names if name in columns), None)
+    if column is None:
+        raise ValueError(
+            f"Sharded queries must select the field they are ordered by, {name!r}."
+        )
+    if issubclass(iterable_class, ValuesIterable):
+        return lambda row: row[column]
+    if issubclass(iterable_class, FlatValuesListIterable):
+        return lambda row: row
+    index = columns.index(column)
+    return lambda row: row[index]
+
+
+def _sort_key(queryset):
+    """
+    Returns the function building the :class:`_Key` of a result of
+    ``queryset`` in its ``order_by`` order, ``None`` when it isn't ordered.
+    """
+    if not queryset.ordered:
+        return None
+    query = queryset.query
+    order_by = query.order_by or queryset.model._meta.ordering
+    getters = []
+    descending = []
+    for name in order_by:
+        if not isinstance(name, str) or name.lstrip("-") == "?":
+            raise ValueError(
+                f"Sharded queries need field names to order by, got {name!r}."
+            )
+        getters.append(_getter(queryset, name.lstrip("-")))
+        # ``reverse()`` flips every direction.
+        descending.append(name.startswith("-") == query.standard_ordering)
+    # Nulls sort the way the database sorts them.
+    null = 1 if connections[queryset.db].features.nulls_order_largest else -1
+    descending = tuple(descending)
+
+    def key(row):
+        values = []
+        for getter in getters:
+            value = getter(row)
+            values.append((null, 0) if value is None else (0, value))
+        return _Key(values, descending)
+
+    return key
+
+
+async def _produce(queryset, chunk_size, shard, queue):
+    """
+    Fetches the results of a shard chunk by chunk into ``queue``, ended by
+    ``None``.
+    """
+    try:
+        if queryset._prefetch_related_lookups:
+            # Prefetching needs every result of the shard.
+            await queue.put((shard, await queryset.alist()))
+        else:
+            chunk = []
+            async for obj in queryset.aiterator(chunk_size=chunk_size):
+                chunk.append(obj)
+                if len(chunk) >= chunk_size:
+                    await queue.put((shard, chunk))
+                    chunk = []
+            if chunk:
+                await queue.put((shard, chunk))
+        await queue.put((shard, None))
+    except Exception as e:
+        await queue.put((shard, e))
+
+
+class ShardedQuerySet:
+    """
+    A ``QuerySetAsync`` run on several databases at once, each holding a
+    shard of the table. The shards are queried concurrently, a query costs
+    the latency of the slowest shard instead of the sum of all of them::
+
+        orders = Order.objects.filter(paid=True).order_by("-created_at")[:50]
+        async for order in orders.ashards(["shard1", "shard2", "shard3"]):
+            ...
+
+    Results of an ordered queryset are merged in its ``order_by`` order,
+    fields and annotations it orders by are compared in Python. Slices apply
+    to the merged results.
+
+    :param queryset: The queryset to run on each shard
+    :type queryset: QuerySetAsync
+    :param aliases: The database aliases of the shards
+    :type aliases: list
+    """
+
+    def __init__(self, queryset, aliases):
+        self.queryset = queryset
+        self.aliases = list(aliases)
+        if not self.aliases:
+            raise ValueError("Sharded queries need at least one database alias.")
+
+    def __repr__(self):
+        return f"<ShardedQuerySet {self.queryset.query} on {self.aliases}>"
+
+    def _shard_querysets(self):
+        """
+        Returns the queryset of each shard, a slice ``[low:high]`` becomes
+        ``[:high]``: any shard can hold the first results.
+        """
+        high = self.queryset.query.high_mark
+        querysets = []
+        for alias in self.aliases:
+            queryset = self.queryset.using(alias)
+            if queryset.query.is_sliced:
+                queryset.query.clear_limits()
+                queryset.query.set_limits(high=high)
+            querysets.append(queryset)
+        return querysets
+
+    def __aiter__(self):
+        return self.aiterator()
+
+    async def aiterator(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yields the results of every shard, the shards are read concurrently,
+        ``chunk_size`` rows at a time.
+
+        Results of an unordered queryset are yielded as the shards return
+        them.
+
+        :param chunk_size: Number of rows fetched from a shard at once
+        :type chunk_size: int
+        """
+        key = _sort_key(self.queryset)
+        low, high = self.queryset.query.low_mark, self.queryset.query.high_mark
+        querysets = self._shard_querysets()
+        if key is None:
+            results = self._unordered(querysets, chunk_size)
+        else:
+            results = self._merged(querysets, key, chunk_size)
+        position = 0
+        try:
+            async for obj in results:
+                if position >= low:
+                    yield obj
+                position += 1
+                if position == high:
+                    break
+        finally:
+            await results.aclose()
+
+    async def _unordered(self, querysets, chunk_size):
+        queue = asyncio.Queue(maxsize=len(querysets))
+        producers = [
+            asyncio.ensure_future(_produce(queryset, chunk_size, shard, queue))
+            for shard, queryset in enumerate(querysets)
+        ]
+        running = len(producers)
+        try:
+            while running:
+                _, chunk = await queue.get()
+                if chunk is None:
+                    running -= 1
+                    continue
+                if isinstance(chunk, Exception):
+                    raise chunk
+                for obj in chunk:
+                    yield obj
+        finally:
+            for producer in producers:
+                producer.cancel()
+
+    async def _merged(self, querysets, key, chunk_size):
+        # One queue per shard, each shard fetches its next chunk while the
+        # previous one is merged.
+        queues = [asyncio.Queue(maxsize=1) for _ in querysets]
+        producers = [
+            asyncio.ensure_future(_produce(queryset, chunk_size, shard, queue))
+            for shard, (queryset, queue) in enumerate(zip(querysets, queues))
+        ]
+
+        async def next_chunk(shard):
+            _, chunk = await queues[shard].get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            return iter(chunk) if chunk is not None else None
+
+        try:
+            chunks = await asyncio.gather(
+                *(next_chunk(shard) for shard in range(len(queues)))
+            )
+            heap = []
+            for shard, chunk in enumerate(chunks):
+                obj = _END if chunk is None else next(chunk, _END)
+                if obj is not _END:
+                    heap.append((key(obj), shard, obj))
+            heapq.heapify(heap)
+            while heap:
+                _, shard, obj = heap[0]
+                yield obj
+                following = next(chunks[shard], _END)
+                if following is _END:
+                    chunks[shard] = await next_chunk(shard)
+                    if chunks[shard] is not None:
+                        following = next(chunks[shard], _END)
+                if following is _END:
+                    heapq.heappop(heap)
+                else:
+                    heapq.heapreplace(heap, (key(following), shard, following))
+        finally:
+            for producer in producers:
+                producer.cancel()
+
+    async def alist(self):
+        """
+        Returns the results of every shard as a list.
+        """
+        return [obj async for obj in self]
+
+    async def acount(self):
+        """
+        Returns the number of results of every shard.
+        """
+        counts = await asyncio.gather(
+            *(queryset.acount() for queryset in self._shard_querysets())
+        )
+        low, high = self.queryset.query.low_mark, self.queryset.query.high_mark
+        total = sum(counts)
+        if high is not None:
+            total = min(total, high)
+        return max(0, total - low)
+
+    async def aaggregate(self, *args, **kwargs):
+        """
+        Aggregates the results of every shard: each shard computes partial
+        aggregates, combined once they are all in. ``Count``, ``Sum``,
+        ``Min``, ``Max`` and ``Avg`` are supported, without ``distinct``.
+
+        :return: The aggregated values, by name
+        :rtype: dict
+        """
+        if self.queryset.query.is_sliced:
+            raise TypeError("Cannot aggregate a query once a slice has been taken.")
+        for arg in args:
+            try:
+                kwargs[arg.default_alias] = arg
+            except (AttributeError, TypeError):
+                raise TypeError("Complex aggregates require an alias.")
+        partials = {}
+        defaults = {}
+        for name, aggregate in kwargs.items():
+            if getattr(aggregate, "distinct", False):
+                raise NotSupportedError(
+                    f"Sharded queries can't combine distinct aggregates, got {name!r}."
+                )
+            default = getattr(aggregate, "default", None)
+            if hasattr(default, "resolve_expression"):
+                raise NotSupportedError(
+                    f"Sharded queries can't combine aggregates with an expression "
+                    f"as default, got {name!r}."
+                )
+            defaults[name] = default
+            aggregate = aggregate.copy()
+            aggregate.default = None
+            if type(aggregate) is Avg:
+                expression = aggregate.get_source_expressions()[0]
+                partials[f"{name}__sum"] = Sum(expression, filter=aggregate.filter)
+                partials[f"{name}__count"] = Count(expression, filter=aggregate.filter)
+            elif type(aggregate) in COMBINE:
+                partials[name] = aggregate
+            else:
+                raise NotSupportedError(
+                    f"Sharded queries can't combine {type(aggregate).__name__} "
+                    f"aggregates, got {name!r}."
+                )
+        # QuerySet.aaggregate only exists from Django 4.1.
+        results = await asyncio.gather(
+            *(
+                run_sync(queryset.db, queryset.aggregate, **partials)
+                for queryset in self._shard_querysets()
+            )
+        )
+        aggregated = {}
+        for name, aggregate in kwargs.items():
+            if type(aggregate) is Avg:
+                total = _combine(sum, results, f"{name}__sum")
+                count = _combine(sum, results, f"{name}__count")
+                value = total / count if count else None
+            else:
+                value = _combine(COMBINE[type(aggregate)], results, name)
+            aggregated[name] = defaults[name] if value is None else value
+        return aggregated
+
+
+def _combine(function, results, name):
+    values = [result[name] for result in results if result[name] is not None]
+    return function(values) if values else None
@@ -0,0 +1,174 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from django_async_orm.instrumentation import current_event
+
+# ``(signal, dispatch_uid, sender)`` of every connected coroutine receiver.
+_receivers = set()
+_receivers_lock = threading.Lock()
+
+#: The signals received by the coroutine receivers during the current database
+#: call, they are dispatched once the call returns.
+_pending = contextvars.ContextVar("django_async_orm_signals", default=None)
+
+
+class AsyncReceiver:
+    """
+    Sync receiver standing for a coroutine function connected to a signal.
+
+    When the signal is sent by a call of the async API, the coroutine is
+    awaited in the event loop once the call returns, with the other
+    coroutines the call triggered. Signals sent by sync code run it with
+    ``async_to_sync``.
+
+    :ivar func: The coroutine function
+    :ivar on_commit: Whether ``func`` waits for the transaction the signal was
+        sent in to commit, it isn't called when it rolls back
+    """
+
+    def __init__(self, func, on_commit=False):
+        self.func = func
+        self.on_commit = on_commit
+
+    def __repr__(self):
+        return f"<AsyncReceiver {self.func!r} on_commit={self.on_commit}>"
+
+    def __call__(self, signal, sender, **kwargs):
+        if self.on_commit:
+            transaction.on_commit(
+                functools.partial(self.deliver, signal, sender, kwargs),
+                using=kwargs.get("using") or DEFAULT_DB_ALIAS,
+            )
+        else:
+            self.deliver(signal, sender, kwargs)
+
+    def deliver(self, signal, sender, kwargs):
+        pending = _pending.get()
+        if pending is not None:
+            pending.append((self.func, signal, sender, kwargs))
+        else:
+            async_to_sync(self.func)(signal=signal, sender=sender, **kwargs)
+
+
+def _dispatch_uid(func, dispatch_uid):
+    return ("django_async_orm", dispatch_uid or id(func))
+
+
+def connect(signal, func, sender=None, on_commit=False, dispatch_uid=None):
+    """
+    Connects the coroutine function ``func`` to a Django signal::
+
+        async def invalidate(sender, instance, **kwargs):
+            await cache.adelete(f"book:{instance.pk}")
+
+        connect(post_save, invalidate, sender=Book)
+
+    The coroutine receivers of the signals sent during an async call, such as
+    ``acreate`` or ``asave``, run concurrently in the event loop once the
+    database is done with the call, instead of one after the other in the
+    database thread. Sync receivers are left as they are.
+
+    :param signal: A ``django.dispatch.Signal``
+    :param func: A coroutine function taking the arguments of the signal
+    :param sender: Only receive the signal from this sender
+    :param on_commit: Wait for the transaction the signal was sent in to
+        commit, see ``transaction.on_commit``
+    :type on_commit: bool
+    :param dispatch_uid: Identifies the receiver, defaults to ``func``
+    """
+    if not asyncio.iscoroutinefunction(func):
+        raise TypeError(f"{func!r} is not a coroutine function.")
+    uid = _dispatch_uid(func, dispatch_uid)
+    with _receivers_lock:
+        signal.connect(
+            AsyncReceiver(func, on_commit), sender=sender, weak=False, dispatch_uid=uid
+        )
+        _receivers.add((signal, uid, sender))
+
+
+def disconnect(signal, func=None, sender=None, dispatch_uid=None):
+    """
+    Disconnects a receiver connected with :func:`connect`.
+
+    :return: Whether a receiver was disconnected
+    :rtype: bool
+    """
+    uid = _dispatch_uid(func, dispatch_uid)
+    with _receivers_lock:
+        _receivers.discard((signal, uid, sender))
+        return signal.disconnect(sender=sender, dispatch_uid=uid)
+
+
+def async_receiver(signal, **kwargs):
+    """
+    Decorator connecting a coroutine function to a signal, or a list of
+    signals, with :func:`connect`::
+
+        @async_receiver(post_save, sender=Book, on_commit=True)
+        async def audit(sender, instance, created, **kwargs):
+            await AuditLog.objects.acreate(book=instance, created=created)
+    """
+
+    def decorator(func):
+        for each in signal if isinstance(signal, (list, tuple)) else [signal]:
+            connect(each, func, **kwargs)
+        return func
+
+    return decorator
+
+
+def start_collecting():
+    """
+    Collects the signals received by the coroutine receivers in the current
+    context until :func:`stop_collecting`.
+
+    :return: A token, ``None`` when no coroutine receiver is connected
+    """
+    if not _receivers:
+        return None
+    return _pending.set([])
+
+
+def stop_collecting(token):
+    """
+    :return: The signals collected since :func:`start_collecting`
+    :rtype: list
+    """
+    pending = _pending.get()
+    _pending.reset(token)
+    return pending
+
+
+async def dispatch(pending):
+    """
+    Runs the coroutine receivers of the collected signals concurrently, the
+    time they take is added to ``signal_time`` of the instrumentation event of
+    the current call.
+
+    :param pending: Signals returned by :func:`stop_collecting`
+    :type pending: list
+    :raises Exception: The first exception raised by a receiver, once every
+        receiver is done
+    """
+    start = time.perf_counter()
+    try:
+        results = await asyncio.gather(
+            *(
+                func(signal=signal, sender=sender, **kwargs)
+                for func, signal, sender, kwargs in pending
+            ),
+            return_exceptions=True,
+        )
+    finally:
+        event = current_event.get()
+        if event is not None:
+            event.signal_time += time.perf_counter() - start
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
@@ -0,0 +1,79 @@
+import asyncio
+import contextlib
+import contextvars
+import time
+
+from django_async_orm.conf import get_setting
+
+#: Time (``time.monotonic()``) the calls of the current task must be done by.
+_deadline = contextvars.ContextVar("django_async_orm_deadline", default=None)
+
+
+class QueryTimeout(asyncio.TimeoutError):
+    """
+    Raised when a call doesn't finish in time, its statement was interrupted.
+    """
+
+
+@contextlib.contextmanager
+def query_timeout(seconds):
+    """
+    Gives the calls made in the block ``seconds`` to finish, together::
+
+        with query_timeout(0.5):
+            author = await Author.objects.aget(pk=pk)
+            books = await author.books.alist()
+
+    A call running when the time is up is interrupted on the database and
+    :class:`QueryTimeout` is raised. Nested blocks can only shorten the time
+    left.
+
+    :param seconds: The timeout, ``None`` for none
+    :type seconds: float
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None and current < deadline:
+        deadline = current
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """
+    Returns the time the next call has to finish: what is left before the
+    deadline of the current task, else ``ASYNC_ORM_QUERY_TIMEOUT``.
+
+    :return: A number of seconds or ``None`` without timeout
+    :rtype: float
+    :raises QueryTimeout: When the deadline has passed
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return get_setting("QUERY_TIMEOUT")
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise QueryTimeout("Query timeout expired before the query started.")
+    return left
+
+
+async def run_with_timeout(aw, timeout):
+    """
+    Awaits ``aw``, cancelling it once ``timeout`` seconds have passed.
+
+    :raises QueryTimeout: When ``aw`` was cancelled because of the timeout
+    """
+    if timeout is None:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, timeout)
+    except asyncio.TimeoutError as e:
+        if isinstance(e, QueryTimeout):
+            raise
+        raise QueryTimeout(f"Query didn't finish within {timeout:.3f}s.") from None
@@ -0,0 +1,121 @@
+import asyncio
+import contextlib
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from django_async_orm.executor import pin, run_sync
+from django_async_orm.routing import use_primary
+from django_async_orm.signals import dispatch, start_collecting, stop_collecting
+
+# Tasks of the coroutine callbacks started on commit.
+_callback_tasks = set()
+
+
+@contextlib.asynccontextmanager
+async def aatomic(using=None, savepoint=True, durable=False):
+    """
+    Async version of ``transaction.atomic``::
+
+        async with aatomic():
+            author = await Author.objects.acreate(name="author")
+            await Book.objects.acreate(title="book", author=author)
+
+    A worker is pinned to the task for the block: every call made on ``using``
+    runs on the same connection, in the transaction, and goes straight to that
+    worker. Reads skip the native engine, the replicas and the query cache,
+    they could not see the uncommitted writes. Nested blocks create
+    savepoints.
+
+    Starting, committing and rolling back the transaction are exempt from
+    :func:`~django_async_orm.timeout.query_timeout`: a block whose calls timed
+    out is still rolled back.
+
+    :param using: A database alias, defaults to ``"default"``
+    :type using: str
+    :param savepoint: Whether nested blocks create a savepoint
+    :type savepoint: bool
+    :param durable: Whether the block must be the outermost one
+    :type durable: bool
+    """
+    using = using or DEFAULT_DB_ALIAS
+    with use_primary(using):
+        async with pin(using) as worker:
+            atomic = transaction.atomic(
+                using=using, savepoint=savepoint, durable=durable
+            )
+            entered = False
+
+            def enter():
+                nonlocal entered
+                atomic.__enter__()
+                entered = True
+
+            def leave(*exc_info):
+                if entered:
+                    atomic.__exit__(*exc_info)
+
+            try:
+                await _run_to_completion(worker, enter)
+                yield
+            except BaseException as e:
+                # Failed, timed out or cancelled blocks roll back as well.
+                await _run_to_completion(worker, leave, type(e), e, e.__traceback__)
+                raise
+            await _run_to_completion(worker, leave, None, None, None)
+
+
+async def _run_to_completion(worker, func, *args):
+    # Transaction boundaries go straight to the pinned worker: neither the
+    # timeout of the task nor its cancellation interrupt a BEGIN, a COMMIT or
+    # a ROLLBACK, or keep it from running. The worker runs them in order,
+    # before anything sent to it later.
+    token = start_collecting()
+    try:
+        result = await asyncio.shield(worker.run(func, *args))
+    finally:
+        pending = stop_collecting(token) if token is not None else None
+    if pending:
+        await dispatch(pending)
+    return result
+
+
+def _on_commit_callback(func, loop):
+    if not asyncio.iscoroutinefunction(func):
+        return func
+
+    def callback():
+        def start():
+            task = loop.create_task(func())
+            _callback_tasks.add(task)
+            task.add_done_callback(_callback_tasks.discard)
+
+        loop.call_soon_threadsafe(start)
+
+    return callback
+
+
+async def aon_commit(func, using=None, robust=False):
+    """
+    Async version of ``transaction.on_commit``: ``func`` is called once the
+    transaction of the current :func:`aatomic` block commits, right away
+    outside of a transaction.
+
+    Regular callables run in the database thread, coroutine functions are
+    started as tasks of the event loop.
+
+    :param func: A callable taking no argument
+    :param using: A database alias, defaults to ``"default"``
+    :type using: str
+    :param robust: Whether exceptions raised by ``func`` are logged instead
+        of propagated, see ``transaction.on_commit``
+    :type robust: bool
+    """
+    using = using or DEFAULT_DB_ALIAS
+    kwargs = {"robust": True} if robust else {}
+    await run_sync(
+        using,
+        transaction.on_commit,
+        _on_commit_callback(func, asyncio.get_running_loop()),
+        using,
+        **kwargs,
+    )
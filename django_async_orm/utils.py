@@ -1,34 +1,134 @@
+import copy
+import threading
+
+from django.db.models import QuerySet
+
 from django_async_orm.manager import AsyncManager
+from django_async_orm.query import QuerySetAsync
+from django_async_orm.related import patch_related_descriptors
 
+# Mixin types, by base manager class.
+_mixin_types = {}
+# Async querysets, by custom queryset class.
+_queryset_types = {}
+_patch_lock = threading.Lock()
 
-def mixin_async_manager_factory(model):
+
+def async_queryset_factory(queryset_cls):
+    """
+    Returns a queryset class with the methods of ``queryset_cls`` and the async
+    ones of ``QuerySetAsync``.
+
+    :param queryset_cls: A queryset class
+    :type queryset_cls: type
+    :rtype: type
+    """
+    if issubclass(queryset_cls, QuerySetAsync):
+        return queryset_cls
+    try:
+        return _queryset_types[queryset_cls]
+    except KeyError:
+        pass
+    if queryset_cls is QuerySet:
+        return QuerySetAsync
+    return _queryset_types.setdefault(
+        queryset_cls,
+        type(f"Async{queryset_cls.__name__}", (queryset_cls, QuerySetAsync), {}),
+    )
+
+
+def _migration_methods(base_manager_cls):
+    # Migrations must see the manager the model declares, not its async type.
+    def deconstruct(self):
+        manager = copy.copy(self)
+        manager.__class__ = base_manager_cls
+        return manager.deconstruct()
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, base_manager_cls)
+            and self._constructor_args == other._constructor_args
+        )
+
+    return {
+        "deconstruct": deconstruct,
+        "__eq__": __eq__,
+        "__hash__": base_manager_cls.__hash__,
+    }
+
+
+def async_manager_type(base_manager_cls):
     """
     Creates a new type a mixin between the base manager and the async manager.
 
+    Types are created once per base manager class and shared by the models
+    using it.
+
+    :param base_manager_cls: A manager class
+    :type base_manager_cls: type
+    :return: A mixin type
+    :rtype: type
+    """
+    if issubclass(base_manager_cls, AsyncManager):
+        return base_manager_cls
+    try:
+        return _mixin_types[base_manager_cls]
+    except KeyError:
+        pass
+    with _patch_lock:
+        if base_manager_cls not in _mixin_types:
+            _mixin_types[base_manager_cls] = type(
+                f"MixinAsync{base_manager_cls.__name__}",
+                (base_manager_cls, AsyncManager),
+                {
+                    "_queryset_class": async_queryset_factory(
+                        base_manager_cls._queryset_class
+                    ),
+                    **_migration_methods(base_manager_cls),
+                },
+            )
+        return _mixin_types[base_manager_cls]
+
+
+def mixin_async_manager_factory(model):
+    """
+    Returns the async type of the ``objects`` manager of a model.
+
     :param model:  A django model class
     :type model:  models.Model
-    :return: A mixin type
+    :return: A mixin type or ``None`` when the manager is already async
     :rtype: object
     """
 
     base_manager_cls = model.objects.__class__
-    if not base_manager_cls.__name__.startswith("MixinAsync"):
-        return type(
-            f"MixinAsync{base_manager_cls.__name__}",
-            (AsyncManager, base_manager_cls),
-            {},
-        )
+    if not issubclass(base_manager_cls, AsyncManager):
+        return async_manager_type(base_manager_cls)
 
 
 def patch_manager(model):
     """
-    Patches django models to add async capabilities
+    Patches django models to add async capabilities.
+
+    Every manager of the model gets an async class: ``objects``, managers with
+    other names, ``_default_manager``, ``_base_manager`` and the managers of
+    its reverse foreign keys and many-to-many fields. Instances are kept, only their class
+    changes, so patching costs no more than a loop over the managers.
+
     :param model: A django model class
     :type model: models.Model
     :return: None
     :rtype: None
     """
-    async_manager_cls = mixin_async_manager_factory(model)
-    if async_manager_cls:
-        model.objects = async_manager_cls()
-        model.objects.model = model
+    opts = model._meta
+    managers = list(opts.local_managers)
+    if "managers" in opts.__dict__:
+        managers.extend(opts.managers)
+    # Built on first access unless ``Meta.base_manager_name`` names one of the
+    # managers above, forward relations load their objects with it.
+    managers.append(opts.base_manager)
+    for manager in managers:
+        manager.__class__ = async_manager_type(type(manager))
+    objects = getattr(model, "objects", None)
+    if isinstance(objects, AsyncManager):
+        objects._sync_in_thread = True
+    patch_related_descriptors(model)
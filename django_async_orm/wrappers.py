@@ -2,12 +2,10 @@ from channels.db import database_sync_to_async as sync_to_async
 from django.contrib.auth import login, logout
 from django.shortcuts import render
 
-
-def _sync_form_is_valid(form_instance):
-    return form_instance.is_valid()
-
+from django_async_orm.forms import ais_valid
+from django_async_orm.rendering import arender_stream  # noqa: F401
 
 arender = sync_to_async(render, thread_sensitive=True)
 alogin = sync_to_async(login, thread_sensitive=True)
 alogout = sync_to_async(logout, thread_sensitive=True)
-aform_is_valid = sync_to_async(_sync_form_is_valid, thread_sensitive=True)
+aform_is_valid = ais_valid
@@ -8,3 +8,77 @@ from django.db import models
 class TestModel(models.Model):
     name = models.CharField(max_length=50, null=True, blank=True)
     obj_type = models.CharField(max_length=50, null=True, blank=True)
+
+
+class Author(models.Model):
+    name = models.CharField(max_length=50)
+
+
+class Article(models.Model):
+    """Sets its slug in ``save()``."""
+
+    title = models.CharField(max_length=50)
+    slug = models.CharField(max_length=50, blank=True)
+
+    def save(self, *args, **kwargs):
+        self.slug = self.title.lower().replace(" ", "-")
+        super().save(*args, **kwargs)
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    color = models.CharField(max_length=20, default="")
+
+
+class BookQuerySet(models.QuerySet):
+    def titled(self, title):
+        return self.filter(title=title)
+
+
+class Book(models.Model):
+    title = models.CharField(max_length=50)
+    author = models.ForeignKey(Author, related_name="books", on_delete=models.CASCADE)
+    tags = models.ManyToManyField(Tag, related_name="books")
+
+    objects = models.Manager()
+    catalog = BookQuerySet.as_manager()
+
+
+class Edition(models.Model):
+    book = models.ForeignKey(Book, related_name="editions", on_delete=models.CASCADE)
+    number = models.IntegerField()
+    isbn = models.CharField(max_length=13, unique=True)
+
+    class Meta:
+        unique_together = [("book", "number")]
+
+
+class Review(models.Model):
+    book = models.ForeignKey(Book, related_name="reviews", on_delete=models.CASCADE)
+    rating = models.IntegerField()
+    score = models.FloatField(default=0.0)
+    created_at = models.DateTimeField(null=True)
+
+
+class Writer(models.Model):
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        ordering = ["name"]
+
+
+class Essay(models.Model):
+    writer = models.ForeignKey(Writer, related_name="essays", on_delete=models.CASCADE)
+
+
+class PublisherManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().exclude(name="")
+
+
+class Publisher(models.Model):
+    """Only has a custom-named manager."""
+
+    name = models.CharField(max_length=50)
+
+    publishers = PublisherManager()
@@ -18,9 +18,26 @@ DATABASES = {
             "NAME": "testdb.sqlite3",
         },
         "OPTIONS": {"timeout": 5},
-    }
+    },
+    # Stand-ins for read replicas, they are not kept in sync with "default".
+    "replica1": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "TEST": {
+            "NAME": "testdb_replica1.sqlite3",
+        },
+        "OPTIONS": {"timeout": 5},
+    },
+    "replica2": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "TEST": {
+            "NAME": "testdb_replica2.sqlite3",
+        },
+        "OPTIONS": {"timeout": 5},
+    },
 }
 
+DATABASE_ROUTERS = ["django_async_orm.routing.ReplicaRouter"]
+
 ROOT_URLCONF = "tests.urls"
 
 INSTALLED_APPS = [
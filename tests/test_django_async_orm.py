@@ -1,9 +1,71 @@
-from unittest import IsolatedAsyncioTestCase
+import array
+import asyncio
+import datetime
+import gc
+import threading
+import time
+from unittest import IsolatedAsyncioTestCase, mock, skipUnless
 
+import django
+from django import forms
 from django.apps import apps
-from django.test import TestCase, TransactionTestCase, tag
+from django.core.exceptions import SynchronousOnlyOperation
+from django.db import IntegrityError, NotSupportedError, connection, connections
+from django.db.backends.signals import connection_created
+from django.db.models import Avg, Count, Max, Min, Prefetch, Sum
+from django.db.models.functions import Upper
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    tag,
+)
+from django.test.utils import CaptureQueriesContext
 
-from .models import TestModel
+from django_async_orm import routing, signals
+from django_async_orm.batch import agather
+from django_async_orm.cache import MISSING, LRUCacheBackend, get_query_cache
+from django_async_orm.engine import aiosqlite, get_engine
+from django_async_orm.executor import Call, executor_stats, get_executor, pin, run_sync
+from django_async_orm.forms import ais_valid
+from django_async_orm.instrumentation import (
+    StatsCollector,
+    add_listener,
+    remove_listener,
+)
+from django_async_orm.iter import AsyncIter
+from django_async_orm.model import changed_fields
+from django_async_orm.related import arelated
+from django_async_orm.rendering import aget_template, iter_render
+from django_async_orm.routing import get_replica_set, replica_stats, use_primary
+from django_async_orm.timeout import QueryTimeout, query_timeout
+from django_async_orm.transaction import aatomic, aon_commit
+from django_async_orm.utils import async_manager_type
+from django_async_orm.wrappers import aform_is_valid, arender_stream
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from .models import (
+    Article,
+    Author,
+    Book,
+    Edition,
+    Essay,
+    Publisher,
+    PublisherManager,
+    Review,
+    Tag,
+    TestModel,
+    Writer,
+)
 
 
 class AppLoadingTestCase(TestCase):
@@ -19,6 +81,62 @@ class AppLoadingTestCase(TestCase):
             f'Manager class name is {manager_class_name} but should start with "MixinAsync"',
         )
 
+    @tag("ci")
+    def test_every_manager_is_async(self):
+        author = Author(pk=1)
+        book = Book(pk=1)
+        for manager in (
+            Publisher.publishers,
+            Publisher._default_manager,
+            Book._base_manager,
+            Publisher._base_manager,
+            Book.catalog,
+            author.books,
+            book.tags,
+            Tag(pk=1).books,
+        ):
+            with self.subTest(manager=manager):
+                self.assertTrue(hasattr(manager, "aget"))
+                self.assertTrue(hasattr(manager.all(), "alist"))
+        self.assertIs(type(Author.objects), type(Book.objects))
+        self.assertTrue(hasattr(Book.catalog.titled("x"), "alist"))
+        self.assertTrue(hasattr(author.books, "aadd"))
+
+    @tag("ci")
+    def test_migrations_see_the_declared_managers(self):
+        self.assertEqual(
+            Book.catalog.deconstruct(),
+            (True, None, "tests.models.BookQuerySet", None, None),
+        )
+        self.assertEqual(
+            Publisher.publishers.deconstruct()[1], "tests.models.PublisherManager"
+        )
+        self.assertEqual(
+            Book.objects.deconstruct()[1], "django.db.models.manager.Manager"
+        )
+        self.assertEqual(PublisherManager(), Publisher.publishers)
+        self.assertIs(async_manager_type(type(Book.objects)), type(Book.objects))
+
+
+class AsyncIterTestCase(IsolatedAsyncioTestCase):
+    @tag("ci")
+    async def test_yields_control_every_batch(self):
+        switches = 0
+
+        async def ticker():
+            nonlocal switches
+            while True:
+                await asyncio.sleep(0)
+                switches += 1
+
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+        switches = 0
+        result = [element async for element in AsyncIter(range(10), batch_size=5)]
+        task.cancel()
+        self.assertEqual(result, list(range(10)))
+        self.assertEqual(switches, 2)
+
 
 class ModelTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
@@ -28,6 +146,17 @@ class ModelTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
     async def asyncTearDown(self):
         await TestModel.objects.adelete()
 
+    @tag("ci")
+    async def test_deprecated_methods(self):
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(await TestModel.objects.async_count(), 2)
+        with self.assertWarns(DeprecationWarning):
+            qs = await TestModel.objects.async_filter(name="setup 1")
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual((await qs.async_get()).name, "setup 1")
+        with self.assertWarns(DeprecationWarning):
+            self.assertFalse(await qs.async_ordered)
+
     @tag("ci")
     async def test_async_get(self):
         result = await TestModel.objects.aget(name="setup 1")
@@ -155,6 +284,42 @@ class ModelTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
             count += 1
         self.assertEqual(count, 2)
 
+    @tag("ci")
+    async def test_async_aiter_does_not_block_loop(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+        all_qs = await TestModel.objects.aall()
+        iterator = all_qs.__aiter__()
+        started = ticks
+        await iterator.__anext__()
+        task.cancel()
+        self.assertGreater(ticks, started)
+
+    @tag("ci")
+    async def test_async_iterator(self):
+        await TestModel.objects.abulk_create(
+            [TestModel(name=f"iterator {i}") for i in range(5)]
+        )
+        qs = await TestModel.objects.aorder_by("id")
+        names = [obj.name async for obj in qs.aiterator(chunk_size=2)]
+        self.assertEqual(len(names), 7)
+        self.assertEqual(names[:2], ["setup 1", "setup 2"])
+        self.assertIsNone(qs._result_cache)
+
+    @tag("ci")
+    async def test_async_iterator_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            async for obj in TestModel.objects.aiterator(chunk_size=0):
+                pass
+
     @tag("dev")
     async def test_async_fetch_all(self):
         self.assertTrue(False, "Not Implemented")
@@ -248,6 +413,1878 @@ class ModelTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
     async def test_async_resolve_expression(self):
         self.assertTrue(False, "Not Implemented")
 
-    @tag("dev")
+    @tag("ci")
     async def test_async_async_ordered(self):
-        self.assertTrue(False, "Not Implemented")
+        self.assertFalse(await TestModel.objects.aall().aordered)
+        self.assertTrue(await TestModel.objects.aorder_by("name").aordered)
+
+    @tag("ci")
+    async def test_async_chaining(self):
+        qs = TestModel.objects.afilter(obj_type="setup").aexclude(name="setup 1")
+        self.assertIs(await qs, qs)
+        self.assertIsNone(qs._result_cache)
+        el = await qs.aorder_by("-name").afirst()
+        self.assertEqual(el.name, "setup 2")
+
+
+@skipUnless(aiosqlite, "aiosqlite is not installed")
+@override_settings(ASYNC_ORM_NATIVE_DATABASES=["default"])
+class NativeEngineTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await TestModel.objects.acreate(name="setup 1", obj_type="setup")
+        await TestModel.objects.acreate(name="setup 2", obj_type="setup")
+        self.events = []
+        add_listener(self.events.append)
+
+    async def asyncTearDown(self):
+        remove_listener(self.events.append)
+        # Every read ran on the native engine, without a database thread.
+        for event in self.events:
+            self.assertEqual(event.hops, 0, event)
+        await TestModel.objects.adelete()
+
+    @tag("ci")
+    def test_engine_is_configured(self):
+        self.assertIsNotNone(get_engine("default"))
+
+    @tag("ci")
+    async def test_native_get(self):
+        result = await TestModel.objects.aget(name="setup 1")
+        self.assertEqual(result.name, "setup 1")
+        self.assertEqual(result._state.db, "default")
+        self.assertFalse(result._state.adding)
+
+    @tag("ci")
+    async def test_native_get_does_not_exist(self):
+        with self.assertRaises(TestModel.DoesNotExist):
+            await TestModel.objects.aget(name="missing")
+
+    @tag("ci")
+    async def test_native_get_multiple_objects(self):
+        with self.assertRaises(TestModel.MultipleObjectsReturned):
+            await TestModel.objects.aget(obj_type="setup")
+
+    @tag("ci")
+    async def test_native_first_last(self):
+        qs = await TestModel.objects.aorder_by("name")
+        self.assertEqual((await qs.afirst()).name, "setup 1")
+        self.assertEqual((await qs.alast()).name, "setup 2")
+
+    @tag("ci")
+    async def test_native_iterator(self):
+        qs = await TestModel.objects.aorder_by("-name")
+        names = [obj.name async for obj in qs.aiterator(chunk_size=1)]
+        self.assertEqual(names, ["setup 2", "setup 1"])
+
+    @tag("ci")
+    async def test_native_count_exists(self):
+        qs = await TestModel.objects.afilter(obj_type="setup")
+        self.assertEqual(await qs.acount(), 2)
+        self.assertTrue(await qs.aexists())
+        qs = await TestModel.objects.afilter(name__in=[])
+        self.assertEqual(await qs.acount(), 0)
+        self.assertFalse(await qs.aexists())
+
+    @tag("ci")
+    async def test_native_connection_is_reused(self):
+        engine = get_engine("default")
+        await TestModel.objects.aget(name="setup 1")
+        (conn,) = engine._idle
+        self.assertEqual(await TestModel.objects.acount(), 2)
+        self.assertEqual(engine._idle, [conn])
+        self.assertEqual(len(self.events), 2)
+
+    @tag("ci")
+    async def test_discarded_connection_stops_its_thread(self):
+        # Fails when the aiosqlite internals the engine relies on change.
+        engine = get_engine("default")
+        await TestModel.objects.aget(name="setup 1")
+        (conn,) = engine._idle
+        self.assertTrue(conn._thread.daemon)
+        engine.reset()
+        await asyncio.to_thread(conn._thread.join, 5)
+        self.assertFalse(conn._thread.is_alive())
+        self.assertIsNone(conn._connection)
+        self.assertEqual(engine._idle, [])
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 3})
+class ExecutorTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        await TestModel.objects.adelete()
+
+    @tag("ci")
+    async def test_queries_run_in_pool(self):
+        await TestModel.objects.acreate(name="pool")
+        self.assertEqual(await TestModel.objects.acount(), 1)
+        stats = executor_stats()["default"]
+        self.assertEqual(stats["workers"], 3)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertGreaterEqual(stats["submitted"], 2)
+
+    @tag("ci")
+    async def test_concurrent_calls_use_several_workers(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait():
+            barrier.wait()
+            return threading.get_ident()
+
+        idents = await asyncio.gather(
+            run_sync("default", wait), run_sync("default", wait)
+        )
+        self.assertNotEqual(idents[0], idents[1])
+
+    @tag("ci")
+    async def test_obsolete_connections_are_closed(self):
+        worker = get_executor("default").get_worker()
+
+        def expire():
+            # Past CONN_MAX_AGE, as the request signals would see it.
+            connections["default"].ensure_connection()
+            connections["default"].close_at = time.monotonic() - 1
+            return connections["default"].connection
+
+        expired = await worker.run(expire)
+        raw = await worker.run(
+            lambda: connections["default"].ensure_connection()
+            or connections["default"].connection
+        )
+        self.assertIsNot(raw, expired)
+
+    @tag("ci")
+    async def test_pinned_worker(self):
+        pinned = asyncio.Event()
+
+        async def other_task():
+            await pinned.wait()
+            return await run_sync("default", threading.get_ident)
+
+        task = asyncio.ensure_future(other_task())
+        async with pin("default") as worker:
+            self.assertTrue(worker.reserved)
+            pinned.set()
+            idents = {await run_sync("default", threading.get_ident) for _ in range(5)}
+            other = await task
+        self.assertEqual(len(idents), 1)
+        self.assertNotIn(other, idents)
+        self.assertFalse(worker.reserved)
+        self.assertEqual(get_executor("default").stats()["reserved"], 0)
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 2})
+class AtomicTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    @tag("ci")
+    async def test_commit(self):
+        async with aatomic():
+            self.assertTrue(
+                await run_sync("default", lambda: connection.in_atomic_block)
+            )
+            author = await Author.objects.acreate(name="author")
+            await Book.objects.acreate(title="book", author=author)
+            idents = {await run_sync("default", threading.get_ident) for _ in range(3)}
+            self.assertEqual(len(idents), 1)
+        self.assertEqual(await Book.objects.acount(), 1)
+        self.assertEqual(get_executor("default").stats()["reserved"], 0)
+
+    @tag("ci")
+    async def test_rollback_and_savepoints(self):
+        with self.assertRaises(ValueError):
+            async with aatomic():
+                await Author.objects.acreate(name="rolled back")
+                raise ValueError
+        async with aatomic():
+            await Author.objects.acreate(name="kept")
+            with self.assertRaises(IntegrityError):
+                async with aatomic():
+                    await Tag.objects.acreate(name="tag")
+                    await Tag.objects.acreate(name="tag")
+            self.assertFalse(await Tag.objects.aexists())
+        self.assertEqual(
+            [author.name for author in await Author.objects.alist()], ["kept"]
+        )
+
+    @tag("ci")
+    async def test_cancelled_block_rolls_back(self):
+        started = asyncio.Event()
+
+        async def write():
+            async with aatomic():
+                await Author.objects.acreate(name="cancelled")
+                started.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(write())
+        await started.wait()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertFalse(await Author.objects.aexists())
+
+    @tag("ci")
+    async def test_timed_out_block_rolls_back(self):
+        with self.assertRaises(QueryTimeout):
+            with query_timeout(0.1):
+                async with aatomic():
+                    await Author.objects.acreate(name="timed out")
+                    await run_sync("default", time.sleep, 0.2)
+        # No worker was left in the transaction.
+        workers = get_executor("default").workers
+        in_atomic_block = await asyncio.gather(
+            *(worker.run(lambda: connection.in_atomic_block) for worker in workers)
+        )
+        self.assertEqual(in_atomic_block, [False] * len(workers))
+        self.assertFalse(await Author.objects.aexists())
+
+    @tag("ci")
+    @override_settings(ASYNC_ORM_QUERY_TIMEOUT=0.1)
+    async def test_default_timeout_spares_the_commit(self):
+        def slow_commit():
+            time.sleep(0.2)
+
+        async with aatomic():
+            await Author.objects.acreate(name="committed")
+            await aon_commit(slow_commit)
+        self.assertTrue(await Author.objects.aexists())
+
+    @tag("ci")
+    async def test_on_commit(self):
+        called = []
+
+        async def notify():
+            called.append("async")
+
+        async with aatomic():
+            await aon_commit(lambda: called.append("sync"))
+            await aon_commit(notify)
+            self.assertEqual(called, [])
+        await asyncio.sleep(0)
+        self.assertEqual(called, ["sync", "async"])
+        with self.assertRaises(ValueError):
+            async with aatomic():
+                await aon_commit(lambda: called.append("rolled back"))
+                raise ValueError
+        self.assertEqual(len(called), 2)
+
+    @tag("ci")
+    @skipUnless(aiosqlite, "aiosqlite is not installed")
+    async def test_reads_see_the_transaction(self):
+        with self.settings(
+            ASYNC_ORM_NATIVE_DATABASES=["default"],
+            ASYNC_ORM_CACHE={"TIMEOUT": 60},
+        ):
+            self.assertEqual(await Author.objects.acount(), 0)
+            async with aatomic():
+                await Author.objects.acreate(name="author")
+                self.assertEqual(await Author.objects.acount(), 1)
+                self.assertEqual(len(await Author.objects.alist()), 1)
+
+
+SLOW_WHERE = (
+    "(WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c "
+    "WHERE x < 1000000000) SELECT count(*) FROM c) > 0"
+)
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 1})
+class TimeoutTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await Author.objects.acreate(name="author")
+        self.slow = Author.objects.extra(where=[SLOW_WHERE])
+
+    async def assertInterrupted(self, aw, exception=QueryTimeout):
+        start = time.monotonic()
+        with self.assertRaises(exception):
+            await aw
+        # The worker is free again: the statement was interrupted.
+        self.assertEqual(await Author.objects.acount(), 1)
+        self.assertLess(time.monotonic() - start, 5)
+
+    @tag("ci")
+    async def test_query_timeout(self):
+        async def count(outer, inner):
+            with query_timeout(outer), query_timeout(inner):
+                return await self.slow.acount()
+
+        await self.assertInterrupted(count(None, 0.1))
+        await self.assertInterrupted(count(5, 0.1))
+        await self.assertInterrupted(count(0.1, 5))
+
+    @tag("ci")
+    async def test_queryset_timeout(self):
+        slow = self.slow.atimeout(0.1)
+        self.assertEqual(slow.filter(name="author")._timeout, 0.1)
+        await self.assertInterrupted(slow.aexists())
+        await self.assertInterrupted(slow.aiterator().__anext__())
+        self.assertEqual(await Author.objects.atimeout(5).acount(), 1)
+
+    @tag("ci")
+    async def test_cancellation(self):
+        await self.assertInterrupted(
+            asyncio.wait_for(self.slow.aexists(), 0.1), asyncio.TimeoutError
+        )
+
+    @tag("ci")
+    @override_settings(ASYNC_ORM_QUERY_TIMEOUT=0.1)
+    async def test_default_timeout(self):
+        await self.assertInterrupted(self.slow.aexists())
+
+    @tag("ci")
+    @override_settings(ASYNC_ORM_EXECUTOR_WORKERS={})
+    async def test_shared_thread(self):
+        await self.assertInterrupted(self.slow.atimeout(0.1).aexists())
+
+    @tag("ci")
+    async def test_queued_calls_are_dropped(self):
+        ran = []
+        slow = asyncio.ensure_future(self.slow.aexists())
+        await asyncio.sleep(0.05)
+        with self.assertRaises(QueryTimeout):
+            with query_timeout(0.1):
+                await run_sync("default", ran.append, True)
+        slow.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await slow
+        self.assertEqual(await Author.objects.acount(), 1)
+        self.assertEqual(ran, [])
+
+    @tag("ci")
+    @skipUnless(aiosqlite, "aiosqlite is not installed")
+    @override_settings(ASYNC_ORM_NATIVE_DATABASES=["default"])
+    async def test_native_engine(self):
+        await self.assertInterrupted(self.slow.atimeout(0.1).alist())
+
+    @tag("ci")
+    async def test_postgresql_cancel_leaves_the_loop(self):
+        for method in ("cancel", "cancel_safe"):
+            with self.subTest(method=method):
+                sent = threading.Event()
+
+                def cancel():
+                    # Waits for the server to answer.
+                    time.sleep(0.2)
+                    sent.set()
+
+                call = Call("default", None)
+                call.connection = mock.Mock(vendor="postgresql")
+                call.connection.connection = mock.Mock(
+                    spec=["cancel", method], **{method: cancel}
+                )
+                start = time.monotonic()
+                call.cancel()
+                self.assertLess(time.monotonic() - start, 0.1)
+                self.assertTrue(await asyncio.to_thread(sent.wait, 5))
+
+
+@override_settings(
+    ASYNC_ORM_REPLICAS={"default": ["replica1", "replica2"]},
+    ASYNC_ORM_EXECUTOR_WORKERS={"default": 1, "replica1": 1, "replica2": 1},
+)
+class ReplicaRoutingTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    databases = {"default", "replica1", "replica2"}
+
+    def setUp(self):
+        # Each database holds a row named after it, with the same pk.
+        for alias in self.databases:
+            TestModel.objects.using(alias).create(pk=1, name=alias)
+        self.replicas = get_replica_set("default").replicas
+        for replica in self.replicas:
+            replica.latency = replica.last_chosen = None
+
+    def prefer(self, alias):
+        # Measured, recently chosen replicas: the fastest one is chosen.
+        for replica in self.replicas:
+            replica.latency = 0.001 if replica.alias == alias else 0.01
+            replica.last_chosen = time.monotonic()
+
+    async def read(self, queryset=None):
+        return (await (queryset or TestModel.objects).aget(pk=1)).name
+
+    @tag("ci")
+    async def test_reads_go_to_replicas(self):
+        names = [await self.read() for _ in range(4)]
+        self.assertEqual(set(names), {"replica1", "replica2"})
+        self.assertEqual(await self.read(TestModel.objects.using("default")), "default")
+        stats = replica_stats()
+        self.assertIsNotNone(stats["replica1"]["latency_ms"])
+        self.assertEqual(stats["replica1"]["in_flight"], 0)
+
+    @tag("ci")
+    async def test_latency_and_load(self):
+        self.prefer("replica2")
+        self.assertEqual(await self.read(), "replica2")
+        self.prefer("replica2")
+        # Calls in flight make the fast replica wait longer than the slow one.
+        self.replicas[1].in_flight = 20
+        try:
+            self.assertEqual(await self.read(), "replica1")
+        finally:
+            self.replicas[1].in_flight = 0
+
+    @tag("ci")
+    async def test_whole_call_on_one_replica(self):
+        self.prefer("replica1")
+        names = [obj.name async for obj in TestModel.objects.aiterator()]
+        self.assertEqual(names, ["replica1"])
+        self.prefer("replica2")
+        self.assertEqual(
+            [obj.name async for obj in TestModel.objects.all()], ["replica2"]
+        )
+
+    @tag("ci")
+    async def test_reads_stick_to_primary_after_write(self):
+        async def write_then_read():
+            await TestModel.objects.acreate(name="new")
+            return await TestModel.objects.filter(name="new").aexists()
+
+        self.assertTrue(await asyncio.ensure_future(write_then_read()))
+        # Other tasks still read from the replicas.
+        self.assertFalse(await TestModel.objects.filter(name="new").aexists())
+
+        async def save_then_read():
+            obj = await TestModel.objects.aget(pk=1)
+            self.assertIn(obj._state.db, ("replica1", "replica2"))
+            obj.name = "saved"
+            await obj.asave()
+            return await self.read()
+
+        # Instances read from a replica are saved on the primary.
+        self.assertEqual(await asyncio.ensure_future(save_then_read()), "saved")
+
+    @tag("ci")
+    async def test_use_primary(self):
+        with use_primary("default"):
+            self.assertEqual(await self.read(), "default")
+        async with aatomic():
+            self.assertEqual(await self.read(), "default")
+        self.assertNotEqual(await self.read(), "default")
+
+    @tag("ci")
+    @override_settings(ASYNC_ORM_HEDGE_AFTER=0.05)
+    async def test_hedged_read(self):
+        events = []
+        add_listener(events.append)
+        self.addCleanup(remove_listener, events.append)
+        # The only worker of replica1 is busy, its reads are queued.
+        busy = asyncio.ensure_future(run_sync("replica1", time.sleep, 1))
+        await asyncio.sleep(0.05)
+        self.prefer("replica1")
+        start = time.monotonic()
+        self.assertEqual(await self.read(), "replica2")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(events[-1].db, "replica2")
+        await busy
+        self.assertEqual(
+            await self.read(TestModel.objects.using("replica1")), "replica1"
+        )
+
+    @tag("ci")
+    @override_settings(ASYNC_ORM_HEDGE_AFTER=0.05)
+    async def test_hedged_attempts_use_their_own_queryset(self):
+        busy = asyncio.ensure_future(run_sync("replica1", time.sleep, 0.5))
+        await asyncio.sleep(0.05)
+        self.prefer("replica1")
+        querysets = []
+        read = routing._read
+
+        async def record(replica, func, queryset, args, kwargs):
+            querysets.append(queryset)
+            return await read(replica, func, queryset, args, kwargs)
+
+        queryset = TestModel.objects.all()
+        with mock.patch.object(routing, "_read", record):
+            objs = await queryset.alist()
+        self.assertEqual([obj.name for obj in objs], ["replica2"])
+        self.assertEqual(len(querysets), 2)
+        self.assertIsNot(querysets[0], querysets[1])
+        self.assertNotIn(queryset, querysets)
+        # The results of the read that answered are kept.
+        self.assertEqual(queryset._result_cache, objs)
+        await busy
+
+
+SHARDS = ["default", "replica1", "replica2"]
+
+
+@receiver(connection_created)
+def _add_sleep_function(connection, **kwargs):
+    # Lets queries wait without using the CPU, like a remote database.
+    if connection.vendor == "sqlite":
+        connection.connection.create_function("test_sleep", 1, time.sleep)
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={alias: 1 for alias in SHARDS})
+class ShardingTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    databases = set(SHARDS)
+
+    def setUp(self):
+        self.rows = []
+        for index in range(30):
+            alias = SHARDS[index * 7 % 3]
+            obj_type = None if index % 4 == 0 else f"type{index % 3}"
+            obj = TestModel.objects.using(alias).create(
+                name=f"name{index:02}", obj_type=obj_type
+            )
+            self.rows.append((obj_type, obj.name, obj.pk))
+
+    def sharded(self, queryset):
+        return queryset.ashards(SHARDS)
+
+    @tag("ci")
+    async def test_merged_order(self):
+        names = sorted(name for _, name, _ in self.rows)
+        qs = TestModel.objects.order_by("name")
+        self.assertEqual([obj.name for obj in await self.sharded(qs).alist()], names)
+        merged = [obj.name async for obj in self.sharded(qs).aiterator(chunk_size=2)]
+        self.assertEqual(merged, names)
+        reversed_names = [obj.name for obj in await self.sharded(qs.reverse()).alist()]
+        self.assertEqual(reversed_names, names[::-1])
+        # Nulls first, like sqlite sorts them.
+        expected = sorted(
+            [(obj_type, name) for obj_type, name, _ in self.rows][::-1],
+            key=lambda row: (row[0] is not None, row[0] or ""),
+        )
+        qs = TestModel.objects.order_by("obj_type", "-name")
+        rows = [
+            (obj.obj_type, obj.name)
+            async for obj in self.sharded(qs).aiterator(chunk_size=3)
+        ]
+        self.assertEqual(rows, expected)
+
+    @tag("ci")
+    async def test_values_and_slices(self):
+        names = sorted(name for _, name, _ in self.rows)
+        qs = TestModel.objects.order_by("-name")
+        self.assertEqual(
+            await self.sharded(qs.values_list("name", flat=True)[3:8]).alist(),
+            names[::-1][3:8],
+        )
+        self.assertEqual(
+            [row["name"] for row in await self.sharded(qs.values("name")[:4]).alist()],
+            names[::-1][:4],
+        )
+        self.assertEqual(
+            await self.sharded(qs.values_list("pk", "name")[28:]).alist(),
+            [(pk, name) for _, name, pk in sorted(self.rows, key=lambda r: r[1])][
+                1::-1
+            ],
+        )
+        unordered = await self.sharded(TestModel.objects.all()).alist()
+        self.assertEqual(sorted(obj.name for obj in unordered), names)
+        with self.assertRaises(ValueError):
+            await self.sharded(qs.values_list("pk")).alist()
+
+    @tag("ci")
+    async def test_early_exit(self):
+        async for obj in self.sharded(TestModel.objects.order_by("name")).aiterator(
+            chunk_size=1
+        ):
+            break
+        self.assertEqual(obj.name, "name00")
+        for alias in SHARDS:
+            self.assertEqual(await TestModel.objects.using(alias).acount(), 10)
+
+    @tag("ci")
+    async def test_count_and_aggregate(self):
+        qs = self.sharded(TestModel.objects.all())
+        self.assertEqual(await qs.acount(), 30)
+        self.assertEqual(
+            await self.sharded(TestModel.objects.order_by("pk")[25:40]).acount(), 5
+        )
+        pks = [pk for _, _, pk in self.rows]
+        typed = [pk for obj_type, _, pk in self.rows if obj_type is not None]
+        self.assertEqual(
+            await qs.aaggregate(
+                Count("obj_type"),
+                Sum("pk"),
+                low=Min("name"),
+                high=Max("name"),
+                mean=Avg("pk"),
+            ),
+            {
+                "obj_type__count": len(typed),
+                "pk__sum": sum(pks),
+                "low": "name00",
+                "high": "name29",
+                "mean": sum(pks) / len(pks),
+            },
+        )
+        empty = self.sharded(TestModel.objects.filter(name="none"))
+        self.assertEqual(
+            await empty.aaggregate(total=Sum("pk"), mean=Avg("pk")),
+            {"total": None, "mean": None},
+        )
+        with self.assertRaises(NotSupportedError):
+            await qs.aaggregate(Count("name", distinct=True))
+
+    @tag("ci")
+    async def test_shards_run_concurrently(self):
+        slow = TestModel.objects.extra(where=["(SELECT test_sleep(0.1)) IS NULL"])
+        start = time.monotonic()
+        self.assertEqual(await self.sharded(slow).acount(), 30)
+        # Run one after the other, the shards would take 300ms.
+        self.assertLess(time.monotonic() - start, 0.25)
+
+
+class PaginationTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        author = await Author.objects.acreate(name="author")
+        book = await Book.objects.acreate(title="book", author=author)
+        await Review.objects.abulk_create(
+            [
+                Review(book=book, rating=index % 4, score=index / 10)
+                for index in range(25)
+            ]
+        )
+
+    async def walk(self, queryset, order_by, limit):
+        pks = []
+        page = await queryset.apaginate(order_by=order_by, limit=limit)
+        pks.extend(review.pk for review in page)
+        while page.has_next:
+            self.assertEqual(len(page), limit)
+            page = await queryset.apaginate(
+                order_by=order_by, after=page.next_cursor, limit=limit
+            )
+            pks.extend(review.pk for review in page)
+        self.assertIsNone(page.next_cursor)
+        return pks
+
+    @tag("ci")
+    async def test_walks_in_order(self):
+        for order_by in (["-rating"], ["rating", "-score"], ["book", "-pk"]):
+            with self.subTest(order_by=order_by):
+                # The primary key completes the ordering in the same direction.
+                ordering = order_by
+                if order_by[-1].lstrip("-") != "pk":
+                    ordering = [*order_by, "-pk" if order_by[-1][0] == "-" else "pk"]
+                expected = await run_sync(
+                    "default",
+                    lambda: list(
+                        Review.objects.order_by(*ordering).values_list("pk", flat=True)
+                    ),
+                )
+                self.assertEqual(await self.walk(Review.objects, order_by, 7), expected)
+        filtered = Review.objects.filter(rating=1)
+        self.assertEqual(len(await self.walk(filtered, ["score"], 2)), 6)
+
+    @tag("ci")
+    async def test_relation_with_ordering(self):
+        # The writers are sorted by name in the opposite order of their pks.
+        writers = [await Writer.objects.acreate(name=name) for name in "cba"]
+        await Essay.objects.abulk_create(
+            [Essay(writer=writer) for writer in writers * 2]
+        )
+        expected = await run_sync(
+            "default",
+            lambda: list(
+                Essay.objects.order_by("writer_id", "pk").values_list("pk", flat=True)
+            ),
+        )
+        self.assertEqual(await self.walk(Essay.objects, ["writer"], 2), expected)
+        self.assertEqual(len(expected), 6)
+
+    @tag("ci")
+    async def test_aiter_pages_seeks_without_offset(self):
+        events = []
+        add_listener(events.append)
+        try:
+            pages = [page async for page in Review.objects.aiter_pages(limit=10)]
+        finally:
+            remove_listener(events.append)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([event.method for event in events], ["apaginate"] * 3)
+        self.assertEqual([event.rows for event in events], [10, 10, 5])
+        for event in events:
+            self.assertNotIn("OFFSET", event.sql[0])
+        self.assertEqual(
+            [page async for page in Review.objects.filter(rating=9).aiter_pages()], []
+        )
+
+    @tag("ci")
+    async def test_invalid_arguments(self):
+        page = await Review.objects.apaginate(order_by=["rating"], limit=5)
+        for cursor in (page.next_cursor + "x", "not a cursor", ""):
+            with self.assertRaises(ValueError):
+                await Review.objects.apaginate(order_by=["rating"], after=cursor)
+        with self.assertRaises(ValueError):
+            await Review.objects.apaginate(order_by=["-rating"], after=page.next_cursor)
+        with self.assertRaises(ValueError):
+            await Review.objects.apaginate(order_by=["created_at"])
+        with self.assertRaises(ValueError):
+            await Review.objects.apaginate(order_by=["book__title"])
+        with self.assertRaises(ValueError):
+            await Review.objects.apaginate(limit=0)
+        with self.assertRaises(TypeError):
+            await Review.objects.all()[:5].apaginate()
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 3})
+class PrefetchTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        tags = [await Tag.objects.acreate(name=name) for name in ("a", "b")]
+        for index in range(2):
+            author = await Author.objects.acreate(name=f"author {index}")
+            for position in range(2):
+                book = await Book.objects.acreate(
+                    title=f"book {index}.{position}", author=author
+                )
+                await run_sync("default", book.tags.set, tags[: position + 1])
+                await Review.objects.acreate(book=book, rating=position)
+
+    @tag("ci")
+    async def test_prefetch_related(self):
+        authors = (
+            await Author.objects.aprefetch_related(
+                "books", "books__reviews", "books__tags"
+            )
+            .order_by("name")
+            .alist()
+        )
+        self.assertEqual(len(authors), 2)
+        for author in authors:
+            books = author._prefetched_objects_cache["books"]
+            self.assertEqual(len(books), 2)
+            for book in books:
+                self.assertEqual(book.author, author)
+                self.assertEqual(len(book._prefetched_objects_cache["reviews"]), 1)
+                self.assertIn(len(book._prefetched_objects_cache["tags"]), (1, 2))
+
+    @tag("ci")
+    async def test_independent_lookups_run_concurrently(self):
+        submitted = get_executor("default").submitted
+        books = await Book.objects.aprefetch_related(
+            "tags", "reviews", Prefetch("author", to_attr="writer")
+        ).alist()
+        # One hop for the rows, then one per independent lookup.
+        self.assertEqual(get_executor("default").submitted - submitted, 4)
+        for book in books:
+            self.assertEqual(book.writer.pk, book.author_id)
+            self.assertEqual(len(book._prefetched_objects_cache["reviews"]), 1)
+        self.assertEqual(
+            sorted(len(book._prefetched_objects_cache["tags"]) for book in books),
+            [1, 1, 2, 2],
+        )
+
+    @tag("ci")
+    async def test_lookup_through_to_attr(self):
+        def slow_books(execute, sql, params, many, context):
+            if "tests_book" in sql:
+                time.sleep(0.05)
+            return execute(sql, params, many, context)
+
+        def add_latency():
+            connections["default"].execute_wrappers.insert(0, slow_books)
+
+        def remove_latency():
+            connections["default"].execute_wrappers.remove(slow_books)
+
+        workers = get_executor("default").workers
+        await asyncio.gather(*(worker.run(add_latency) for worker in workers))
+        try:
+            # "bk__reviews" waits for the slow "bk" prefetch it starts from.
+            authors = await Author.objects.aprefetch_related(
+                Prefetch("books", to_attr="bk"), "bk__reviews"
+            ).alist()
+        finally:
+            await asyncio.gather(*(worker.run(remove_latency) for worker in workers))
+        for author in authors:
+            self.assertEqual(len(author.bk), 2)
+            for book in author.bk:
+                self.assertEqual(len(book._prefetched_objects_cache["reviews"]), 1)
+
+    @tag("ci")
+    async def test_prefetch_empty_queryset(self):
+        self.assertEqual(
+            await Author.objects.filter(name="nobody")
+            .aprefetch_related("books")
+            .alist(),
+            [],
+        )
+
+
+class ModelInstanceTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        author = await Author.objects.acreate(name="author")
+        self.book = await Book.objects.acreate(title="book", author=author)
+        self.review = await Review.objects.acreate(book=self.book, rating=1, score=0.5)
+        self.saves = []
+        pre_save.connect(self.record_save, sender=Review)
+
+    async def asyncTearDown(self):
+        pre_save.disconnect(self.record_save, sender=Review)
+
+    def record_save(self, update_fields, **kwargs):
+        self.saves.append(update_fields and set(update_fields))
+
+    @tag("ci")
+    async def test_asave_writes_changed_fields(self):
+        review = await Review.objects.aget(pk=self.review.pk)
+        self.assertEqual(changed_fields(review), [])
+        await review.asave(only_changed=True)
+        self.assertEqual(self.saves, [])
+
+        review.rating = 5
+        self.assertEqual(changed_fields(review), ["rating"])
+        await review.asave(only_changed=True)
+        review.score = 0.5
+        review.book_id = self.book.pk
+        await review.asave(only_changed=True)
+        self.assertEqual(self.saves, [{"rating"}])
+        self.assertEqual((await Review.objects.aget(pk=review.pk)).rating, 5)
+
+    @tag("ci")
+    async def test_asave_untracked_instances(self):
+        review = Review(book=self.book, rating=2)
+        self.assertIsNone(changed_fields(review))
+        await review.asave(only_changed=True)
+        await review.asave(only_changed=True)
+        review.pk = None
+        review._state.adding = True
+        await review.asave(only_changed=True)
+        self.assertEqual(self.saves, [None, None])
+        self.assertEqual(await Review.objects.acount(), 3)
+
+    @tag("ci")
+    async def test_asave_deferred_and_explicit_fields(self):
+        review = await Review.objects.only("rating").aget(pk=self.review.pk)
+        review.score = 2.0
+        await review.asave(only_changed=True)
+        review.rating = 3
+        review.score = 3.0
+        await review.asave(update_fields=["rating"])
+        self.assertEqual(changed_fields(review), ["score"])
+        self.assertEqual(self.saves, [{"score"}, {"rating"}])
+        await review.arefresh_from_db()
+        self.assertEqual((review.rating, review.score), (3, 2.0))
+
+    @tag("ci")
+    async def test_asave_saves_fields_set_by_save(self):
+        article = await Article.objects.acreate(title="First title")
+        article = await Article.objects.aget(pk=article.pk)
+        article.title = "Second title"
+        await article.asave()
+        self.assertEqual(
+            (await Article.objects.aget(pk=article.pk)).slug, "second-title"
+        )
+        review = await Review.objects.aget(pk=self.review.pk)
+        await review.asave()
+        self.assertEqual(self.saves, [None])
+
+    @tag("ci")
+    async def test_arefresh_from_db_fields(self):
+        review = await Review.objects.aget(pk=self.review.pk)
+        await Review.objects.filter(pk=review.pk).aupdate(rating=7, score=7.0)
+        review.score = 1.5
+        await review.arefresh_from_db(fields=["rating"])
+        self.assertEqual((review.rating, review.score), (7, 1.5))
+        self.assertEqual(changed_fields(review), ["score"])
+
+    @tag("ci")
+    async def test_adelete(self):
+        review = await Review.objects.aget(pk=self.review.pk)
+        self.assertEqual(await review.adelete(), (1, {"tests.Review": 1}))
+        self.assertFalse(await Review.objects.aexists())
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 3})
+class RelatedManagerTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tags = [await Tag.objects.acreate(name=name) for name in ("a", "b")]
+        self.authors = [
+            await Author.objects.acreate(name=f"author {index}") for index in range(3)
+        ]
+        for index, author in enumerate(self.authors[:2]):
+            for position in range(index + 1):
+                await Book.objects.acreate(
+                    title=f"book {index}.{position}", author=author
+                )
+
+    @tag("ci")
+    async def test_related_queries(self):
+        author = self.authors[1]
+        self.assertEqual(await author.books.acount(), 2)
+        self.assertEqual(
+            [book.title for book in await author.books.aorder_by("-title").alist()],
+            ["book 1.1", "book 1.0"],
+        )
+        self.assertEqual(
+            (await Book.catalog.titled("book 1.0").aget()).author_id, author.pk
+        )
+        await Publisher.publishers.acreate(name="")
+        await Publisher.publishers.acreate(name="press")
+        self.assertEqual(await Publisher._default_manager.acount(), 1)
+
+    @tag("ci")
+    async def test_sync_evaluation_on_the_loop(self):
+        author = self.authors[1]
+        # Querysets of Model.objects are evaluated in a thread, on another
+        # connection.
+        self.assertEqual(len(Book.objects.filter(author=author)), 2)
+        for name, queryset in (
+            ("related", author.books.all()),
+            ("catalog", Book.catalog.all()),
+            ("base", Book._base_manager.all()),
+        ):
+            with self.subTest(manager=name):
+                with self.assertRaises(SynchronousOnlyOperation):
+                    list(queryset)
+        # The thread's connection would not see the transaction.
+        async with aatomic():
+            with self.assertRaises(SynchronousOnlyOperation):
+                list(Book.objects.all())
+
+    @tag("ci")
+    async def test_related_writes(self):
+        author = self.authors[2]
+        book = await author.books.acreate(title="new")
+        self.assertEqual(book.author_id, author.pk)
+        await book.tags.aadd(*self.tags)
+        self.assertEqual(await book.tags.acount(), 2)
+        await book.tags.aremove(self.tags[0])
+        self.assertEqual([tag.name for tag in await book.tags.alist()], ["b"])
+        await book.tags.aset([self.tags[0]])
+        self.assertEqual(
+            [book.title for book in await self.tags[0].books.alist()], ["new"]
+        )
+        await book.tags.aclear()
+        self.assertFalse(await book.tags.aexists())
+
+    @tag("ci")
+    async def test_related_writes_use_pinned_worker(self):
+        book = await Book.objects.afirst()
+        async with pin("default") as worker:
+            await book.tags.aadd(self.tags[0])
+        self.assertEqual(worker.pending, 0)
+        self.assertEqual(await book.tags.acount(), 1)
+
+    @tag("ci")
+    async def test_arelated(self):
+        submitted = get_executor("default").submitted
+        books = await arelated(self.authors, "books")
+        self.assertEqual(get_executor("default").submitted - submitted, 1)
+        self.assertEqual([len(related) for related in books], [1, 2, 0])
+        # The prefetch cache now answers without querying.
+        self.assertEqual(len(await self.authors[1].books.alist()), 2)
+        self.assertEqual(get_executor("default").submitted - submitted, 1)
+
+        authors = await Author.objects.order_by("pk").alist()
+        titles = await arelated(
+            authors, "books", queryset=Book.objects.filter(title__endswith=".1")
+        )
+        self.assertEqual([len(related) for related in titles], [0, 1, 0])
+        book_list = await Book.objects.order_by("title").alist()
+        authors = await arelated(book_list, "author")
+        self.assertEqual(
+            [author.pk for author in authors],
+            [self.authors[0].pk, self.authors[1].pk, self.authors[1].pk],
+        )
+        self.assertEqual(await arelated([], "books"), [])
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 3})
+class BulkCreateStreamTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    @tag("ci")
+    async def test_stream(self):
+        async def objs():
+            for index in range(25):
+                await asyncio.sleep(0)
+                yield TestModel(name=f"stream {index}", obj_type="stream")
+
+        result = await TestModel.objects.abulk_create_stream(
+            objs(), batch_size=10, max_in_flight=2
+        )
+        self.assertEqual((result.created, result.batches, result.errors), (25, 3, []))
+        self.assertEqual(await TestModel.objects.filter(obj_type="stream").acount(), 25)
+        self.assertLessEqual(executor_stats()["default"]["max_queue_depth"], 2)
+
+    @tag("ci")
+    async def test_stream_backpressure(self):
+        consumed = 0
+
+        def objs():
+            nonlocal consumed
+            for index in range(100):
+                consumed += 1
+                yield TestModel(name=f"stream {index}")
+
+        task = asyncio.ensure_future(
+            TestModel.objects.abulk_create_stream(objs(), batch_size=10)
+        )
+        await asyncio.sleep(0)
+        # Two batches in flight and the third one waiting for a slot.
+        self.assertEqual(consumed, 30)
+        result = await task
+        self.assertEqual((result.created, result.batches), (100, 10))
+
+    @tag("ci")
+    async def test_stream_batch_errors(self):
+        await Tag.objects.acreate(name="taken")
+        names = ["a", "b", "taken", "c", "d", "e"]
+        result = await Tag.objects.abulk_create_stream(
+            (Tag(name=name) for name in names), batch_size=2
+        )
+        self.assertEqual((result.created, result.batches, result.failed), (4, 3, 2))
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(result.errors[0].index, 1)
+        self.assertIsInstance(result.errors[0].exception, IntegrityError)
+        self.assertEqual(await Tag.objects.acount(), 5)
+
+    @tag("ci")
+    async def test_stream_ignore_conflicts(self):
+        await Tag.objects.acreate(name="taken")
+        result = await Tag.objects.abulk_create_stream(
+            (Tag(name=name) for name in ["a", "taken", "b"]),
+            batch_size=2,
+            ignore_conflicts=True,
+        )
+        # The skipped row is counted: created counts the objects sent.
+        self.assertEqual((result.created, result.batches, result.failed), (3, 2, 0))
+        self.assertEqual(await Tag.objects.acount(), 3)
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 3})
+class BulkUpdateTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await TestModel.objects.abulk_create(
+            [TestModel(name=f"name {index}", obj_type="old") for index in range(50)]
+        )
+        self.objs = await TestModel.objects.order_by("pk").alist()
+
+    @tag("ci")
+    async def test_bulk_update(self):
+        for obj in self.objs:
+            obj.name = obj.name.upper()
+            obj.obj_type = None if obj.pk % 2 else "new"
+        for max_in_flight in (1, 3):
+            with self.subTest(max_in_flight=max_in_flight):
+                rows = await TestModel.objects.abulk_update(
+                    self.objs,
+                    ["name", "obj_type"],
+                    batch_size=7,
+                    max_in_flight=max_in_flight,
+                )
+                self.assertEqual(rows, 50)
+                objs = await TestModel.objects.order_by("pk").alist()
+                self.assertEqual(
+                    [(obj.name, obj.obj_type) for obj in objs],
+                    [(obj.name, obj.obj_type) for obj in self.objs],
+                )
+
+    @tag("ci")
+    async def test_bulk_update_falls_back_for_expressions(self):
+        for obj in self.objs:
+            obj.name = Upper("obj_type")
+        self.assertEqual(await TestModel.objects.abulk_update(self.objs, ["name"]), 50)
+        self.assertEqual(
+            await TestModel.objects.filter(name="OLD").acount(), len(self.objs)
+        )
+
+    @tag("ci")
+    async def test_bulk_update_filtered_queryset(self):
+        for obj in self.objs:
+            obj.obj_type = "new"
+        qs = TestModel.objects.filter(pk__in=[obj.pk for obj in self.objs[:5]])
+        self.assertEqual(await qs.abulk_update(self.objs, ["obj_type"]), 5)
+        self.assertEqual(await TestModel.objects.filter(obj_type="new").acount(), 5)
+
+    @tag("ci")
+    async def test_bulk_update_errors(self):
+        with self.assertRaises(ValueError):
+            await TestModel.objects.abulk_update(self.objs, [])
+        with self.assertRaises(ValueError):
+            await TestModel.objects.abulk_update(self.objs, ["id"])
+        with self.assertRaises(ValueError):
+            await TestModel.objects.abulk_update([TestModel(name="new")], ["name"])
+        self.assertEqual(await TestModel.objects.abulk_update([], ["name"]), 0)
+
+    @tag("ci")
+    @skipUnless(django.VERSION < (4, 1), "update_conflicts requires Django 4.1")
+    async def test_bulk_upsert_unsupported(self):
+        with self.assertRaises(NotSupportedError):
+            await Tag.objects.abulk_upsert([Tag(name="a")], update_fields=["color"])
+
+    @tag("ci")
+    @skipUnless(django.VERSION >= (4, 1), "update_conflicts requires Django 4.1")
+    async def test_bulk_upsert(self):
+        await Tag.objects.acreate(name="a", color="red")
+        tags = [Tag(name=name, color="blue") for name in ("a", "b", "c")]
+        for max_in_flight in (1, 2):
+            with self.subTest(max_in_flight=max_in_flight):
+                rows = await Tag.objects.abulk_upsert(
+                    tags,
+                    update_fields=["color"],
+                    unique_fields=["name"],
+                    batch_size=2,
+                    max_in_flight=max_in_flight,
+                )
+                self.assertEqual(rows, 3)
+                self.assertEqual(
+                    [
+                        (tag.name, tag.color)
+                        for tag in await Tag.objects.order_by("name").alist()
+                    ],
+                    [("a", "blue"), ("b", "blue"), ("c", "blue")],
+                )
+
+
+class ValuesColumnsTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        author = await Author.objects.acreate(name="author")
+        book = await Book.objects.acreate(title="book", author=author)
+        self.created_at = datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 6, datetime.timezone.utc
+        )
+        await Review.objects.abulk_create(
+            [
+                Review(
+                    book=book,
+                    rating=index,
+                    score=index / 2,
+                    created_at=self.created_at + datetime.timedelta(days=index),
+                )
+                for index in range(5)
+            ]
+        )
+
+    @tag("ci")
+    async def test_values_columns(self):
+        columns = await Review.objects.order_by("rating").avalues_columns(
+            "score", "rating", "book", "created_at", chunk_size=2
+        )
+        self.assertEqual(list(columns), ["score", "rating", "book", "created_at"])
+        self.assertEqual(columns["rating"], array.array("q", range(5)))
+        self.assertEqual(columns["score"], array.array("d", [0, 0.5, 1, 1.5, 2]))
+        book = await Book.objects.aget()
+        self.assertEqual(columns["book"], array.array("q", [book.pk] * 5))
+        epoch = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+        self.assertEqual(
+            columns["created_at"][1],
+            (self.created_at + datetime.timedelta(days=1) - epoch)
+            // datetime.timedelta(microseconds=1),
+        )
+
+    @tag("ci")
+    async def test_values_columns_nullable(self):
+        await Review.objects.filter(rating=3).aupdate(created_at=None)
+        columns = await Review.objects.order_by("rating").avalues_columns(
+            "created_at", "book__title"
+        )
+        self.assertIsInstance(columns["created_at"], list)
+        self.assertIsNone(columns["created_at"][3])
+        self.assertEqual(columns["book__title"], ["book"] * 5)
+
+    @tag("ci")
+    async def test_values_columns_annotations_and_empty(self):
+        columns = await Book.objects.annotate(
+            reviews_count=Count("reviews")
+        ).avalues_columns("reviews_count")
+        self.assertEqual(columns, {"reviews_count": array.array("q", [5])})
+        self.assertEqual(
+            await Review.objects.none().avalues_columns("rating"),
+            {"rating": array.array("q")},
+        )
+        with self.assertRaises(ValueError):
+            await Review.objects.avalues_columns("rating", chunk_size=0)
+
+    @skipUnless(numpy, "numpy is not installed")
+    @tag("ci")
+    async def test_values_columns_numpy(self):
+        columns = await Review.objects.order_by("rating").avalues_columns(
+            "rating", "score", "created_at", "book__title", numpy=True
+        )
+        self.assertEqual(columns["rating"].dtype, numpy.int64)
+        self.assertEqual(columns["score"].sum(), 5)
+        self.assertEqual(
+            columns["created_at"][0], numpy.datetime64("2024-01-02T03:04:05.000006")
+        )
+        self.assertEqual(columns["book__title"].dtype, object)
+
+    @skipUnless(aiosqlite, "aiosqlite is not installed")
+    @tag("ci")
+    async def test_values_columns_native(self):
+        with override_settings(ASYNC_ORM_NATIVE_DATABASES=["default"]):
+            self.assertIsNotNone(get_engine("default"))
+            columns = await Review.objects.order_by("rating").avalues_columns(
+                "rating", "created_at"
+            )
+        self.assertEqual(columns["rating"], array.array("q", range(5)))
+        self.assertEqual(len(columns["created_at"]), 5)
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 2})
+class InstrumentationTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await TestModel.objects.acreate(name="setup 1", obj_type="setup")
+        await TestModel.objects.acreate(name="setup 2", obj_type="setup")
+        self.events = []
+        add_listener(self.events.append)
+
+    async def asyncTearDown(self):
+        remove_listener(self.events.append)
+
+    @tag("ci")
+    async def test_read_event(self):
+        obj = await TestModel.objects.aget(name="setup 1")
+        (event,) = self.events
+        self.assertEqual(
+            (event.method, event.model, event.db), ("aget", TestModel, "default")
+        )
+        self.assertIs(event.task, asyncio.current_task())
+        self.assertEqual((event.rows, event.hops), (1, 1))
+        self.assertEqual(len(event.sql), 1)
+        self.assertIn("tests_testmodel", event.sql[0])
+        self.assertIsNotNone(event.queue_depth)
+        self.assertGreater(event.execution, 0)
+        self.assertGreaterEqual(event.execution, event.sql_time)
+        self.assertGreaterEqual(event.duration, event.execution + event.queue_wait)
+        self.assertIsNone(event.exception)
+        self.assertEqual(obj.name, "setup 1")
+
+    @tag("ci")
+    async def test_write_and_error_events(self):
+        await TestModel.objects.filter(obj_type="setup").aupdate(name="updated")
+        with self.assertRaises(TestModel.DoesNotExist):
+            await TestModel.objects.aget(name="missing")
+        update, get = self.events
+        self.assertEqual((update.method, update.rows), ("aupdate", 2))
+        self.assertEqual(get.rows, 0)
+        self.assertIsInstance(get.exception, TestModel.DoesNotExist)
+
+    @tag("ci")
+    async def test_nested_calls_make_one_event(self):
+        author = await Author.objects.acreate(name="author")
+        await Book.objects.acreate(title="book", author=author)
+        self.events.clear()
+        await Author.objects.aprefetch_related("books").alist()
+        (event,) = self.events
+        self.assertEqual((event.method, event.rows, event.hops), ("alist", 1, 2))
+        self.assertEqual(len(event.sql), 2)
+
+    @tag("ci")
+    async def test_iteration_events(self):
+        async for _ in TestModel.objects.all():
+            pass
+        async for _ in TestModel.objects.aiterator(chunk_size=1):
+            pass
+        await TestModel.objects.avalues_columns("id")
+        self.assertEqual(
+            [(event.method, event.rows) for event in self.events],
+            [("aiter", 2), ("aiterator", 2), ("avalues_columns", 2)],
+        )
+        self.assertEqual(self.events[1].hops, 3)
+
+    @tag("ci")
+    async def test_stats_collector(self):
+        collector = StatsCollector()
+        add_listener(collector)
+        try:
+            for _ in range(3):
+                await TestModel.objects.acount()
+            await TestModel.objects.acreate(name="new")
+        finally:
+            remove_listener(collector)
+        stats = collector.snapshot()
+        self.assertEqual(
+            set(stats), {"tests.TestModel.acount", "tests.TestModel.acreate"}
+        )
+        count = stats["tests.TestModel.acount"]
+        self.assertEqual((count["calls"], count["rows"], count["errors"]), (3, 3, 0))
+        self.assertEqual(count["duration"]["count"], 3)
+        self.assertEqual(sum(count["duration"]["buckets"].values()), 3)
+        self.assertGreater(count["duration"]["p99_ms"], 0)
+        collector.reset()
+        self.assertEqual(collector.snapshot(), {})
+
+    @tag("ci")
+    async def test_failing_listener(self):
+        def fail(event):
+            raise RuntimeError
+
+        add_listener(fail)
+        try:
+            with self.assertLogs("django_async_orm", "ERROR"):
+                self.assertEqual(await TestModel.objects.acount(), 2)
+        finally:
+            remove_listener(fail)
+
+    @tag("ci")
+    async def test_disabled(self):
+        remove_listener(self.events.append)
+        await TestModel.objects.acount()
+        self.assertEqual(self.events, [])
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 2})
+class BatchTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await TestModel.objects.acreate(name="setup 1", obj_type="setup")
+        await TestModel.objects.acreate(name="setup 2", obj_type="setup")
+
+    async def asyncTearDown(self):
+        await TestModel.objects.adelete()
+
+    @tag("ci")
+    async def test_agather_single_hop(self):
+        executor = get_executor("default")
+        submitted = executor.submitted
+        count, first, objs, exists = await agather(
+            TestModel.objects.acount(),
+            TestModel.objects.aorder_by("-name").afirst(),
+            TestModel.objects.afilter(name="setup 1").alist(),
+            TestModel.objects.afilter(name="missing").aexists(),
+        )
+        self.assertEqual(executor.submitted - submitted, 1)
+        self.assertEqual(count, 2)
+        self.assertEqual(first.name, "setup 2")
+        self.assertEqual([obj.name for obj in objs], ["setup 1"])
+        self.assertFalse(exists)
+
+    @tag("ci")
+    async def test_agather_exceptions(self):
+        with self.assertRaises(TestModel.DoesNotExist):
+            await agather(TestModel.objects.acount(), TestModel.objects.aget(pk=0))
+        count, error = await agather(
+            TestModel.objects.acount(),
+            TestModel.objects.aget(pk=0),
+            return_exceptions=True,
+        )
+        self.assertEqual(count, 2)
+        self.assertIsInstance(error, TestModel.DoesNotExist)
+
+    @tag("ci")
+    async def test_agather_hop_context(self):
+        events = []
+        add_listener(events.append)
+        self.addCleanup(remove_listener, events.append)
+
+        async def with_timeout():
+            with query_timeout(0.05):
+                return await TestModel.objects.acount()
+
+        def slow():
+            time.sleep(0.1)
+            return "slow"
+
+        # The hop is neither measured in the event nor timed out by the
+        # deadline of the first call.
+        count, result = await agather(with_timeout(), run_sync("default", slow))
+        self.assertEqual((count, result), (2, "slow"))
+        self.assertEqual([event.hops for event in events], [1])
+
+    @tag("ci")
+    async def test_agather_hop_error(self):
+        loop = asyncio.get_running_loop()
+        unhandled = []
+        loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+
+        def fail(*args):
+            raise ConnectionError("worker failed")
+
+        with mock.patch.object(get_executor("default"), "run", side_effect=fail):
+            results = await agather(
+                TestModel.objects.acount(),
+                TestModel.objects.afirst(),
+                return_exceptions=True,
+            )
+        self.assertEqual([type(result) for result in results], [ConnectionError] * 2)
+        await asyncio.sleep(0)
+        gc.collect()
+        self.assertEqual(unhandled, [])
+
+    @tag("ci")
+    async def test_agather_pinned_worker(self):
+        async with pin("default"):
+            ident = await run_sync("default", threading.get_ident)
+            idents = await agather(
+                run_sync("default", threading.get_ident),
+                run_sync("default", threading.get_ident),
+            )
+        self.assertEqual(idents, [ident, ident])
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 2})
+class LoaderTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.objs = [
+            await TestModel.objects.acreate(name=f"loader {i}") for i in range(3)
+        ]
+
+    async def asyncTearDown(self):
+        await TestModel.objects.adelete()
+
+    @tag("ci")
+    async def test_aload_coalesces_lookups(self):
+        executor = get_executor("default")
+        submitted = executor.submitted
+        pks = [obj.pk for obj in self.objs]
+        results = await asyncio.gather(
+            *(TestModel.objects.aload(pk=pk) for pk in pks),
+            TestModel.objects.aload(pk=str(pks[0])),
+        )
+        self.assertEqual(executor.submitted - submitted, 1)
+        self.assertEqual([obj.pk for obj in results], pks + [pks[0]])
+        self.assertIs(results[0], results[-1])
+
+    @tag("ci")
+    async def test_aload_missing(self):
+        results = await asyncio.gather(
+            TestModel.objects.aload(pk=self.objs[0].pk),
+            TestModel.objects.aload(pk=0),
+            return_exceptions=True,
+        )
+        self.assertEqual(results[0].pk, self.objs[0].pk)
+        self.assertIsInstance(results[1], TestModel.DoesNotExist)
+
+    @tag("ci")
+    async def test_aload_requires_unique_field(self):
+        with self.assertRaises(ValueError):
+            await TestModel.objects.aload(name="loader 1")
+
+
+class LRUCacheBackendTestCase(TestCase):
+    @tag("ci")
+    def test_lru_eviction(self):
+        backend = LRUCacheBackend(MAX_ENTRIES=2)
+        backend.set("a", 1, 60, {"t1"})
+        backend.set("b", 2, 60, {"t1"})
+        backend.get("a")
+        backend.set("c", 3, 60, {"t2"})
+        self.assertEqual(backend.get("a"), 1)
+        self.assertIs(backend.get("b"), MISSING)
+        self.assertEqual(len(backend), 2)
+
+    @tag("ci")
+    def test_expiry_and_invalidation(self):
+        backend = LRUCacheBackend()
+        backend.set("expired", 1, -1, {"t1"})
+        backend.set("a", 1, 60, {"t1", "t2"})
+        backend.set("b", 2, 60, {"t3"})
+        self.assertIs(backend.get("expired"), MISSING)
+        backend.invalidate({"t2"})
+        self.assertIs(backend.get("a"), MISSING)
+        self.assertEqual(backend.get("b"), 2)
+
+
+@override_settings(ASYNC_ORM_CACHE={"TIMEOUT": 60})
+class QueryCacheTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await TestModel.objects.acreate(name="setup 1", obj_type="setup")
+        self.cache = get_query_cache()
+        self.cache.backend.clear()
+        self.cache.hits = self.cache.misses = 0
+
+    async def asyncTearDown(self):
+        await TestModel.objects.adelete()
+
+    @tag("ci")
+    async def test_hits_and_misses(self):
+        qs = TestModel.objects.afilter(obj_type="setup")
+        self.assertEqual(await qs.acount(), 1)
+        self.assertEqual(await qs.acount(), 1)
+        first = await TestModel.objects.aget(name="setup 1")
+        again = await TestModel.objects.aget(name="setup 1")
+        self.assertEqual(first, again)
+        self.assertIsNot(first, again)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    @tag("ci")
+    async def test_invalidated_by_writes(self):
+        qs = TestModel.objects.afilter(obj_type="setup")
+        self.assertEqual(await qs.acount(), 1)
+        await TestModel.objects.acreate(name="setup 2", obj_type="setup")
+        self.assertEqual(await qs.acount(), 2)
+        await qs.afilter(name="setup 2").aupdate(obj_type="other")
+        self.assertEqual(await qs.acount(), 1)
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    @tag("ci")
+    async def test_results_kind_in_key(self):
+        qs = TestModel.objects.filter(obj_type="setup")
+        self.assertEqual(await qs.values("name").alist(), [{"name": "setup 1"}])
+        self.assertEqual(await qs.values_list("name").alist(), [("setup 1",)])
+        self.assertEqual(await qs.values_list("name", flat=True).alist(), ["setup 1"])
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    @tag("ci")
+    async def test_invalidated_by_subquery_writes(self):
+        author = await Author.objects.acreate(name="author")
+        await Book.objects.acreate(title="book", author=author)
+        qs = Author.objects.afilter(
+            pk__in=Book.objects.filter(title="book").values("author")
+        )
+        self.assertEqual(await qs.acount(), 1)
+        await Book.objects.afilter(title="book").aupdate(title="other")
+        self.assertEqual(await qs.acount(), 0)
+        await Author.objects.adelete()
+
+    @tag("ci")
+    @override_settings(ASYNC_ORM_CACHE={"MODELS": {"tests.TestModel": 0}})
+    async def test_disabled_per_model(self):
+        cache = get_query_cache()
+        await TestModel.objects.acount()
+        await TestModel.objects.acount()
+        self.assertEqual(cache.stats()["hits"], 0)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+TEMPLATES = {
+    "base.html": (
+        "<head>{% block title %}Models{% endblock %}</head>"
+        "<body>{% block content %}{% endblock %}</body>"
+    ),
+    "list.html": (
+        '{% extends "base.html" %}'
+        "{% block title %}{{ block.super }} ({{ models|length }}){% endblock %}"
+        "{% block content %}<h1>{{ title }}</h1>"
+        "<ul>{% for model in models %}<li>{{ forloop.counter }} {{ model.name }}</li>"
+        "{% empty %}<li>none</li>{% endfor %}</ul>"
+        "{% endblock %}"
+    ),
+}
+
+
+TEMPLATE_SETTINGS = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {"loaders": [("django.template.loaders.locmem.Loader", TEMPLATES)]},
+    }
+]
+
+
+@override_settings(TEMPLATES=TEMPLATE_SETTINGS)
+class StreamingRenderTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        for i in range(5):
+            await TestModel.objects.acreate(name=f"<model {i}>", obj_type="setup")
+
+    async def asyncTearDown(self):
+        await TestModel.objects.adelete()
+
+    async def streamed(self, response):
+        if getattr(response, "is_async", False):
+            return [chunk async for chunk in response.streaming_content]
+        # Before Django 4.2, the page is sent as a single chunk.
+        return list(response.streaming_content)
+
+    @tag("ci")
+    async def test_stream_matches_render(self):
+        request = RequestFactory().get("/")
+        context = {"models": TestModel.objects.order_by("name"), "title": "All"}
+        response = await arender_stream(request, "list.html", context, chunk_size=1)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        # Evaluated before the response is returned.
+        self.assertIsNotNone(context["models"]._result_cache)
+        chunks = await self.streamed(response)
+        if django.VERSION >= (4, 2):
+            self.assertGreater(len(chunks), 3)
+            self.assertEqual(chunks[0], b"<head>")
+        else:
+            self.assertEqual(len(chunks), 1)
+        expected = await run_sync(
+            "default",
+            render_to_string,
+            "list.html",
+            {"models": TestModel.objects.order_by("name"), "title": "All"},
+        )
+        self.assertEqual(b"".join(chunks).decode(), expected)
+        self.assertIn("Models (5)", expected)
+        self.assertIn("<li>1 &lt;model 0&gt;</li>", expected)
+
+    @tag("ci")
+    async def test_chunk_size(self):
+        response = await arender_stream(
+            RequestFactory().get("/"),
+            "list.html",
+            {"models": TestModel.objects.none()},
+            status=201,
+        )
+        self.assertEqual(response.status_code, 201)
+        chunks = await self.streamed(response)
+        self.assertEqual(len(chunks), 1)
+        self.assertIn(b"<li>none</li>", chunks[0])
+
+    @tag("ci")
+    def test_iter_render_matches_render(self):
+        # The nodes iter_render renders piece by piece, on the installed
+        # version of Django.
+        templates = {
+            "root.html": (
+                "{% block head %}root{% endblock %}|{% block body %}"
+                "{% block inner %}inner{% endblock %}{% endblock %}|"
+                "{% block tail %}tail{% endblock %}"
+            ),
+            "middle.html": (
+                '{% extends "root.html" %}{% block head %}{{ block.super }}+middle'
+                "{% endblock %}{% block inner %}[{{ block.super }}]{% endblock %}"
+            ),
+            "item.html": "<{{ name }}:{{ forloop.counter0 }}>",
+            "page.html": (
+                '{% extends "middle.html" %}'
+                "{% block head %}{{ block.super }}+page{% endblock %}"
+                "{% block inner %}{{ block.super }}"
+                "{% for name, sizes in rows %}{{ forloop.counter }}/"
+                "{{ forloop.revcounter }}{% if forloop.first %}F{% endif %}"
+                '{% if forloop.last %}L{% endif %}{% include "item.html" %}'
+                "{% for size in sizes reversed %}{{ forloop.parentloop.counter }}."
+                "{{ size }}{% empty %}none{% endfor %};{% endfor %}"
+                "{% for missing in nothing %}{% empty %}empty{% endfor %}"
+                "{% endblock %}"
+            ),
+        }
+        settings = [
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "OPTIONS": {
+                    "loaders": [("django.template.loaders.locmem.Loader", templates)]
+                },
+            }
+        ]
+        context = {"rows": [("a", [1, 2]), ("b", []), ("c", [3])], "nothing": []}
+        with override_settings(TEMPLATES=settings):
+            template = get_template("page.html")
+            pieces = list(iter_render(template, context))
+            self.assertGreater(len(pieces), 10)
+            self.assertEqual("".join(pieces), template.render(context))
+
+    @tag("ci")
+    async def test_templates_are_cached(self):
+        template = await aget_template("list.html")
+        self.assertIs(await aget_template("list.html"), template)
+        selected = await aget_template(["missing.html", "list.html"])
+        self.assertEqual(selected.origin.name, "list.html")
+        with override_settings(TEMPLATES=TEMPLATE_SETTINGS):
+            self.assertIsNot(await aget_template("list.html"), template)
+
+
+class BookForm(forms.ModelForm):
+    class Meta:
+        model = Book
+        fields = ["title", "author", "tags"]
+
+
+class EditionForm(forms.ModelForm):
+    class Meta:
+        model = Edition
+        fields = ["book", "number", "isbn"]
+
+
+class CountQueries:
+    """
+    Counts the queries of the calls made on channels' database thread.
+    """
+
+    async def __aenter__(self):
+        self.context = await run_sync(
+            "default", lambda: CaptureQueriesContext(connections["default"])
+        )
+        await run_sync("default", self.context.__enter__)
+        return self.context
+
+    async def __aexit__(self, *exc_info):
+        await run_sync("default", self.context.__exit__, *exc_info)
+
+
+class FormValidationTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.author = await Author.objects.acreate(name="author")
+        self.tags = [await Tag.objects.acreate(name=f"tag {i}") for i in range(3)]
+        self.book = await Book.objects.acreate(title="book", author=self.author)
+        self.edition = await Edition.objects.acreate(
+            book=self.book, number=1, isbn="1234567890123"
+        )
+
+    async def asyncTearDown(self):
+        await Author.objects.adelete()
+        await Tag.objects.adelete()
+
+    async def assertSameErrors(self, form_class, data, instance=None):
+        form = form_class(data, instance=instance)
+        is_valid = await ais_valid(form)
+        expected = form_class(data, instance=instance)
+        self.assertEqual(is_valid, await run_sync("default", expected.is_valid))
+        self.assertEqual(form.errors, expected.errors)
+        return form
+
+    @tag("ci")
+    async def test_valid(self):
+        data = {
+            "title": "new",
+            "author": str(self.author.pk),
+            "tags": [str(self.tags[0].pk), str(self.tags[2].pk)],
+        }
+        form = BookForm(data)
+        async with CountQueries() as queries:
+            self.assertTrue(await aform_is_valid(form))
+        # The author, the tags and the foreign key validation, in one hop.
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(form.cleaned_data["author"], self.author)
+        self.assertEqual(
+            {tag.pk for tag in form.cleaned_data["tags"]},
+            {self.tags[0].pk, self.tags[2].pk},
+        )
+        book = await run_sync("default", form.save)
+        self.assertEqual(await book.tags.acount(), 2)
+
+    @tag("ci")
+    @override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 3})
+    async def test_concurrent_lookups(self):
+        data = {
+            "title": "new",
+            "author": str(self.author.pk),
+            "tags": [str(self.tags[0].pk), str(self.tags[2].pk)],
+        }
+        form = BookForm(data)
+        submitted = get_executor("default").submitted
+        self.assertTrue(await ais_valid(form))
+        # The author and the tags fetched concurrently, then the cleaning.
+        self.assertEqual(get_executor("default").submitted - submitted, 3)
+        self.assertEqual(form.cleaned_data["author"], self.author)
+        self.assertEqual(len(form.cleaned_data["tags"]), 2)
+        self.assertNotIn("to_python", vars(form.fields["author"]))
+
+    @tag("ci")
+    async def test_invalid_choices(self):
+        for workers in ({}, {"default": 3}):
+            for author, tags in (
+                ("0", [str(self.tags[0].pk)]),
+                ("abc", [str(self.tags[0].pk), "0"]),
+                (str(self.author.pk), ["abc"]),
+                ("", []),
+            ):
+                with self.subTest(workers=workers, author=author, tags=tags):
+                    with override_settings(ASYNC_ORM_EXECUTOR_WORKERS=workers):
+                        data = {"title": "new", "author": author, "tags": tags}
+                        form = await self.assertSameErrors(BookForm, data)
+                    self.assertFalse(form.is_valid())
+
+    @tag("ci")
+    async def test_unique_checks(self):
+        data = {"book": str(self.book.pk), "number": "1", "isbn": "1234567890123"}
+        async with CountQueries() as queries:
+            form = await self.assertSameErrors(EditionForm, data)
+        # The book, the foreign key validation and both unique checks at once,
+        # then the 4 queries of the sync validation.
+        self.assertEqual(len(queries), 3 + 4)
+        self.assertEqual(set(form.errors), {"isbn", "__all__"})
+        form = await self.assertSameErrors(EditionForm, data, instance=self.edition)
+        self.assertTrue(form.is_valid())
+        data["number"] = "2"
+        form = await self.assertSameErrors(EditionForm, data)
+        self.assertEqual(set(form.errors), {"isbn"})
+
+
+@override_settings(ASYNC_ORM_EXECUTOR_WORKERS={"default": 2})
+class AsyncSignalsTestCase(TransactionTestCase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.received = []
+        self.connected = []
+
+    async def asyncTearDown(self):
+        for signal, func in self.connected:
+            signals.disconnect(signal, func, sender=TestModel)
+        await TestModel.objects.adelete()
+
+    def connect(self, signal, func, **kwargs):
+        signals.connect(signal, func, sender=TestModel, **kwargs)
+        self.connected.append((signal, func))
+
+    async def slow_receiver(self, sender, instance, **kwargs):
+        await asyncio.sleep(0.1)
+        self.received.append(("slow", instance.name, kwargs.get("created")))
+
+    async def other_receiver(self, sender, instance, **kwargs):
+        await asyncio.sleep(0.1)
+        self.received.append(("other", instance.name, kwargs.get("created")))
+
+    @tag("ci")
+    async def test_receivers_run_concurrently(self):
+        self.connect(post_save, self.slow_receiver)
+        self.connect(post_save, self.other_receiver)
+        start = time.perf_counter()
+        obj = await TestModel.objects.acreate(name="created")
+        self.assertLess(time.perf_counter() - start, 0.19)
+        self.assertCountEqual(
+            self.received, [("slow", "created", True), ("other", "created", True)]
+        )
+        self.received.clear()
+        obj.name = "saved"
+        await obj.asave()
+        self.assertEqual(len(self.received), 2)
+        self.assertIn(("slow", "saved", False), self.received)
+
+    @tag("ci")
+    async def test_delete_and_update_or_create(self):
+        self.connect(post_save, self.slow_receiver)
+        self.connect(post_delete, self.slow_receiver)
+        obj, created = await TestModel.objects.aupdate_or_create(name="upserted")
+        self.assertTrue(created)
+        await obj.adelete()
+        await TestModel.objects.acreate(name="deleted")
+        await TestModel.objects.afilter(name="deleted").adelete()
+        self.assertEqual(
+            self.received,
+            [
+                ("slow", "upserted", True),
+                ("slow", "upserted", None),
+                ("slow", "deleted", True),
+                ("slow", "deleted", None),
+            ],
+        )
+
+    @tag("ci")
+    async def test_on_commit(self):
+        self.connect(post_save, self.slow_receiver, on_commit=True)
+        async with aatomic():
+            await TestModel.objects.acreate(name="committed")
+            self.assertEqual(self.received, [])
+        self.assertEqual(self.received, [("slow", "committed", True)])
+        with self.assertRaises(ValueError):
+            async with aatomic():
+                await TestModel.objects.acreate(name="rolled back")
+                raise ValueError
+        self.assertEqual(len(self.received), 1)
+        # Right away outside of a transaction.
+        await TestModel.objects.acreate(name="autocommit")
+        self.assertEqual(self.received[-1], ("slow", "autocommit", True))
+
+    @tag("ci")
+    async def test_sync_code_and_receivers(self):
+        sync_received = []
+
+        def sync_receiver(sender, instance, **kwargs):
+            sync_received.append(instance.name)
+
+        post_save.connect(sync_receiver, sender=TestModel)
+        self.addCleanup(post_save.disconnect, sync_receiver, sender=TestModel)
+        self.connect(post_save, self.slow_receiver)
+        await TestModel.objects.acreate(name="async")
+        await asyncio.to_thread(TestModel.objects.create, name="sync")
+        self.assertEqual(sync_received, ["async", "sync"])
+        self.assertEqual(
+            self.received, [("slow", "async", True), ("slow", "sync", True)]
+        )
+
+    @tag("ci")
+    async def test_errors_and_instrumentation(self):
+        async def failing_receiver(sender, instance, **kwargs):
+            raise ValueError(instance.name)
+
+        with self.assertRaises(TypeError):
+            signals.connect(post_save, lambda **kwargs: None)
+        self.connect(post_save, self.slow_receiver)
+        self.connect(post_save, failing_receiver)
+        collector = StatsCollector()
+        add_listener(collector)
+        try:
+            with self.assertRaisesMessage(ValueError, "failing"):
+                await TestModel.objects.acreate(name="failing")
+        finally:
+            remove_listener(collector)
+        # The other receivers still ran, the object is saved.
+        self.assertEqual(self.received, [("slow", "failing", True)])
+        self.assertTrue(await TestModel.objects.afilter(name="failing").aexists())
+        stats = collector.snapshot()["tests.TestModel.acreate"]
+        self.assertGreaterEqual(stats["signal_time"]["max_ms"], 100)
+        self.assertEqual(stats["errors"], 1)